@@ -1,8 +1,11 @@
-from fastapi import APIRouter, Request, Query, Depends
-from fastapi.responses import JSONResponse
+import datetime
+from typing import Optional
+from urllib.parse import quote
+from fastapi import APIRouter, Request, Query, Path, Depends
+from fastapi.responses import StreamingResponse
 
-from core import dependencies
-from services import mongodb_client
+from core import dependencies, responses
+from services import chat_search, mongo_export, mongodb_client
 from utils import error_tools
 
 from . import office_controller as OfficeController
@@ -10,6 +13,15 @@ from . import character_controller as CharacterController
 
 mongo_router = APIRouter()
 
+_CACHE_STATS = responses.Link("GET", "채팅 로그 캐시 상태 가져오기", "{base}mongo/cache/stats", "cache-stats")
+
+DATABASES_LINKS = responses.Links(
+    "GET", "데이터베이스 목록 가져오기",
+    responses.Link("GET", "데이터베이스 컬렉션 목록 가져오기", "{base}mongo/collections", "collections"),
+    responses.Link("GET", "오피스 채팅방 생성", "{base}mongo/offices", "office-chats"),
+    responses.Link("GET", "캐릭터 채팅방 생성", "{base}mongo/characters", "character-chats")
+)
+
 @mongo_router.get("/db", summary="데이터베이스 목록 가져오기")
 async def list_databases(
     req: Request,
@@ -21,39 +33,20 @@ async def list_databases(
     try:
         databases = await mongo_handler.get_db()
         response_data = {
-            "Database": databases,
-            "_links": [
-                { 
-                    "href": str(req.url),
-                    "rel": "self",
-                    "type": "GET",
-                    "title": "데이터베이스 목록 가져오기",
-                },
-                {
-                    "href": f"{str(req.base_url)}mongo/collections",
-                    "rel": "collections",
-                    "type": "GET",
-                    "title": "데이터베이스 컬렉션 목록 가져오기",
-                },
-                {
-                    "href": f"{str(req.base_url)}mongo/offices",
-                    "rel": "office-chats",
-                    "type": "GET",
-                    "title": "오피스 채팅방 생성",
-                },
-                {
-                    "href": f"{str(req.base_url)}mongo/characters",
-                    "rel": "character-chats",
-                    "type": "GET",
-                    "title": "캐릭터 채팅방 생성",
-                },
-            ]
+            "Database": databases
         }
-        return JSONResponse(response_data)             
+        return responses.hateoas(req, response_data, DATABASES_LINKS)
         
     except Exception as e:
         raise error_tools.InternalServerErrorException(detail=str(e))
 
+COLLECTIONS_LINKS = responses.Links(
+    "GET", None,
+    responses.Link("GET", None, "{base}mongo/db", "databases"),
+    responses.Link("GET", None, "{base}mongo/offices", "office-chats"),
+    responses.Link("GET", None, "{base}mongo/characters", "character-chats")
+)
+
 @mongo_router.get("/collections", summary="데이터베이스 컬렉션 목록 가져오기")
 async def list_collections(
     req: Request,
@@ -66,34 +59,170 @@ async def list_collections(
     try:
         collections = await mongo_handler.get_collection(database_name=db_name)
         response_data = {
-            "Collections": collections,
-            "_links": [
-                { 
-                    "href": str(req.url),
-                    "rel": "self",
-                    "type": "GET",
-                },
-                {
-                    "href": f"{str(req.base_url)}mongo/db",
-                    "rel": "databases",
-                    "type": "GET",
-                },
-                {
-                    "href": f"{req.base_url}mongo/offices",
-                    "rel": "office-chats",
-                    "type": "GET",
-                },
-                {
-                    "href": f"{req.base_url}mongo/characters",
-                    "rel": "character-chats",
-                    "type": "GET",
-                },
-            ]
+            "Collections": collections
+        }
+        return responses.hateoas(req, response_data, COLLECTIONS_LINKS)
+    except Exception as e:
+        raise error_tools.InternalServerErrorException(detail=str(e))
+
+CACHE_STATS_LINKS = responses.Links(
+    "GET", "채팅 로그 캐시 상태 가져오기",
+    responses.Link("GET", "데이터베이스 목록 가져오기", "{base}mongo/db", "databases")
+)
+
+@mongo_router.get("/cache/stats", summary="채팅 로그 캐시 상태 가져오기")
+async def get_cache_stats(
+    req: Request,
+    mongo_handler: mongodb_client.MongoDBHandler = Depends(dependencies.get_mongo_handler)
+):
+    '''
+    채팅 로그 조회 캐시의 적중률, 항목 수, 메모리 사용량을 반환합니다.
+    '''
+    try:
+        response_data = {
+            "Cache": await mongo_handler.get_cache_stats()
         }
-        return JSONResponse(response_data)
+        return responses.hateoas(req, response_data, CACHE_STATS_LINKS)
     except Exception as e:
         raise error_tools.InternalServerErrorException(detail=str(e))
     
+WRITE_BUFFER_STATS_LINKS = responses.Links(
+    "GET", "채팅 write-behind 버퍼 상태 가져오기",
+    _CACHE_STATS
+)
+
+@mongo_router.get("/write-buffer/stats", summary="채팅 write-behind 버퍼 상태 가져오기")
+async def get_write_buffer_stats(
+    req: Request,
+    mongo_handler: mongodb_client.MongoDBHandler = Depends(dependencies.get_mongo_handler)
+):
+    '''
+    write-behind 버퍼의 반영 횟수, 평균/최대 묶음 크기, 절약한 쓰기 수, 대기 중인 채팅 수를 반환합니다.
+    '''
+    try:
+        response_data = {
+            "WriteBuffer": mongo_handler.get_write_buffer_stats()
+        }
+        return responses.hateoas(req, response_data, WRITE_BUFFER_STATS_LINKS)
+    except Exception as e:
+        raise error_tools.InternalServerErrorException(detail=str(e))
+
+USAGE_STATS_LINKS = responses.Links(
+    "GET", "일별 채팅 사용량 가져오기",
+    _CACHE_STATS
+)
+
+@mongo_router.get("/stats/usage", summary="일별 채팅 사용량 가져오기")
+async def get_usage_stats(
+    req: Request,
+    router: str = Query("chatbot", pattern="^(office|chatbot)$", description="라우터 (office 또는 chatbot)"),
+    start: Optional[datetime.date] = Query(None, description="시작 날짜 (기본값: end 6일 전)"),
+    end: Optional[datetime.date] = Query(None, description="끝 날짜 (기본값: 오늘)"),
+    character_idx: Optional[int] = Query(None, ge=1, description="특정 캐릭터만 가져오기"),
+    mongo_handler: mongodb_client.MongoDBHandler = Depends(dependencies.get_mongo_handler)
+):
+    '''
+    미리 집계한 일별 대화 수, 활성 채팅방 수, 평균 응답 길이를 캐릭터별로 반환합니다.
+    채팅 로그 컬렉션을 읽지 않으므로 기간과 관계없이 빠르게 응답합니다.
+    '''
+    end = end or datetime.date.today()
+    start = start or end - datetime.timedelta(days=6)
+    if start > end:
+        raise error_tools.BadRequestException(detail="start는 end보다 늦을 수 없습니다.")
+    if (end - start).days > 366:
+        raise error_tools.BadRequestException(detail="최대 366일까지 조회할 수 있습니다.")
+
+    try:
+        response_data = {
+            "Usage": await mongo_handler.get_usage_stats(
+                router=router,
+                start=start.isoformat(),
+                end=end.isoformat(),
+                character_idx=character_idx
+            )
+        }
+        return responses.hateoas(req, response_data, USAGE_STATS_LINKS)
+    except Exception as e:
+        raise error_tools.InternalServerErrorException(detail=str(e))
+
+SEARCH_LINKS = responses.Links(
+    "GET", "유저 채팅 기록 검색",
+    responses.Link(
+        "GET",
+        "검색된 채팅방 불러오기",
+        "{base}mongo/{{router_path}}/users/{user_id}/documents/{{document_id}}",
+        "/users/{user_id}/documents/",
+        description="결과의 router에 맞는 router_path(office: offices, chatbot: characters)와 document_id를 URL에 교체하세요"
+    ),
+    next_title="유저 채팅 기록 검색 다음 페이지"
+)
+
+@mongo_router.get("/users/{user_id}/search", summary="유저 채팅 기록 검색")
+async def search_chat_logs(
+    req: Request,
+    user_id: str = Path(..., description="유저 ID"),
+    q: str = Query(..., min_length=2, max_length=100, description="검색어 (두 글자 이상의 단어 포함)"),
+    router: Optional[str] = Query(None, pattern="^(office|chatbot)$", description="특정 라우터만 검색하기 (기본값: 전체)"),
+    limit: int = Query(20, ge=1, le=100, description="한 페이지의 최대 결과 수"),
+    cursor: Optional[str] = Query(None, description="이전 응답의 next_cursor"),
+    mongo_handler: mongodb_client.MongoDBHandler = Depends(dependencies.get_mongo_handler)
+):
+    '''
+    유저의 오피스/캐릭터 채팅 기록에서 검색어가 포함된 채팅을 최신순으로 찾아 채팅방 ID, 채팅 index, 발췌문을 반환합니다.
+    n-gram 검색 색인으로 후보 채팅을 찾은 뒤 후보 채팅만 채팅방에서 읽으므로 기록이 많아도 빠르게 응답합니다.
+    다음 페이지는 응답의 next_cursor를 cursor로 전달하여 불러옵니다.
+    '''
+    if cursor is not None:
+        try:
+            after = chat_search.ChatSearchIndex.decode_cursor(cursor)
+        except ValueError:
+            raise error_tools.BadRequestException(detail="cursor 값이 올바르지 않습니다.")
+    else:
+        after = None
+
+    try:
+        results, next_after = await mongo_handler.search_logs(
+            user_id=user_id,
+            query=q,
+            router=router,
+            limit=limit,
+            after=after
+        )
+    except ValueError as e:
+        raise error_tools.BadRequestException(detail=str(e))
+
+    try:
+        next_cursor = chat_search.ChatSearchIndex.encode_cursor(*next_after) if next_after else None
+        response_data = {
+            "user_id": user_id,
+            "query": q,
+            "results": results,
+            "next_cursor": next_cursor
+        }
+        return responses.hateoas(req, response_data, SEARCH_LINKS, next_cursor=next_cursor, user_id=user_id)
+    except Exception as e:
+        raise error_tools.InternalServerErrorException(detail=str(e))
+
+@mongo_router.get("/users/{user_id}/export", summary="유저 채팅 기록 전체 내보내기")
+async def export_chat_logs(
+    user_id: str = Path(..., description="유저 ID"),
+    router: Optional[str] = Query(None, pattern="^(office|chatbot)$", description="특정 라우터만 내보내기 (기본값: 전체)"),
+    mongo_handler: mongodb_client.MongoDBHandler = Depends(dependencies.get_mongo_handler)
+):
+    '''
+    유저의 모든 오피스/캐릭터 채팅방을 순회하며 대화 턴 하나당 한 줄의 NDJSON으로 스트리밍합니다.
+    대화 기록 전체를 메모리에 올리지 않으므로 기록의 크기와 관계없이 메모리 사용량이 일정합니다.
+    '''
+    try:
+        routers = (router,) if router else mongo_export.ROUTERS
+        return StreamingResponse(
+            mongo_export.iter_ndjson(mongo_handler, user_id, routers),
+            media_type="application/x-ndjson",
+            headers={"Content-Disposition": f'attachment; filename="{quote(user_id)}.ndjson"'}
+        )
+    except Exception as e:
+        raise error_tools.InternalServerErrorException(detail=str(e))
+
 mongo_router.include_router(
     OfficeController.office_router,
     prefix="/offices",
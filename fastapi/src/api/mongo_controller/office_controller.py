@@ -1,13 +1,49 @@
-from fastapi import APIRouter, Request, Depends, Path
-from fastapi.responses import JSONResponse
+import datetime
+from typing import Optional
+from fastapi import APIRouter, Request, Depends, Path, Query
 from pydantic import ValidationError
 
-from core import dependencies
+from core import dependencies, responses, routing
 from schemas import schema
 from services import mongodb_client
-from utils import error_tools
+from utils import error_tools, http_cache
 
-office_router = APIRouter()
+# 채팅 쓰기 요청은 Idempotency-Key 헤더로 재시도를 한 번만 처리
+office_router = APIRouter(route_class=routing.IdempotentRoute)
+
+# HATEOAS 링크 템플릿 (라우트별 '_links'는 각 라우트 위에 정의)
+_PREFIX = "{base}mongo/offices"
+_ROOM = "/users/{user_id}"
+_DOCUMENT = "/users/{user_id}/documents/{document_id}"
+_INDEX_DESCRIPTION = "index 값까지의 채팅을 삭제하려는 인덱스(자연수 값: index > 0)를 URL에 교체하세요"
+
+_CREATE_ROOM = responses.Link("GET", "유저 채팅방 ID 생성", _PREFIX + _ROOM, _ROOM)
+_CREATE_ROOM_POST = responses.Link("POST", "유저 채팅방 ID 생성", _PREFIX + _ROOM, _ROOM)
+# 이전 응답과 같은 형식을 유지하기 위한 base URL 없는 링크
+_RELATIVE_CREATE_ROOM = responses.Link("GET", "유저 채팅방 ID 생성", _ROOM, _ROOM)
+_LOAD_LOG = responses.Link("GET", "유저 채팅 불러오기", _PREFIX + _DOCUMENT, _DOCUMENT)
+_SAVE_LOG = responses.Link("PUT", "유저 채팅 저장", _PREFIX + _DOCUMENT, _DOCUMENT)
+_UPDATE_LOG = responses.Link("PATCH", "유저 최근 채팅 업데이트", _PREFIX + _DOCUMENT, _DOCUMENT)
+_DELETE_ROOM = responses.Link("DELETE", "유저 채팅방 지우기", _PREFIX + _DOCUMENT, _DOCUMENT)
+_DELETE_FROM_INDEX = responses.Link(
+    "DELETE",
+    "유저 index까지의 채팅 일부 지우기",
+    _PREFIX + _DOCUMENT + "/idx/{{index}}",
+    _DOCUMENT + "/idx/",
+    description=_INDEX_DESCRIPTION
+)
+_LOAD_ANY_LOG = responses.Link(
+    "GET",
+    "유저 채팅 불러오기",
+    _PREFIX + _ROOM + "/documents/{{document_id}}",
+    _ROOM + "/documents/",
+    description="불러올 채팅방 ID를 URL에 교체하세요"
+)
+
+CREATE_CHAT_LINKS = responses.Links(
+    "GET", "유저 채팅방 ID 생성",
+    _LOAD_LOG, _SAVE_LOG, _UPDATE_LOG, _DELETE_ROOM, _DELETE_FROM_INDEX
+)
 
 @office_router.post("/users/{user_id}", summary="유저 채팅방 ID 생성")
 async def create_chat(
@@ -27,116 +63,115 @@ async def create_chat(
             raise error_tools.InternalServerErrorException(detail="채팅방을 생성할 수 없습니다.")
         
         response_data = {
-            "Document ID": document_id,
-            "_links": [
-                {
-                    "href": str(req.url),
-                    "rel": "self",
-                    "type": "GET",
-                    "title": "유저 채팅방 ID 생성",
-                },
-                {
-                    "href": f"{str(req.base_url)}mongo/offices/users/{user_id}/documents/{document_id}",
-                    "rel": f"/users/{user_id}/documents/{document_id}",
-                    "type": "GET",
-                    "title": "유저 채팅 불러오기",
-                },
-                {
-                    "href": f"{str(req.base_url)}mongo/offices/users/{user_id}/documents/{document_id}",
-                    "rel": f"/users/{user_id}/documents/{document_id}",
-                    "type": "PUT",
-                    "title": "유저 채팅 저장",
-                },
-                {
-                    "href": f"{str(req.base_url)}mongo/offices/users/{user_id}/documents/{document_id}",
-                    "rel": f"/users/{user_id}/documents/{document_id}",
-                    "type": "PATCH",
-                    "title": "유저 최근 채팅 업데이트",
-                },
-                {
-                    "href": f"{str(req.base_url)}mongo/offices/users/{user_id}/documents/{document_id}",
-                    "rel": f"/users/{user_id}/documents/{document_id}",
-                    "type": "DELETE",
-                    "title": "유저 채팅방 지우기",
-                },
-                {
-                    "href": f"{str(req.base_url)}mongo/offices/users/{user_id}/documents/{document_id}/idx/{{index}}",
-                    "rel": f"/users/{user_id}/documents/{document_id}/idx/",
-                    "type": "DELETE",
-                    "title": "유저 index까지의 채팅 일부 지우기",
-                    "templated": True,
-                    "description": "index 값까지의 채팅을 삭제하려는 인덱스(자연수 값: index > 0)를 URL에 교체하세요"
-                },
-            ]
+            "Document ID": document_id
         }
         
-        return JSONResponse(response_data)
+        return responses.hateoas(req, response_data, CREATE_CHAT_LINKS, user_id=user_id, document_id=document_id)
+    except Exception as e:
+        raise error_tools.InternalServerErrorException(detail=str(e))
+
+LIST_ROOMS_LINKS = responses.Links(
+    "GET", "유저 채팅방 목록 불러오기",
+    _LOAD_ANY_LOG,
+    next_title="유저 채팅방 목록 다음 페이지"
+)
+
+@office_router.get("/users/{user_id}", summary="유저 채팅방 목록 불러오기")
+async def list_chat_rooms(
+    req: Request,
+    user_id: str = Path(..., description="유저 ID"),
+    limit: int = Query(20, ge=1, le=100, description="한 페이지의 최대 채팅방 수"),
+    cursor: Optional[str] = Query(None, description="이전 응답의 next_cursor"),
+    mongo_handler: mongodb_client.MongoDBHandler = Depends(dependencies.get_mongo_handler)
+):
+    '''
+    유저의 오피스 채팅방 목록을 마지막 채팅 시간 최신순으로 불러옵니다.
+    채팅 로그는 불러오지 않고 채팅방 ID, 채팅 수, 생성/마지막 채팅 시간만 반환합니다.
+    다음 페이지는 응답의 next_cursor를 cursor로 전달하여 불러옵니다.
+    '''
+    if cursor is not None:
+        try:
+            after = mongo_handler.decode_room_cursor(cursor)
+        except ValueError:
+            raise error_tools.BadRequestException(detail="cursor 값이 올바르지 않습니다.")
+    else:
+        after = None
+
+    try:
+        rooms, next_after = await mongo_handler.list_rooms(
+            user_id=user_id,
+            router="office",
+            limit=limit,
+            after=after
+        )
+        next_cursor = mongo_handler.encode_room_cursor(*next_after) if next_after else None
+
+        response_data = {
+            "rooms": rooms,
+            "next_cursor": next_cursor
+        }
+
+        return responses.hateoas(req, response_data, LIST_ROOMS_LINKS, next_cursor=next_cursor, user_id=user_id)
+    except ValidationError as e:
+        raise error_tools.BadRequestException(detail=str(e))
     except Exception as e:
         raise error_tools.InternalServerErrorException(detail=str(e))
 
+LOAD_LOG_LINKS = responses.Links(
+    "GET", "유저 채팅 불러오기",
+    _CREATE_ROOM, _SAVE_LOG, _UPDATE_LOG, _DELETE_ROOM, _DELETE_FROM_INDEX
+)
+
 @office_router.get("/users/{user_id}/documents/{document_id}", summary="유저 채팅 불러오기")
 async def load_chat_log(
     req: Request,
     user_id: str = Path(..., description="유저 ID"),
     document_id: str = Path(..., description="채팅방 ID"),
+    last: Optional[int] = Query(None, ge=1, description="최근 N개의 채팅만 불러오기"),
+    before_index: Optional[int] = Query(None, ge=1, description="이 index보다 이전의 채팅만 불러오기"),
+    after_index: Optional[int] = Query(None, ge=0, description="이 index보다 이후의 채팅만 불러오기"),
+    since: Optional[datetime.datetime] = Query(None, description="이 시간 이후(포함)의 채팅만 불러오기 (ISO 8601, 시간대가 없으면 서버 시간)"),
+    until: Optional[datetime.datetime] = Query(None, description="이 시간 이전(미포함)의 채팅만 불러오기 (ISO 8601, 시간대가 없으면 서버 시간)"),
     mongo_handler: mongodb_client.MongoDBHandler = Depends(dependencies.get_mongo_handler)
 ):
     '''
     생성된 채팅 문서의 채팅 로그를 MongoDB에서 불러옵니다.
+    last, before_index, after_index, since, until을 지정하면 해당 구간의 채팅만 불러옵니다.
+    응답의 ETag를 If-None-Match로 보내면 채팅방이 바뀌지 않은 경우 본문 없이 304를 반환합니다.
     '''
+    if since is not None and until is not None and since.astimezone() >= until.astimezone():
+        raise error_tools.BadRequestException(detail="since는 until보다 이전이어야 합니다.")
     try:
-        chat_logs = await mongo_handler.get_offic_log(
+        # 같은 version이라도 구간 조건과 응답 형식이 다르면 다른 ETag를 사용
+        variant = http_cache.variant(req.query_params.multi_items(), responses.representation(req))
+        if_none_match = req.headers.get("If-None-Match")
+        if if_none_match:
+            etag = http_cache.make_etag(await mongo_handler.get_log_version(
+                user_id=user_id,
+                document_id=document_id,
+                router="office"
+            ), variant)
+            if http_cache.etag_matches(if_none_match, etag):
+                return http_cache.not_modified(etag, responses.VARY)
+
+        chat_logs, version = await mongo_handler.get_offic_log(
             user_id=user_id,
             document_id=document_id,
-            router="office"
+            router="office",
+            last=last,
+            before_index=before_index,
+            after_index=after_index,
+            since=since,
+            until=until,
+            with_version=True
         )
 
         response_data = {
             "id": document_id,
-            "value": chat_logs,
-            "_links": [
-                {
-                    "href": str(req.url),
-                    "rel": "self",
-                    "type": "GET",
-                    "title": "유저 채팅 불러오기",
-                },
-                {
-                    "href": f"{str(req.base_url)}mongo/offices/users/{user_id}",
-                    "rel": f"/users/{user_id}",
-                    "type": "GET",
-                    "title": "유저 채팅방 ID 생성",
-                },
-                {
-                    "href": f"{str(req.base_url)}mongo/offices/users/{user_id}/documents/{document_id}",
-                    "rel": f"/users/{user_id}/documents/{document_id}",
-                    "type": "PUT",
-                    "title": "유저 채팅 저장",
-                },
-                {
-                    "href": f"{str(req.base_url)}mongo/offices/users/{user_id}/documents/{document_id}",
-                    "rel": f"/users/{user_id}/documents/{document_id}",
-                    "type": "PATCH",
-                    "title": "유저 최근 채팅 업데이트",
-                },
-                {
-                    "href": f"{str(req.base_url)}mongo/offices/users/{user_id}/documents/{document_id}",
-                    "rel": f"/users/{user_id}/documents/{document_id}",
-                    "type": "DELETE",
-                    "title": "유저 채팅방 지우기",
-                },
-                {
-                    "href": f"{str(req.base_url)}mongo/offices/users/{user_id}/documents/{document_id}/idx/{{index}}",
-                    "rel": f"/users/{user_id}/documents/{document_id}/idx/",
-                    "type": "DELETE",
-                    "title": "유저 index까지의 채팅 일부 지우기",
-                    "templated": True,
-                    "description": "index 값까지의 채팅을 삭제하려는 인덱스(자연수 값: index > 0)를 URL에 교체하세요"
-                },
-            ]
+            "value": chat_logs
         }
         
-        return JSONResponse(response_data)
+        return responses.hateoas(req, response_data, LOAD_LOG_LINKS, headers=http_cache.cache_headers(version, variant), user_id=user_id, document_id=document_id)
     except ValidationError as e:
         raise error_tools.BadRequestException(detail=str(e))
     except error_tools.NotFoundException as e:
@@ -144,6 +179,52 @@ async def load_chat_log(
     except Exception as e:
         raise error_tools.InternalServerErrorException(detail=str(e))
 
+CONTEXT_LINKS = responses.Links(
+    "GET", "유저 최근 채팅 문맥 불러오기",
+    _LOAD_LOG, _SAVE_LOG
+)
+
+@office_router.get("/users/{user_id}/documents/{document_id}/context", summary="유저 최근 채팅 문맥 불러오기")
+async def load_recent_context(
+    req: Request,
+    user_id: str = Path(..., description="유저 ID"),
+    document_id: str = Path(..., description="채팅방 ID"),
+    max_tokens: Optional[int] = Query(None, ge=1, description="최대 토큰 수 (근사값)"),
+    max_chars: Optional[int] = Query(None, ge=1, description="최대 글자 수 (input_data + output_data)"),
+    mongo_handler: mongodb_client.MongoDBHandler = Depends(dependencies.get_mongo_handler)
+):
+    '''
+    최신 채팅부터 거슬러 올라가며 max_tokens 또는 max_chars 예산 안에 들어가는 채팅만 최신순으로 불러옵니다.
+    LLM 프롬프트를 만들 때 전체 채팅 로그 대신 사용합니다.
+    '''
+    if (max_tokens is None) == (max_chars is None):
+        raise error_tools.BadRequestException(detail="max_tokens와 max_chars 중 하나만 지정해야 합니다.")
+
+    try:
+        context = await mongo_handler.get_recent_context(
+            user_id=user_id,
+            document_id=document_id,
+            router="office",
+            budget=max_tokens if max_tokens is not None else max_chars,
+            unit="tokens" if max_tokens is not None else "chars"
+        )
+
+        response_data = {
+            "id": document_id,
+            **context
+        }
+
+        return responses.hateoas(req, response_data, CONTEXT_LINKS, user_id=user_id, document_id=document_id)
+    except error_tools.NotFoundException as e:
+        raise error_tools.NotFoundException(detail=str(e))
+    except Exception as e:
+        raise error_tools.InternalServerErrorException(detail=str(e))
+
+SAVE_LOG_LINKS = responses.Links(
+    "PUT", "유저 채팅 저장",
+    _CREATE_ROOM, _LOAD_LOG, _UPDATE_LOG, _DELETE_ROOM, _DELETE_FROM_INDEX
+)
+
 @office_router.put("/users/{user_id}/documents/{document_id}", summary="유저 채팅 저장")
 async def save_chat_log(
     req: Request,
@@ -169,50 +250,10 @@ async def save_chat_log(
             new_data=filtered_data
         )
         response_data = {
-            "Result": response_message,
-            "_links": [
-                {
-                    "href": str(req.url),
-                    "rel": "self",
-                    "type": "PUT",
-                    "title": "유저 채팅 저장",
-                },
-                {
-                    "href": f"{str(req.base_url)}mongo/offices/users/{user_id}",
-                    "rel": f"/users/{user_id}",
-                    "type": "GET",
-                    "title": "유저 채팅방 ID 생성",
-                },
-                {
-                    "href": f"{str(req.base_url)}mongo/offices/users/{user_id}/documents/{document_id}",
-                    "rel": f"/users/{user_id}/documents/{document_id}",
-                    "type": "GET",
-                    "title": "유저 채팅 불러오기",
-                },
-                {
-                    "href": f"{str(req.base_url)}mongo/offices/users/{user_id}/documents/{document_id}",
-                    "rel": f"/users/{user_id}/documents/{document_id}",
-                    "type": "PATCH",
-                    "title": "유저 최근 채팅 업데이트",
-                },
-                {
-                    "href": f"{str(req.base_url)}mongo/offices/users/{user_id}/documents/{document_id}",
-                    "rel": f"/users/{user_id}/documents/{document_id}",
-                    "type": "DELETE",
-                    "title": "유저 채팅방 지우기",
-                },
-                {
-                    "href": f"{str(req.base_url)}mongo/offices/users/{user_id}/documents/{document_id}/idx/{{index}}",
-                    "rel": f"/users/{user_id}/documents/{document_id}/idx/",
-                    "type": "DELETE",
-                    "title": "유저 index까지의 채팅 일부 지우기",
-                    "templated": True,
-                    "description": "index 값까지의 채팅을 삭제하려는 인덱스(자연수 값: index > 0)를 URL에 교체하세요"
-                },
-            ]
+            "Result": response_message
         }
         
-        return JSONResponse(response_data)
+        return responses.hateoas(req, response_data, SAVE_LOG_LINKS, user_id=user_id, document_id=document_id)
     except ValidationError as e:
         raise error_tools.BadRequestException(detail=str(e))
     except error_tools.NotFoundException as e:
@@ -220,6 +261,11 @@ async def save_chat_log(
     except Exception as e:
         raise error_tools.InternalServerErrorException(detail=str(e))
     
+UPDATE_LOG_LINKS = responses.Links(
+    "PATCH", "유저 최근 채팅 업데이트",
+    _CREATE_ROOM, _LOAD_LOG, _SAVE_LOG, _DELETE_ROOM, _DELETE_FROM_INDEX
+)
+
 @office_router.patch("/users/{user_id}/documents/{document_id}", summary="유저 최근 채팅 업데이트")
 async def update_chat_log(
     req: Request,
@@ -245,50 +291,10 @@ async def update_chat_log(
             new_Data=filtered_data
         )
         response_data = {
-            "Result": response_message,
-            "_links": [
-                {
-                    "href": str(req.url),
-                    "rel": "self",
-                    "type": "PATCH",
-                    "title": "유저 최근 채팅 업데이트",
-                },
-                {
-                    "href": f"{str(req.base_url)}mongo/offices/users/{user_id}",
-                    "rel": f"/users/{user_id}",
-                    "type": "GET",
-                    "title": "유저 채팅방 ID 생성",
-                },
-                {
-                    "href": f"{str(req.base_url)}mongo/offices/users/{user_id}/documents/{document_id}",
-                    "rel": f"/users/{user_id}/documents/{document_id}",
-                    "type": "GET",
-                    "title": "유저 채팅 불러오기",
-                },
-                {
-                    "href": f"{str(req.base_url)}mongo/offices/users/{user_id}/documents/{document_id}",
-                    "rel": f"/users/{user_id}/documents/{document_id}",
-                    "type": "PUT",
-                    "title": "유저 채팅 저장",
-                },
-                {
-                    "href": f"{str(req.base_url)}mongo/offices/users/{user_id}/documents/{document_id}",
-                    "rel": f"/users/{user_id}/documents/{document_id}",
-                    "type": "DELETE",
-                    "title": "유저 채팅방 지우기",
-                },
-                {
-                    "href": f"{str(req.base_url)}mongo/offices/users/{user_id}/documents/{document_id}/idx/{{index}}",
-                    "rel": f"/users/{user_id}/documents/{document_id}/idx/",
-                    "type": "DELETE",
-                    "title": "유저 index까지의 채팅 일부 지우기",
-                    "templated": True,
-                    "description": "index 값까지의 채팅을 삭제하려는 인덱스(자연수 값: index > 0)를 URL에 교체하세요"
-                },
-            ]
+            "Result": response_message
         }
         
-        return JSONResponse(response_data)
+        return responses.hateoas(req, response_data, UPDATE_LOG_LINKS, user_id=user_id, document_id=document_id)
     except ValidationError as e:
         raise error_tools.BadRequestException(detail=str(e))
     except error_tools.NotFoundException as e:
@@ -296,6 +302,11 @@ async def update_chat_log(
     except Exception as e:
         raise error_tools.InternalServerErrorException(detail=str(e))
 
+DELETE_ROOM_LINKS = responses.Links(
+    "DELETE", "유저 채팅방 지우기",
+    _RELATIVE_CREATE_ROOM, _CREATE_ROOM, _LOAD_LOG, _SAVE_LOG, _UPDATE_LOG, _DELETE_FROM_INDEX
+)
+
 @office_router.delete("/users/{user_id}/documents/{document_id}", summary="유저 채팅방 지우기")
 async def delete_chat_room(
     req: Request,
@@ -313,56 +324,10 @@ async def delete_chat_room(
             router="office"
         )
         response_data = {
-            "Result": response_message,
-            "_links": [
-                {
-                    "href": str(req.url),
-                    "rel": "self",
-                    "type": "DELETE",
-                    "title": "유저 채팅방 지우기",
-                },
-                {
-                    "href": f"/users/{user_id}",
-                    "rel": f"/users/{user_id}",
-                    "type": "GET",
-                    "title": "유저 채팅방 ID 생성",
-                },
-                {
-                    "href": f"{str(req.base_url)}mongo/offices/users/{user_id}",
-                    "rel": f"/users/{user_id}",
-                    "type": "GET",
-                    "title": "유저 채팅방 ID 생성",
-                },
-                {
-                    "href": f"{str(req.base_url)}mongo/offices/users/{user_id}/documents/{document_id}",
-                    "rel": f"/users/{user_id}/documents/{document_id}",
-                    "type": "GET",
-                    "title": "유저 채팅 불러오기",
-                },
-                {
-                    "href": f"{str(req.base_url)}mongo/offices/users/{user_id}/documents/{document_id}",
-                    "rel": f"/users/{user_id}/documents/{document_id}",
-                    "type": "PUT",
-                    "title": "유저 채팅 저장",
-                },
-                {
-                    "href": f"{str(req.base_url)}mongo/offices/users/{user_id}/documents/{document_id}",
-                    "rel": f"/users/{user_id}/documents/{document_id}",
-                    "type": "PATCH",
-                    "title": "유저 최근 채팅 업데이트",
-                },
-                {
-                    "href": f"{str(req.base_url)}mongo/offices/users/{user_id}/documents/{document_id}/idx/{{index}}",
-                    "rel": f"/users/{user_id}/documents/{document_id}/idx/",
-                    "type": "DELETE",
-                    "title": "유저 index까지의 채팅 일부 지우기",
-                    "templated": True,
-                    "description": "index 값까지의 채팅을 삭제하려는 인덱스(자연수 값: index > 0)를 URL에 교체하세요"
-                },
-            ]
+            "Result": response_message
         }
         
-        return JSONResponse(response_data)
+        return responses.hateoas(req, response_data, DELETE_ROOM_LINKS, user_id=user_id, document_id=document_id)
     except ValidationError as e:
         raise error_tools.BadRequestException(detail=str(e))
     except error_tools.NotFoundException as e:
@@ -370,6 +335,12 @@ async def delete_chat_room(
     except Exception as e:
         raise error_tools.InternalServerErrorException(detail=str(e))
 
+DELETE_LOG_LINKS = responses.Links(
+    "DELETE", "유저 index까지의 채팅 일부 지우기",
+    _CREATE_ROOM, _LOAD_LOG, _SAVE_LOG, _UPDATE_LOG, _DELETE_ROOM,
+    description=_INDEX_DESCRIPTION
+)
+
 @office_router.delete("/users/{user_id}/documents/{document_id}/idx/{index}", summary="유저 index까지의 채팅 일부 지우기")
 async def delete_chat_log(
     req: Request,
@@ -389,53 +360,92 @@ async def delete_chat_log(
             router="office"
         )
         response_data = {
-            "Result": response_message,
-            "_links": [
-                {
-                    "href": str(req.url),
-                    "rel": "self",
-                    "type": "DELETE",
-                    "title": "유저 index까지의 채팅 일부 지우기",
-                    "templated": True,
-                    "description": "index 값까지의 채팅을 삭제하려는 인덱스(자연수 값: index > 0)를 URL에 교체하세요"
-                },
-                {
-                    "href": f"{str(req.base_url)}mongo/offices/users/{user_id}",
-                    "rel": f"/users/{user_id}",
-                    "type": "GET",
-                    "title": "유저 채팅방 ID 생성",
-                },
-                {
-                    "href": f"{str(req.base_url)}mongo/offices/users/{user_id}/documents/{document_id}",
-                    "rel": f"/users/{user_id}/documents/{document_id}",
-                    "type": "GET",
-                    "title": "유저 채팅 불러오기",
-                },
-                {
-                    "href": f"{str(req.base_url)}mongo/offices/users/{user_id}/documents/{document_id}",
-                    "rel": f"/users/{user_id}/documents/{document_id}",
-                    "type": "PUT",
-                    "title": "유저 채팅 저장",
-                },
-                {
-                    "href": f"{str(req.base_url)}mongo/offices/users/{user_id}/documents/{document_id}",
-                    "rel": f"/users/{user_id}/documents/{document_id}",
-                    "type": "PATCH",
-                    "title": "유저 최근 채팅 업데이트",
-                },
-                {
-                    "href": f"{str(req.base_url)}mongo/offices/users/{user_id}/documents/{document_id}",
-                    "rel": f"/users/{user_id}/documents/{document_id}",
-                    "type": "DELETE",
-                    "title": "유저 채팅방 지우기",
-                },
-            ]
+            "Result": response_message
         }
         
-        return JSONResponse(response_data)
+        return responses.hateoas(req, response_data, DELETE_LOG_LINKS, user_id=user_id, document_id=document_id)
     except ValidationError as e:
         raise error_tools.BadRequestException(detail=str(e))
     except error_tools.NotFoundException as e:
         raise error_tools.NotFoundException(detail=str(e))
     except Exception as e:
         raise error_tools.InternalServerErrorException(detail=str(e))
+
+SUMMARIES_LINKS = responses.Links(
+    "POST", "유저 채팅방 요약 목록 불러오기",
+    _CREATE_ROOM_POST, _LOAD_ANY_LOG
+)
+
+@office_router.post("/users/{user_id}/summaries", summary="유저 채팅방 요약 목록 불러오기")
+@routing.read_only
+async def load_chat_summaries(
+    req: Request,
+    request: schema.Room_Summary_Request,
+    user_id: str = Path(..., description="유저 ID"),
+    mongo_handler: mongodb_client.MongoDBHandler = Depends(dependencies.get_mongo_handler)
+):
+    '''
+    여러 채팅방의 제목(첫 입력), 마지막 채팅 시간, 채팅 수를 한 번에 불러옵니다.
+    채팅 로그 전체를 불러오지 않으므로 채팅방 목록 화면에 사용합니다.
+    '''
+    try:
+        summaries = await mongo_handler.get_room_summaries(
+            user_id=user_id,
+            document_ids=request.document_ids,
+            router="office",
+            preview_length=request.preview_length
+        )
+
+        response_data = {
+            "summaries": summaries
+        }
+
+        return responses.hateoas(req, response_data, SUMMARIES_LINKS, user_id=user_id)
+    except ValidationError as e:
+        raise error_tools.BadRequestException(detail=str(e))
+    except Exception as e:
+        raise error_tools.InternalServerErrorException(detail=str(e))
+
+BULK_LINKS = responses.Links(
+    "POST", "유저 채팅 대량 저장",
+    _LOAD_ANY_LOG
+)
+
+@office_router.post("/users/{user_id}/documents/bulk", summary="유저 채팅 대량 저장")
+async def save_chat_logs_bulk(
+    req: Request,
+    request: schema.Office_Bulk_Request,
+    user_id: str = Path(..., description="유저 ID"),
+    mongo_handler: mongodb_client.MongoDBHandler = Depends(dependencies.get_mongo_handler)
+):
+    '''
+    유저의 여러 채팅방에 여러 채팅을 한 번에 저장합니다.
+    채팅방마다 연속된 index가 할당되며, 채팅방별 결과를 요청 순서대로 반환합니다.
+    '''
+    try:
+        items = []
+        for item in request.items:
+            turns = []
+            for turn in item.turns:
+                filtered_data = {key: value for key, value in turn.model_dump().items() if key != 'id'}
+
+                # output_data가 비어있거나 None인 경우 대체 문장 설정
+                if not filtered_data.get("output_data"):
+                    filtered_data["output_data"] = "서버 에러가 있습니다. 다시 시도해주세요."
+                turns.append(filtered_data)
+            items.append({"document_id": item.document_id, "turns": turns})
+
+        results = await mongo_handler.add_logs_bulk(
+            user_id=user_id,
+            items=items,
+            router="office"
+        )
+        response_data = {
+            "results": results
+        }
+
+        return responses.hateoas(req, response_data, BULK_LINKS, user_id=user_id)
+    except ValidationError as e:
+        raise error_tools.BadRequestException(detail=str(e))
+    except Exception as e:
+        raise error_tools.InternalServerErrorException(detail=str(e))
@@ -1,7 +1,7 @@
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Depends, Request
 from starlette.responses import JSONResponse
 
-from core import dependencies
+from core import dependencies, responses
 from schemas import schema
 from services import mysql_client, email_client
 from utils import error_tools
@@ -11,6 +11,7 @@ smtp_router = APIRouter()
 
 @smtp_router.post("/verification/send", summary="이메일 인증 코드 전송")
 async def send_verification_email(
+    req: Request,
     request: schema.Email_Request,
     mysql_handler: mysql_client.MySQLDBHandler = Depends(dependencies.get_mysql_handler)
 ):
@@ -20,13 +21,13 @@ async def send_verification_email(
     try:
         membership = await mysql_handler.get_membership_by_userid(request.user_id)
         if membership == "VIP":
-            return {"status": "exception", "message": "이미 인증된 계정입니다."}
+            return responses.payload(req, {"status": "exception", "message": "이미 인증된 계정입니다."})
 
         code = smtp_handler.generate_verification_code()
         await mysql_handler.create_verification_code(code, request.user_id)
         success = await smtp_handler.send_verification_email(code, request.email)
         if success:
-            return {"status": "success", "message": "인증 코드가 전송되었습니다. 이메일을 확인해주세요."}
+            return responses.payload(req, {"status": "success", "message": "인증 코드가 전송되었습니다. 이메일을 확인해주세요."})
         else:
             raise error_tools.InternalServerErrorException(detail="이메일 전송에 실패했습니다.")
     except Exception as e:
@@ -34,6 +35,7 @@ async def send_verification_email(
 
 @smtp_router.post("/verification/verify", summary="이메일 인증 코드 확인")
 async def verify_email_code(
+    req: Request,
     request: schema.Verification_Request,
     mysql_handler: mysql_client.MySQLDBHandler = Depends(dependencies.get_mysql_handler)
 ):
@@ -43,10 +45,10 @@ async def verify_email_code(
     try:
         result = await mysql_handler.code_verification(request.code, request.user_id, request.email)
         if result == "success":
-            return {
+            return responses.payload(req, {
                 "status": "success",
                 "message": "인증이 완료되었습니다."
-            }
+            })
 
         elif result == "code is expired":
             return JSONResponse(
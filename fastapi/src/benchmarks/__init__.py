@@ -0,0 +1,3 @@
+'''
+서버 설정을 정할 때 참고하는 성능 측정 스크립트입니다. 각 모듈을 src 디렉토리에서 python -m으로 실행합니다.
+'''
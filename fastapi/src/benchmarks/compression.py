@@ -0,0 +1,162 @@
+'''
+CompressionMiddleware의 압축 수준별 CPU 사용량과 전송 크기를 비교하는 스크립트입니다.
+
+채팅 로그 조회(GET .../documents/{document_id})와 같은 형식의 응답을 만들어 미들웨어를 직접 호출하고,
+응답 하나의 압축 시간, 압축 후 크기, 주어진 대역폭에서의 전송 시간(압축 시간 + 전송 시간)을 출력합니다.
+사용 예시 (src 디렉토리에서 실행):
+    python -m benchmarks.compression
+    python -m benchmarks.compression --turns 3000 --bandwidth 100 --bandwidth 1000
+'''
+import time
+import random
+import asyncio
+import argparse
+import datetime
+import statistics
+from typing import Dict, List, Optional, Tuple
+
+from core import responses
+from services import mongo_export
+from utils import compression
+
+# 대화 내용을 만들 때 사용하는 문장. 문장의 단어를 무작위로 섞어 실제 대화와 비슷한 압축률이 나오도록 함
+SENTENCES = (
+    "오늘 회의 자료를 정리해서 공유해 주실 수 있나요?",
+    "네, 요청하신 내용을 바탕으로 초안을 작성해 보았습니다.",
+    "지난주에 논의한 일정은 다음 주 수요일로 변경되었습니다.",
+    "고객 문의에 대한 답변은 아래와 같이 정리할 수 있습니다.",
+    "첫째, 계약 조건을 다시 확인해야 합니다. 둘째, 예산 범위를 조정해야 합니다.",
+    "Please summarize the quarterly report in three bullet points.",
+    "The deployment finished successfully and all health checks passed.",
+    "이메일 초안을 조금 더 정중한 표현으로 바꿔 주세요.",
+    "좋아요! 그럼 그 방향으로 진행해 볼게요.",
+    "추가로 궁금한 점이 있으면 언제든지 물어봐 주세요.",
+)
+
+def make_turns(count: int, seed: int = 0) -> List[Dict]:
+    """
+    count개의 대화 턴을 만듭니다. 응답(output_data)이 질문(input_data)보다 깁니다.
+    """
+    rng = random.Random(seed)
+    words = sorted({word for sentence in SENTENCES for word in sentence.split()})
+    start = datetime.datetime(2025, 1, 1, 9, 0, 0)
+    return [
+        {
+            "index": index,
+            "img_url": f"https://example.com/images/{rng.randrange(1000)}.png",
+            "input_data": " ".join(rng.choices(words, k=rng.randint(5, 20))),
+            "output_data": " ".join(rng.choices(words, k=rng.randint(30, 120))),
+            "chars": rng.randint(100, 400),
+            "tokens": rng.randint(60, 300),
+            "timestamp": (start + datetime.timedelta(minutes=index)).strftime("%Y-%m-%d %H:%M:%S"),
+        }
+        for index in range(1, count + 1)
+    ]
+
+def make_body(turns: List[Dict]) -> bytes:
+    """
+    채팅 로그 조회 응답과 같은 형식의 JSON 본문을 만듭니다.
+    """
+    return responses.FastJSONResponse({"id": "benchmark", "character_idx": 1, "value": turns}).body
+
+def make_chunks(turns: List[Dict]) -> List[bytes]:
+    """
+    내보내기(NDJSON) 응답과 같은 크기의 조각으로 나눈 본문을 만듭니다.
+    """
+    body = b"".join(responses.FastJSONResponse(turn).body + b"\n" for turn in turns)
+    return [body[i:i + mongo_export.CHUNK_SIZE] for i in range(0, len(body), mongo_export.CHUNK_SIZE)]
+
+def make_app(chunks: List[bytes], media_type: str):
+    """
+    chunks를 본문으로 전송하는 ASGI 앱을 만듭니다. 조각이 하나이면 Content-Length를 붙입니다.
+    """
+    headers = [(b"content-type", media_type.encode("latin-1"))]
+    if len(chunks) == 1:
+        headers.append((b"content-length", str(len(chunks[0])).encode("latin-1")))
+
+    async def app(scope, receive, send):
+        await send({"type": "http.response.start", "status": 200, "headers": list(headers)})
+        for i, chunk in enumerate(chunks):
+            await send({"type": "http.response.body", "body": chunk, "more_body": i < len(chunks) - 1})
+
+    return app
+
+async def measure(app, repeat: int, accept_encoding: Optional[str]) -> Tuple[float, int]:
+    """
+    app을 repeat번 호출하여 응답 하나의 처리 시간 중앙값(ms)과 전송한 본문 크기를 반환합니다.
+    """
+    scope = {"type": "http", "method": "GET", "path": "/", "headers": []}
+    if accept_encoding:
+        scope["headers"] = [(b"accept-encoding", accept_encoding.encode("latin-1"))]
+
+    async def receive():
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    timings, size = [], 0
+    for _ in range(repeat):
+        sent = []
+
+        async def send(message):
+            if message["type"] == "http.response.body":
+                sent.append(len(message.get("body", b"")))
+
+        started = time.perf_counter()
+        await app(scope, receive, send)
+        timings.append((time.perf_counter() - started) * 1000)
+        size = sum(sent)
+    return statistics.median(timings), size
+
+def settings(include_brotli: bool) -> List[Tuple[str, int]]:
+    """
+    비교할 (인코딩, 압축 수준) 목록을 반환합니다.
+    """
+    levels = [("identity", 0)] + [("gzip", level) for level in (1, 4, 6, 9)]
+    if include_brotli:
+        levels += [("br", quality) for quality in (1, 4, 6, 9)]
+    return levels
+
+async def run(name: str, chunks: List[bytes], media_type: str, repeat: int, bandwidths: List[float]) -> None:
+    """
+    한 종류의 응답을 압축 설정별로 측정하여 표로 출력합니다.
+    """
+    original = sum(len(chunk) for chunk in chunks)
+    print(f"\n## {name}: {original / 1024:.1f} KiB, 조각 {len(chunks)}개")
+    header = f"{'encoding':<10}{'level':>6}{'size(KiB)':>11}{'ratio':>8}{'cpu(ms)':>9}{'MB/s':>8}"
+    header += "".join(f"{f'{bandwidth:g}Mbps(ms)':>14}" for bandwidth in bandwidths)
+    print(header)
+
+    for encoding, level in settings(compression.brotli is not None):
+        middleware = compression.CompressionMiddleware(
+            make_app(chunks, media_type),
+            enabled=encoding != "identity",
+            gzip_level=level or 6,
+            brotli_quality=level or 4
+        )
+        # 첫 호출은 측정에서 제외
+        await measure(middleware, 1, encoding)
+        cpu, size = await measure(middleware, repeat, encoding)
+        if encoding == "identity":
+            # 미들웨어를 거치지 않은 전송 시간과 비교하기 위한 기준
+            cpu, size = 0.0, original
+        throughput = f"{original / 1e6 / (cpu / 1000):.0f}" if cpu else "-"
+        row = f"{encoding:<10}{level or '-':>6}{size / 1024:>11.1f}{original / size:>8.2f}{cpu:>9.2f}{throughput:>8}"
+        # 전송 시간 = 압축 시간 + 압축한 크기를 대역폭으로 보내는 시간
+        row += "".join(f"{cpu + size * 8 / (bandwidth * 1e6) * 1000:>14.2f}" for bandwidth in bandwidths)
+        print(row)
+
+async def main(argv: List[str] = None):
+    parser = argparse.ArgumentParser(description="응답 압축 수준별 CPU/전송 크기 비교 도구")
+    parser.add_argument("--turns", type=int, action="append", help="대화 턴 수 (여러 번 지정 가능, 기본값: 100, 1000)")
+    parser.add_argument("--repeat", type=int, default=20, help="설정마다 반복 횟수 (기본값: 20)")
+    parser.add_argument("--bandwidth", type=float, action="append", help="전송 시간을 계산할 대역폭 Mbps (기본값: 100, 1000)")
+    args = parser.parse_args(argv)
+    bandwidths = args.bandwidth or [100, 1000]
+
+    print(f"brotli: {'사용 가능' if compression.brotli is not None else '설치되지 않음 (gzip만 측정)'}")
+    for count in args.turns or [100, 1000]:
+        turns = make_turns(count)
+        await run(f"채팅 로그 조회 {count}턴", [make_body(turns)], "application/json", args.repeat, bandwidths)
+        await run(f"NDJSON 내보내기 {count}턴", make_chunks(turns), "application/x-ndjson", args.repeat, bandwidths)
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,138 @@
+'''
+요청 로깅 미들웨어의 요청당 처리 시간을 비교하는 스크립트입니다.
+
+이전 구성(BaseHTTPMiddleware 기반 ErrorLoggingMiddleware 1개와 RouteLoggingMiddleware 2개)과
+현재 구성(ASGI RouteLoggingMiddleware 1개)을 미들웨어가 없는 앱과 함께 측정하여 요청당 추가 시간을 출력합니다.
+네트워크를 거치지 않고 ASGI 앱을 직접 호출하므로 미들웨어 자체의 비용만 측정합니다.
+사용 예시 (src 디렉토리에서 실행):
+    python -m benchmarks.middleware
+    python -m benchmarks.middleware --requests 20000
+'''
+import time
+import asyncio
+import logging
+import argparse
+import statistics
+from typing import Any, Callable, List, Tuple
+
+from fastapi import FastAPI, Request
+from fastapi.responses import StreamingResponse
+from starlette.middleware.base import BaseHTTPMiddleware
+
+from utils import error_tools
+
+class LegacyErrorLoggingMiddleware(BaseHTTPMiddleware):
+    '''
+    이전 구성의 ErrorLoggingMiddleware입니다.
+    '''
+    async def dispatch(self, request: Request, call_next: Callable) -> Any:
+        try:
+            return await call_next(request)
+        except Exception as exc:
+            raise exc
+
+class LegacyRouteLoggingMiddleware(BaseHTTPMiddleware):
+    '''
+    이전 구성의 RouteLoggingMiddleware입니다.
+    '''
+    async def dispatch(self, request: Request, call_next: Callable) -> Any:
+        response = await call_next(request)
+        if response.status_code == 404:
+            error_tools.logger.warning(
+                f"Route Not Found: {request.url.path} | Method: {request.method} | IP: {request.client.host}"
+            )
+        return response
+
+def make_app(stack: str) -> FastAPI:
+    """
+    JSON과 스트리밍 라우트가 있는 앱을 만들고 stack에 해당하는 미들웨어를 등록합니다.
+
+    :param stack: 'none', 'legacy' 또는 'current'
+    """
+    app = FastAPI()
+
+    @app.get("/items/{item_id}")
+    async def read_item(item_id: int):
+        return {"id": item_id, "value": "x" * 100}
+
+    @app.get("/stream")
+    async def stream():
+        async def chunks():
+            for _ in range(10):
+                yield b"x" * 1024
+        return StreamingResponse(chunks(), media_type="application/x-ndjson")
+
+    if stack == "legacy":
+        app.add_middleware(LegacyErrorLoggingMiddleware)
+        app.add_middleware(LegacyRouteLoggingMiddleware)
+        app.add_middleware(LegacyRouteLoggingMiddleware)
+    elif stack == "current":
+        app.add_middleware(error_tools.RouteLoggingMiddleware)
+    return app
+
+async def measure(app: FastAPI, path: str, requests: int) -> Tuple[float, float]:
+    """
+    path를 requests번 요청하여 요청당 처리 시간의 중앙값과 p99(µs)를 반환합니다.
+    """
+    scope = {
+        "type": "http",
+        "asgi": {"version": "3.0"},
+        "http_version": "1.1",
+        "method": "GET",
+        "scheme": "http",
+        "path": path,
+        "raw_path": path.encode("latin-1"),
+        "root_path": "",
+        "query_string": b"",
+        "headers": [(b"host", b"benchmark")],
+        "client": ("127.0.0.1", 50000),
+        "server": ("benchmark", 80),
+        "app": app,
+    }
+
+    def make_receive():
+        # 서버처럼 요청 본문을 한 번 전달한 뒤에는 연결이 끊길 때까지 대기
+        messages = [{"type": "http.request", "body": b"", "more_body": False}]
+
+        async def receive():
+            if messages:
+                return messages.pop()
+            await asyncio.Event().wait()
+
+        return receive
+
+    async def send(message):
+        pass
+
+    # 미들웨어 스택은 첫 요청에서 만들어지므로 측정에서 제외
+    for _ in range(min(requests // 10, 500)):
+        await app(dict(scope), make_receive(), send)
+
+    timings: List[float] = []
+    for _ in range(requests):
+        receive = make_receive()
+        started = time.perf_counter()
+        await app(dict(scope), receive, send)
+        timings.append((time.perf_counter() - started) * 1e6)
+    timings.sort()
+    return statistics.median(timings), timings[int(len(timings) * 0.99) - 1]
+
+async def main(argv: List[str] = None):
+    parser = argparse.ArgumentParser(description="요청 로깅 미들웨어 요청당 처리 시간 비교 도구")
+    parser.add_argument("--requests", type=int, default=5000, help="경로와 구성마다 요청 수 (기본값: 5000)")
+    args = parser.parse_args(argv)
+
+    # 미들웨어 자체의 비용만 비교하도록 404 요청의 로그는 출력하지 않음
+    error_tools.logger.setLevel(logging.ERROR)
+
+    for name, path in (("JSON", "/items/1"), ("스트리밍 10조각", "/stream"), ("404", "/missing")):
+        print(f"\n## {name} ({path})")
+        print(f"{'stack':<10}{'median(µs)':>12}{'p99(µs)':>10}{'overhead(µs)':>14}")
+        baseline = None
+        for stack in ("none", "legacy", "current"):
+            median, p99 = await measure(make_app(stack), path, args.requests)
+            baseline = median if baseline is None else baseline
+            print(f"{stack:<10}{median:>12.1f}{p99:>10.1f}{median - baseline:>14.1f}")
+
+if __name__ == "__main__":
+    asyncio.run(main())
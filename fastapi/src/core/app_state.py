@@ -43,6 +43,13 @@ async def initialize_handlers():
         except Exception as e:
             print(f"{RED}ERROR{RESET}:     MySQL 연결 오류: {str(e)}")
 
+    if mongo_handler is not None:
+        try:
+            await mongo_handler.initialize()
+            print(f"{GREEN}INFO{RESET}:     MongoDB 인덱스 관리자가 준비되었습니다.")
+        except Exception as e:
+            print(f"{RED}ERROR{RESET}:     MongoDB 인덱스 준비 오류: {str(e)}")
+
 async def cleanup_handlers():
     """
     애플리케이션 종료 시 모든 DB 핸들러 정리
@@ -56,6 +63,20 @@ async def cleanup_handlers():
         except Exception as e:
             print(f"{RED}ERROR{RESET}:     MySQL 연결 종료 오류: {str(e)}")
 
+    if mongo_handler is not None:
+        try:
+            stats = await mongo_handler.flush_writes()
+            if stats["enabled"]:
+                print(f"{GREEN}INFO{RESET}:     MongoDB write-behind 버퍼를 비웠습니다. (반영 {stats['flushed_turns']}건, 실패 {stats['failed_turns']}건)")
+        except Exception as e:
+            print(f"{RED}ERROR{RESET}:     MongoDB write-behind 버퍼 반영 오류: {str(e)}")
+
+        try:
+            await mongo_handler.close()
+            print(f"{GREEN}INFO{RESET}:     MongoDB 연결이 종료되었습니다.")
+        except Exception as e:
+            print(f"{RED}ERROR{RESET}:     MongoDB 연결 종료 오류: {str(e)}")
+
 def get_mysql_handler() -> Optional[mysql_client.MySQLDBHandler]:
     """MySQL 핸들러 인스턴스를 반환하는 함수"""
     return mysql_handler
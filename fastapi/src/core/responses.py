@@ -0,0 +1,256 @@
+'''
+컨트롤러 응답(HATEOAS 링크와 JSON 직렬화)을 만드는 모듈입니다.
+
+라우트마다 반복되는 '_links' 목록은 모듈을 불러올 때 Links 템플릿으로 한 번만 만들어 두고,
+요청마다 base URL과 ID만 채워 넣습니다.
+응답은 orjson으로 직렬화하며, orjson이 설치되지 않은 환경에서는 표준 json 모듈을 사용합니다.
+
+서비스 간 호출처럼 링크와 안내 문구가 필요 없는 클라이언트는 'Prefer: return=minimal' 헤더(RFC 7240)로
+'_links'와 사람이 읽는 메시지 필드('Result', 'message')를 뺀 간결한 응답을 받을 수 있습니다.
+
+Accept 헤더가 JSON보다 MessagePack('application/msgpack')을 우선하면 같은 내용을 MessagePack으로 직렬화합니다.
+msgpack 패키지가 설치되지 않은 환경에서는 JSON으로 응답합니다.
+'''
+import datetime
+from typing import Any, Dict, List, Mapping, Optional
+
+from fastapi import Request, Response
+from fastapi.responses import JSONResponse
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+
+# MessagePack으로 인식하는 미디어 타입 (첫 번째 값을 응답에 사용)
+MSGPACK_MEDIA_TYPES = ("application/msgpack", "application/x-msgpack", "application/vnd.msgpack")
+
+# 응답 형식과 내용이 달라지는 요청 헤더
+VARY = "Accept, Prefer"
+
+# 간결한 응답을 요청하는 Prefer 헤더 값
+MINIMAL_PREFERENCE = "return=minimal"
+
+# 간결한 응답에서 제외하는 사람이 읽는 메시지 필드
+MESSAGE_FIELDS = ("Result", "message")
+
+def is_minimal(req: Request) -> bool:
+    """
+    요청의 Prefer 헤더에 'return=minimal'이 있는지 확인합니다.
+    """
+    prefer = req.headers.get("prefer")
+    if not prefer:
+        return False
+    for preference in prefer.split(","):
+        if preference.split(";", 1)[0].strip().replace(" ", "").lower() == MINIMAL_PREFERENCE:
+            return True
+    return False
+
+def _quality(accept: str, media_types: tuple) -> float:
+    """
+    Accept 헤더에서 media_types에 해당하는 가장 구체적인 범위의 q 값을 반환합니다. 해당하는 범위가 없으면 0입니다.
+    """
+    best, specificity = 0.0, -1
+    main_types = {media_type.split("/", 1)[0] + "/*" for media_type in media_types}
+    for media_range in accept.split(","):
+        media_type, *params = [part.strip() for part in media_range.split(";")]
+        media_type = media_type.lower()
+        if media_type in media_types:
+            rank = 2
+        elif media_type in main_types:
+            rank = 1
+        elif media_type == "*/*":
+            rank = 0
+        else:
+            continue
+        quality = 1.0
+        for param in params:
+            name, _, value = param.partition("=")
+            if name.strip().lower() == "q":
+                try:
+                    quality = float(value)
+                except ValueError:
+                    quality = 0.0
+        if rank > specificity:
+            best, specificity = quality, rank
+    return best
+
+def accepts_msgpack(req: Request) -> bool:
+    """
+    Accept 헤더가 MessagePack을 명시하고 JSON보다 낮지 않은 우선순위를 주었는지 확인합니다.
+    """
+    accept = req.headers.get("accept")
+    if msgpack is None or not accept or "msgpack" not in accept:
+        return False
+    msgpack_quality = _quality(accept, MSGPACK_MEDIA_TYPES)
+    return msgpack_quality > 0 and msgpack_quality >= _quality(accept, ("application/json",))
+
+def representation(req: Request) -> str:
+    """
+    요청에 대해 payload/hateoas가 만들 응답 표현(미디어 타입, 간결한 응답 여부)을 문자열로 반환합니다.
+    """
+    media_type = MSGPACK_MEDIA_TYPES[0] if accepts_msgpack(req) else "application/json"
+    return f"{media_type}; {MINIMAL_PREFERENCE}" if is_minimal(req) else media_type
+
+def is_msgpack_body(req: Request) -> bool:
+    """
+    요청 본문의 Content-Type이 MessagePack인지 확인합니다.
+    """
+    content_type = req.headers.get("content-type")
+    return content_type is not None and content_type.split(";", 1)[0].strip().lower() in MSGPACK_MEDIA_TYPES
+
+def unpack(body: bytes) -> Any:
+    """
+    MessagePack 요청 본문을 복원합니다.
+
+    :raises RuntimeError: msgpack 패키지가 설치되지 않은 경우
+    :raises ValueError: 올바른 MessagePack이 아닌 경우
+    """
+    if msgpack is None:
+        raise RuntimeError("MessagePack 요청을 처리하려면 msgpack 패키지를 설치해야 합니다.")
+    try:
+        return msgpack.unpackb(body, raw=False, strict_map_key=True)
+    except (msgpack.ExtraData, msgpack.FormatError, msgpack.StackError, ValueError, TypeError) as e:
+        raise ValueError(f"Invalid MessagePack body: {str(e)}") from e
+
+def _msgpack_default(value: Any) -> Any:
+    # orjson과 같이 날짜는 ISO 8601 문자열로 직렬화
+    if isinstance(value, (datetime.datetime, datetime.date)):
+        return value.isoformat()
+    raise TypeError(f"Object of type {type(value).__name__} is not MessagePack serializable")
+
+class MessagePackResponse(Response):
+    '''
+    MessagePack으로 직렬화하는 응답입니다.
+    '''
+    media_type = MSGPACK_MEDIA_TYPES[0]
+
+    def render(self, content: Any) -> bytes:
+        return msgpack.packb(content, default=_msgpack_default, use_bin_type=True)
+
+class FastJSONResponse(JSONResponse):
+    '''
+    orjson으로 직렬화하는 JSONResponse입니다. 출력 형식(UTF-8, 공백 없음)은 JSONResponse와 같습니다.
+    '''
+    def render(self, content: Any) -> bytes:
+        if orjson is None:
+            return super().render(content)
+        return orjson.dumps(content, option=orjson.OPT_NON_STR_KEYS)
+
+class Link:
+    '''
+    HATEOAS 링크 하나의 템플릿입니다.
+    href와 rel은 str.format_map 형식이며 '{base}'는 요청의 base URL로 채워집니다.
+    URL에 그대로 남겨야 하는 자리 표시자는 '{{index}}'처럼 중괄호를 두 번 씁니다.
+    '''
+    __slots__ = ("href", "rel", "fields")
+
+    def __init__(self, method: str, title: Optional[str], href: str, rel: str, description: Optional[str] = None) -> None:
+        """
+        :param method: HTTP 메서드 ('type' 필드)
+        :param title: 링크 제목 (None이면 생략)
+        :param href: 링크 URL 템플릿
+        :param rel: 관계 템플릿
+        :param description: 주어지면 'templated': True와 함께 사용 방법 설명을 추가
+        """
+        self.href = href
+        self.rel = rel
+        fields: Dict[str, Any] = {"type": method}
+        if title is not None:
+            fields["title"] = title
+        if description is not None:
+            fields.update(templated=True, description=description)
+        self.fields = fields
+
+    def render(self, values: Mapping[str, str]) -> Dict:
+        return {"href": self.href.format_map(values), "rel": self.rel.format_map(values), **self.fields}
+
+class Links:
+    '''
+    라우트 하나의 '_links' 템플릿입니다. 첫 번째 링크는 요청 URL을 가리키는 'self' 링크입니다.
+    '''
+    __slots__ = ("self_fields", "links", "next_fields")
+
+    def __init__(
+        self,
+        method: str,
+        title: Optional[str],
+        *links: Link,
+        description: Optional[str] = None,
+        next_title: Optional[str] = None
+    ) -> None:
+        """
+        :param method: 라우트의 HTTP 메서드
+        :param title: 라우트 제목 (None이면 생략)
+        :param links: 'self' 다음에 붙일 링크 템플릿
+        :param description: 주어지면 'self' 링크에 'templated': True와 함께 추가
+        :param next_title: 페이지를 나누는 라우트의 다음 페이지('next') 링크 제목
+        """
+        self.self_fields = Link(method, title, "", "self", description).fields
+        self.links = links
+        self.next_fields = Link("GET", next_title, "", "next").fields
+
+    def render(self, req: Request, next_cursor: Optional[str] = None, **ids: str) -> List[Dict]:
+        """
+        요청의 URL과 ID로 '_links' 목록을 만듭니다.
+
+        :param next_cursor: 주어지면 요청 URL의 cursor를 바꾼 'next' 링크를 'self' 다음에 추가
+        :param ids: 템플릿의 자리 표시자 값 (user_id, document_id 등)
+        """
+        values = {"base": str(req.base_url), **ids}
+        links = [{"href": str(req.url), "rel": "self", **self.self_fields}]
+        if next_cursor:
+            links.append({"href": str(req.url.include_query_params(cursor=next_cursor)), "rel": "next", **self.next_fields})
+        links.extend(link.render(values) for link in self.links)
+        return links
+
+def payload(
+    req: Request,
+    data: Dict,
+    headers: Optional[Mapping[str, str]] = None,
+    status_code: int = 200
+) -> FastJSONResponse:
+    """
+    응답 데이터로 JSON 응답을 만듭니다. 'Prefer: return=minimal' 요청에는 메시지 필드를 제외합니다.
+
+    :param data: 응답 데이터
+    :param headers: 추가 응답 헤더
+    :param status_code: 응답 상태 코드
+    """
+    headers = {**(headers or {}), "Vary": VARY}
+    if is_minimal(req):
+        data = {key: value for key, value in data.items() if key not in MESSAGE_FIELDS}
+        headers["Preference-Applied"] = MINIMAL_PREFERENCE
+    response_class = MessagePackResponse if accepts_msgpack(req) else FastJSONResponse
+    return response_class(data, status_code=status_code, headers=headers)
+
+def hateoas(
+    req: Request,
+    data: Dict,
+    links: Links,
+    headers: Optional[Mapping[str, str]] = None,
+    next_cursor: Optional[str] = None,
+    **ids: str
+) -> FastJSONResponse:
+    """
+    응답 데이터 뒤에 '_links'를 붙인 JSON 응답을 만듭니다.
+    'Prefer: return=minimal' 요청에는 '_links'와 메시지 필드 없이 응답 데이터만 반환합니다.
+
+    :param data: 응답 데이터
+    :param links: 라우트의 링크 템플릿
+    :param headers: 추가 응답 헤더
+    :param next_cursor: 다음 페이지 cursor (있으면 'next' 링크 추가)
+    :param ids: 링크 템플릿의 자리 표시자 값
+    """
+    if is_minimal(req):
+        return payload(req, data, headers)
+    response_class = MessagePackResponse if accepts_msgpack(req) else FastJSONResponse
+    return response_class(
+        {**data, "_links": links.render(req, next_cursor, **ids)},
+        headers={**(headers or {}), "Vary": VARY}
+    )
@@ -0,0 +1,152 @@
+import hashlib
+from typing import Awaitable, Callable
+
+from fastapi import Request, Response
+from fastapi.routing import APIRoute
+from starlette.exceptions import HTTPException
+
+from . import app_state, responses
+from utils import error_tools
+
+IDEMPOTENCY_HEADER = "Idempotency-Key"
+IDEMPOTENT_METHODS = ("POST", "PUT", "PATCH")
+MAX_KEY_LENGTH = 255
+
+# 응답 형식을 정하는 요청 헤더. 같은 키의 재시도가 다른 형식을 요청하면 다른 요청으로 처리
+REPRESENTATION_HEADERS = ("accept", "prefer")
+
+# 재사용 응답에 다시 붙이지 않는 헤더 (연결별 헤더와 응답을 만들 때 다시 계산하는 헤더)
+UNSTORED_HEADERS = frozenset((
+    "connection", "keep-alive", "proxy-authenticate", "proxy-authorization", "te", "trailer", "trailers",
+    "transfer-encoding", "upgrade", "content-length", "content-type", "content-encoding",
+))
+
+READ_ONLY_ATTRIBUTE = "__read_only__"
+
+def read_only(endpoint: Callable) -> Callable:
+    """
+    조회만 하는 POST 엔드포인트를 Idempotency-Key 처리에서 제외합니다. 라우트 데코레이터 아래에 붙입니다.
+    """
+    setattr(endpoint, READ_ONLY_ATTRIBUTE, True)
+    return endpoint
+
+def _fingerprint(request: Request, body: bytes) -> str:
+    """
+    요청 내용(쿼리, 응답 형식 헤더, 본문)의 해시를 반환합니다.
+    """
+    digest = hashlib.sha256(request.url.query.encode("utf-8"))
+    for name in REPRESENTATION_HEADERS:
+        digest.update(b"\n" + request.headers.get(name, "").encode("latin-1"))
+    digest.update(b"\n" + body)
+    return digest.hexdigest()
+
+async def _finish(operation: Awaitable) -> None:
+    """
+    처리 결과 기록에 실패해도 이미 처리한 요청의 응답은 그대로 반환하도록 로그만 남깁니다.
+    """
+    try:
+        await operation
+    except Exception as e:
+        error_tools.logger.warning(f"Idempotency store update failed: {str(e)}")
+
+class MessagePackRoute(APIRoute):
+    '''
+    Content-Type이 MessagePack인 요청 본문을 복원하여 JSON 본문과 같은 방식으로 Pydantic 스키마 검증을 거치게 하는 라우트 클래스입니다.
+    '''
+    def get_route_handler(self) -> Callable:
+        original_route_handler = super().get_route_handler()
+
+        async def route_handler(request: Request) -> Response:
+            if not responses.is_msgpack_body(request):
+                return await original_route_handler(request)
+
+            body = await request.body()
+            try:
+                decoded = responses.unpack(body) if body else None
+            except RuntimeError as e:
+                raise error_tools.UnsupportedMediaTypeException(str(e))
+            except ValueError as e:
+                raise error_tools.BadRequestException(str(e))
+
+            # FastAPI는 JSON 본문만 검증하므로 복원한 값을 JSON 본문으로 전달
+            headers = [(key, value) for key, value in request.scope["headers"] if key != b"content-type"]
+            headers.append((b"content-type", b"application/json"))
+            decoded_request = Request({**request.scope, "headers": headers}, request.receive)
+            decoded_request._body = body
+            if body:
+                decoded_request._json = decoded
+            return await original_route_handler(decoded_request)
+
+        return route_handler
+
+class IdempotentRoute(MessagePackRoute):
+    '''
+    Idempotency-Key 헤더가 있는 쓰기 요청(POST/PUT/PATCH)을 한 번만 처리하는 라우트 클래스입니다.
+    같은 키의 재시도에는 처음 반환한 응답을 'Idempotency-Replayed: true' 헤더와 함께 다시 반환합니다.
+    헤더가 없는 요청은 그대로 처리합니다.
+    '''
+    def get_route_handler(self) -> Callable:
+        original_route_handler = super().get_route_handler()
+        if getattr(self.endpoint, READ_ONLY_ATTRIBUTE, False):
+            return original_route_handler
+
+        async def route_handler(request: Request) -> Response:
+            idempotency_key = request.headers.get(IDEMPOTENCY_HEADER)
+            mongo_handler = app_state.get_mongo_handler()
+            if (
+                idempotency_key is None
+                or request.method not in IDEMPOTENT_METHODS
+                or mongo_handler is None
+                or not mongo_handler.idempotency.enabled
+            ):
+                return await original_route_handler(request)
+
+            if not idempotency_key or len(idempotency_key) > MAX_KEY_LENGTH:
+                raise error_tools.BadRequestException(f"{IDEMPOTENCY_HEADER}는 1~{MAX_KEY_LENGTH}자여야 합니다.")
+
+            store = mongo_handler.idempotency
+            scope = f"{request.method}:{request.url.path}:{idempotency_key}"
+            fingerprint = _fingerprint(request, await request.body())
+
+            try:
+                stored = await store.begin(scope, fingerprint)
+            except HTTPException:
+                raise
+            except Exception as e:
+                # 캐시 백엔드 장애 시 중복 제거 없이 처리
+                store.errors += 1
+                error_tools.logger.warning(f"Idempotency store unavailable, processing without deduplication: {str(e)}")
+                return await original_route_handler(request)
+
+            if stored is not None:
+                response = Response(
+                    content=store.decode_body(stored),
+                    status_code=stored["status_code"],
+                    media_type=stored["media_type"]
+                )
+                response.raw_headers.extend(
+                    (name.encode("latin-1"), value.encode("latin-1")) for name, value in stored.get("headers", [])
+                )
+                response.raw_headers.append((b"idempotency-replayed", b"true"))
+                return response
+
+            try:
+                response = await original_route_handler(request)
+            except BaseException:
+                await _finish(store.release(scope))
+                raise
+
+            # 성공한 응답만 저장하고, 실패한 요청은 재시도 시 다시 처리
+            body = getattr(response, "body", None)
+            if 200 <= response.status_code < 300 and body is not None:
+                headers = [
+                    (name.decode("latin-1"), value.decode("latin-1"))
+                    for name, value in response.raw_headers
+                    if name.decode("latin-1").lower() not in UNSTORED_HEADERS
+                ]
+                await _finish(store.complete(scope, fingerprint, response.status_code, response.media_type, body, headers))
+            else:
+                await _finish(store.release(scope))
+            return response
+
+        return route_handler
@@ -1,5 +1,6 @@
 import re
 import uuid
+from typing import List
 from pydantic import BaseModel, Field, field_validator, conint
 
 class Validators:
@@ -14,6 +15,16 @@ class Validators:
             raise ValueError('유효한 UUID 형식이 아닙니다.')
         return v
 
+    @staticmethod
+    def validate_unique_documents(v: list) -> list:
+        """
+        대량 추가 요청의 채팅방 ID 중복 검증 함수
+        """
+        document_ids = [item.document_id for item in v]
+        if len(document_ids) != len(set(document_ids)):
+            raise ValueError('채팅방 ID가 중복되었습니다. 같은 채팅방의 채팅은 하나의 항목에 모아서 요청하세요.')
+        return v
+
     @staticmethod
     def validate_email(v: str) -> str:
         """
@@ -111,6 +122,29 @@ class CommonFields:
         min_length=6,
         max_length=6,
     )
+    document_ids_set = Field(
+        examples=[["123e4567-e89b-12d3-a456-426614174000"]],
+        title="채팅방 id 목록",
+        min_length=1, max_length=500,
+        description="한 번에 조회할 수 있는 채팅방은 최대 500개"
+    )
+    preview_length_set = Field(
+        default=50,
+        examples=[50],
+        title="제목 길이",
+        ge=1, le=500,
+        description="제목으로 사용할 첫 입력 문장의 최대 글자 수"
+    )
+    bulk_turns_set = Field(
+        title="추가할 채팅 목록",
+        min_length=1, max_length=1000,
+        description="채팅방 하나에 한 번에 추가할 수 있는 채팅은 최대 1000개"
+    )
+    bulk_items_set = Field(
+        title="채팅방별 추가 요청 목록",
+        min_length=1, max_length=100,
+        description="한 번에 요청할 수 있는 채팅방은 최대 100개이며, 채팅방 ID는 중복될 수 없음"
+    )
 
 # Office ---------------------------------------------------------------------------------------------------
 
@@ -122,6 +156,17 @@ class Office_Update_Request(BaseModelWithCustomDump):
     input_data: str = CommonFields.input_data_set
     output_data: str = CommonFields.output_data_set
 
+class Office_Bulk_Item(BaseModel):
+    document_id: str = CommonFields.id_set
+    turns: List[Office_Create_Request] = CommonFields.bulk_turns_set
+
+class Office_Bulk_Request(BaseModel):
+    items: List[Office_Bulk_Item] = CommonFields.bulk_items_set
+
+    @field_validator('items')
+    def check_items(cls, v):
+        return Validators.validate_unique_documents(v)
+
 # ChatBot ---------------------------------------------------------------------------------------------------
 
 class ChatBot_Id_Request(BaseModel):
@@ -137,6 +182,23 @@ class ChatBot_Update_Request(BaseModelWithCustomDump):
     input_data: str = CommonFields.input_data_set
     output_data: str = CommonFields.output_data_set
 
+class ChatBot_Bulk_Item(BaseModel):
+    document_id: str = CommonFields.id_set
+    turns: List[ChatBot_Create_Request] = CommonFields.bulk_turns_set
+
+class ChatBot_Bulk_Request(BaseModel):
+    items: List[ChatBot_Bulk_Item] = CommonFields.bulk_items_set
+
+    @field_validator('items')
+    def check_items(cls, v):
+        return Validators.validate_unique_documents(v)
+
+# Room Summary ---------------------------------------------------------------------------------------------------
+
+class Room_Summary_Request(BaseModel):
+    document_ids: List[str] = CommonFields.document_ids_set
+    preview_length: int = CommonFields.preview_length_set
+
 class Email_Request(BaseModel):
     user_id: str = CommonFields.user_id_set
     email: str = CommonFields.email_set
@@ -7,7 +7,7 @@ from contextlib import asynccontextmanager
 
 from api import mongo_controller, smtp_controller
 from core import app_state
-from utils import error_tools
+from utils import compression, error_tools
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
@@ -54,6 +54,15 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    # 클라이언트가 조건부 조회(If-None-Match)에 사용할 수 있도록 ETag 헤더 노출
+    expose_headers=["ETag"],
+)
+app.add_middleware(
+    compression.CompressionMiddleware,
+    enabled=os.getenv("HTTP_COMPRESSION", "true").lower() == "true",
+    minimum_size=int(os.getenv("HTTP_COMPRESSION_MIN_SIZE", 1024)),
+    gzip_level=int(os.getenv("HTTP_COMPRESSION_GZIP_LEVEL", 1)),
+    brotli_quality=int(os.getenv("HTTP_COMPRESSION_BROTLI_QUALITY", 1)),
 )
 app.openapi = custom_openapi
 
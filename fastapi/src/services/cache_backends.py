@@ -0,0 +1,344 @@
+'''
+MongoDB/MySQL 핸들러가 공유하는 캐시 백엔드 모듈입니다.
+
+- memory: 프로세스 메모리에 저장 (단일 워커 실행 및 테스트용)
+- redis: Redis 프로토콜을 사용하는 외부 캐시에 저장하여 여러 워커와 컨테이너가 공유
+
+CACHE_BACKEND(memory | redis), REDIS_URL 환경 변수로 선택합니다.
+여러 워커 간의 무효화는 VersionedCache의 버전 스탬프로 처리합니다.
+'''
+import os
+import json
+import time
+import random
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+
+from utils import error_tools
+
+# 키, 값 bytes 외에 항목마다 차지하는 대략적인 메모리(byte)
+ENTRY_OVERHEAD = 256
+
+# 버전 키 유지 시간(초). 만료되면 임의의 값으로 다시 시작하므로 이전 스탬프와 겹치지 않음
+VERSION_TTL = 24 * 60 * 60
+
+class CacheBackend:
+    '''
+    캐시 백엔드가 구현해야 하는 Redis 명령 집합입니다. 값은 모두 bytes입니다.
+    '''
+    name = "base"
+    # 여러 워커(프로세스)가 같은 저장소를 보는지 여부
+    shared = False
+
+    async def mget(self, keys: List[str]) -> List[Optional[bytes]]:
+        raise NotImplementedError
+
+    async def set(self, key: str, value: bytes, ttl: float, nx: bool = False) -> bool:
+        raise NotImplementedError
+
+    async def incr(self, key: str) -> int:
+        raise NotImplementedError
+
+    async def delete(self, *keys: str) -> None:
+        raise NotImplementedError
+
+    async def stats(self) -> Dict:
+        return {"backend": self.name}
+
+    async def close(self) -> None:
+        pass
+
+class MemoryCacheBackend(CacheBackend):
+    name = "memory"
+
+    def __init__(self, max_bytes: int) -> None:
+        '''
+        프로세스 메모리 캐시 백엔드. 최대 메모리를 넘으면 가장 오래 사용되지 않은 항목부터 제거합니다.
+
+        :param max_bytes: 캐시가 사용할 최대 메모리(byte)
+        '''
+        self.max_bytes = max_bytes
+        self._entries: "OrderedDict[str, Tuple[bytes, float]]" = OrderedDict()
+        self._bytes = 0
+        self.evictions = 0
+
+    @staticmethod
+    def _size(key: str, value: bytes) -> int:
+        return len(key) + len(value) + ENTRY_OVERHEAD
+
+    def _remove(self, key: str) -> None:
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            self._bytes -= self._size(key, entry[0])
+
+    def _live(self, key: str) -> Optional[bytes]:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        if entry[1] <= time.monotonic():
+            self._remove(key)
+            return None
+        self._entries.move_to_end(key)
+        return entry[0]
+
+    async def mget(self, keys: List[str]) -> List[Optional[bytes]]:
+        return [self._live(key) for key in keys]
+
+    async def set(self, key: str, value: bytes, ttl: float, nx: bool = False) -> bool:
+        if nx and self._live(key) is not None:
+            return False
+        self._remove(key)
+        self._entries[key] = (value, time.monotonic() + ttl)
+        self._bytes += self._size(key, value)
+        while self._bytes > self.max_bytes and self._entries:
+            evicted_key, (evicted, _) = self._entries.popitem(last=False)
+            self._bytes -= self._size(evicted_key, evicted)
+            self.evictions += 1
+        return True
+
+    async def incr(self, key: str) -> int:
+        current = self._live(key)
+        expires_at = self._entries[key][1] if current is not None else time.monotonic() + VERSION_TTL
+        value = int(current or 0) + 1
+        self._remove(key)
+        await self.set(key, str(value).encode(), expires_at - time.monotonic())
+        return value
+
+    async def delete(self, *keys: str) -> None:
+        for key in keys:
+            self._remove(key)
+
+    async def stats(self) -> Dict:
+        return {
+            "backend": self.name,
+            "entries": len(self._entries),
+            "bytes": self._bytes,
+            "max_bytes": self.max_bytes,
+            "evictions": self.evictions,
+        }
+
+class RedisCacheBackend(CacheBackend):
+    name = "redis"
+    shared = True
+
+    def __init__(self, url: str) -> None:
+        '''
+        Redis 프로토콜 캐시 백엔드. redis 패키지는 이 백엔드를 사용할 때만 필요합니다.
+
+        :param url: 연결 URL (예: redis://redis:6379/0)
+        '''
+        try:
+            import redis.asyncio as redis
+        except ImportError as e:
+            raise RuntimeError("CACHE_BACKEND=redis를 사용하려면 redis 패키지를 설치해야 합니다.") from e
+        self.client = redis.from_url(url)
+
+    async def mget(self, keys: List[str]) -> List[Optional[bytes]]:
+        return await self.client.mget(keys)
+
+    async def set(self, key: str, value: bytes, ttl: float, nx: bool = False) -> bool:
+        return bool(await self.client.set(key, value, px=max(int(ttl * 1000), 1), nx=nx))
+
+    async def incr(self, key: str) -> int:
+        return await self.client.incr(key)
+
+    async def delete(self, *keys: str) -> None:
+        if keys:
+            await self.client.delete(*keys)
+
+    async def stats(self) -> Dict:
+        memory = await self.client.info("memory")
+        return {
+            "backend": self.name,
+            "bytes": memory.get("used_memory"),
+            "max_bytes": memory.get("maxmemory"),
+        }
+
+    async def close(self) -> None:
+        await self.client.aclose()
+
+def create_cache_backend() -> CacheBackend:
+    '''
+    환경 변수에 설정된 캐시 백엔드를 생성합니다.
+    '''
+    backend = os.getenv("CACHE_BACKEND", "memory")
+    if backend == "redis":
+        return RedisCacheBackend(os.getenv("REDIS_URL", "redis://redis:6379/0"))
+    if backend == "memory":
+        return MemoryCacheBackend(int(os.getenv("CACHE_MEMORY_MAX_BYTES", 32 * 1024 * 1024)))
+    raise ValueError(f"지원하지 않는 CACHE_BACKEND 값입니다: {backend}")
+
+def shared_ttl(backend: CacheBackend, env_name: str, default: float) -> float:
+    '''
+    워커 간에 공유해야 하는 캐시의 유지 시간(초)을 환경 변수에서 읽습니다.
+    memory 백엔드는 워커마다 따로 저장하므로 환경 변수로 직접 설정한 경우(단일 워커 실행)에만 사용하고 경고를 기록합니다.
+
+    :param backend: 캐시가 사용할 백엔드
+    :param env_name: 유지 시간 환경 변수 이름
+    :param default: 공유 백엔드를 사용할 때의 기본값
+    :return: 유지 시간(초). 0이면 캐시를 사용하지 않음
+    '''
+    value = os.getenv(env_name)
+    if not value:
+        return default if backend.shared else 0
+    ttl = float(value)
+    if ttl > 0 and not backend.shared:
+        error_tools.logger.warning(
+            f"{env_name}={value} uses the {backend.name} cache backend, which is not shared between workers; "
+            f"set CACHE_BACKEND=redis when running more than one worker"
+        )
+    return ttl
+
+class VersionedCache:
+    def __init__(self, backend: CacheBackend, namespace: str, ttl: float, max_entry_bytes: int = 1024 * 1024) -> None:
+        '''
+        버전 스탬프로 무효화하는 캐시.
+
+        키마다 버전 키('{namespace}:ver:{key}')와 데이터 키('{namespace}:data:{key}')를 두고,
+        데이터에는 저장 당시의 버전을 함께 기록합니다. 쓰기는 버전을 증가시키므로
+        다른 워커가 저장한 항목도 스탬프가 맞지 않아 더 이상 사용되지 않습니다.
+
+        :param backend: 캐시 백엔드
+        :param namespace: 키 접두사
+        :param ttl: 데이터 유지 시간(초). 0이면 캐시를 사용하지 않음
+        :param max_entry_bytes: 항목 하나의 최대 크기. 이보다 큰 값은 캐시하지 않음
+        '''
+        self.backend = backend
+        self.namespace = namespace
+        self.ttl = ttl
+        self.max_entry_bytes = max_entry_bytes
+
+        self.hits = 0
+        self.misses = 0
+        self.patches = 0
+        self.invalidations = 0
+        self.errors = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.ttl > 0
+
+    def _keys(self, key: str) -> Tuple[str, str]:
+        return f"{self.namespace}:ver:{key}", f"{self.namespace}:data:{key}"
+
+    @staticmethod
+    def _encode(version: int, value: Any) -> bytes:
+        return f"{version}:".encode() + json.dumps(value, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+    async def _read(self, key: str) -> Tuple[int, bool, Any]:
+        '''
+        현재 버전과, 그 버전으로 저장된 값을 읽습니다.
+
+        :return: (버전, 값 존재 여부, 값)
+        '''
+        version_key, data_key = self._keys(key)
+        raw_version, payload = await self.backend.mget([version_key, data_key])
+        if raw_version is None:
+            # 이전 버전 키가 만료되었더라도 스탬프가 겹치지 않도록 임의의 값으로 시작
+            await self.backend.set(version_key, str(random.getrandbits(48)).encode(), VERSION_TTL, nx=True)
+            raw_version, = await self.backend.mget([version_key])
+            return int(raw_version or 0), False, None
+
+        version = int(raw_version)
+        if payload is not None:
+            stamp, _, body = payload.partition(b":")
+            if int(stamp) == version:
+                return version, True, json.loads(body)
+        return version, False, None
+
+    async def _store(self, key: str, version: int, value: Any) -> None:
+        payload = self._encode(version, value)
+        if len(payload) <= self.max_entry_bytes:
+            await self.backend.set(self._keys(key)[1], payload, self.ttl)
+
+    async def get_or_load(self, key: str, loader: Callable[[], Awaitable[Any]]) -> Any:
+        '''
+        캐시에 있으면 캐시된 값을, 없으면 loader가 반환한 값을 저장한 뒤 반환합니다.
+        값은 읽기 전의 버전으로 저장되므로 loader 실행 중 쓰기가 일어나면 저장된 값은 사용되지 않습니다.
+        캐시 백엔드 오류는 요청을 실패시키지 않고 loader 결과를 그대로 반환합니다.
+        '''
+        if not self.enabled:
+            return await loader()
+        try:
+            version, found, value = await self._read(key)
+        except Exception as e:
+            self.errors += 1
+            error_tools.logger.warning(f"Cache read failed for {self.namespace}:{key}: {str(e)}")
+            return await loader()
+
+        if found:
+            self.hits += 1
+            return value
+
+        self.misses += 1
+        value = await loader()
+        try:
+            await self._store(key, version, value)
+        except Exception as e:
+            self.errors += 1
+            error_tools.logger.warning(f"Cache write failed for {self.namespace}:{key}: {str(e)}")
+        return value
+
+    async def peek(self, key: str) -> Tuple[bool, Any]:
+        '''
+        loader 없이 캐시된 값만 확인합니다.
+
+        :return: (값 존재 여부, 값)
+        '''
+        if not self.enabled:
+            return False, None
+        try:
+            _, found, value = await self._read(key)
+        except Exception as e:
+            self.errors += 1
+            error_tools.logger.warning(f"Cache read failed for {self.namespace}:{key}: {str(e)}")
+            return False, None
+        if found:
+            self.hits += 1
+        else:
+            self.misses += 1
+        return found, value
+
+    async def update(self, key: str, patch: Optional[Callable[[Any], Optional[Any]]] = None) -> None:
+        '''
+        원본 데이터를 수정한 뒤 호출하여 버전을 올리고, 가능하면 캐시된 값을 제자리에서 수정합니다.
+        patch가 없거나 None을 반환하거나, 다른 워커의 쓰기가 끼어든 경우에는 캐시된 값을 버립니다.
+        '''
+        if not self.enabled:
+            return
+        version_key, data_key = self._keys(key)
+        try:
+            version, found, value = await self._read(key)
+            new_version = await self.backend.incr(version_key)
+            patched = patch(value) if found and patch is not None and new_version == version + 1 else None
+            if patched is None:
+                await self.backend.delete(data_key)
+                self.invalidations += 1
+                return
+            await self._store(key, new_version, patched)
+            self.patches += 1
+        except Exception as e:
+            self.errors += 1
+            error_tools.logger.warning(f"Cache invalidation failed for {self.namespace}:{key}: {str(e)}")
+
+    async def invalidate(self, key: str) -> None:
+        '''
+        캐시된 값을 모든 워커에서 무효화합니다.
+        '''
+        await self.update(key)
+
+    def stats(self) -> Dict:
+        '''
+        캐시 적중률을 반환합니다.
+        '''
+        lookups = self.hits + self.misses
+        return {
+            "enabled": self.enabled,
+            "ttl": self.ttl,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": round(self.hits / lookups, 4) if lookups else 0.0,
+            "patches": self.patches,
+            "invalidations": self.invalidations,
+            "errors": self.errors,
+        }
@@ -0,0 +1,108 @@
+'''
+오랫동안 사용하지 않은 대화방을 압축하여 보관 컬렉션으로 옮기는 모듈입니다.
+
+마지막 대화 시간('updated_at')과 마지막 복원 시간('restored_at')이 기준보다 오래된 대화방은
+헤더와 모든 대화 턴을 zlib으로 압축한 문서 하나로 '{router}_archive' 컬렉션에 저장하고 원래 컬렉션에서 삭제합니다.
+보관된 대화방에 조회, 추가, 수정 요청이 들어오면 원래 저장 방식(embedded | bucket)으로 복원한 뒤 처리하고,
+삭제 요청은 복원하지 않고 보관 문서에서 처리합니다. 대화방 목록, 요약과 내보내기에는 보관된 대화방도 포함됩니다.
+
+MONGO_ARCHIVE_DATABASE를 설정하면 별도 데이터베이스에 보관합니다.
+보관 작업은 CLI로 실행합니다 (src 디렉토리에서 실행):
+    python -m services.mongo_migrations archive --days 180 --dry-run
+    python -m services.mongo_migrations archive --days 180
+'''
+import zlib
+import datetime
+from typing import Dict, List, Optional
+
+import bson
+from bson import Binary
+from motor.motor_asyncio import AsyncIOMotorCollection, AsyncIOMotorDatabase
+
+from . import mongo_indexes
+
+# 보관 작업 실행 기록 컬렉션 (채팅 로그와 같은 데이터베이스)
+RUNS_COLLECTION = "chat_archive_runs"
+
+# 보관 작업 실행 지표
+METRIC_FIELDS = ("scanned", "archived", "skipped", "turns", "raw_bytes", "archived_bytes")
+
+class ChatArchive:
+    def __init__(self, db: AsyncIOMotorDatabase, index_manager: mongo_indexes.IndexManager, level: int = 6) -> None:
+        """
+        ChatArchive 클래스 초기화.
+
+        :param db: 보관 컬렉션이 있는 데이터베이스
+        :param index_manager: 보관 컬렉션의 인덱스를 생성할 관리자
+        :param level: zlib 압축 수준
+        """
+        self.db = db
+        self.index_manager = index_manager
+        self.level = level
+        self.restores = 0
+
+    async def collection(self, router: str) -> AsyncIOMotorCollection:
+        """
+        라우터의 보관 컬렉션을 반환합니다.
+        """
+        collection = self.db[f"{router}_archive"]
+        await self.index_manager.ensure(collection)
+        return collection
+
+    def pack(self, turns: List[Dict]) -> Binary:
+        """
+        대화 턴 목록(저장된 형식 그대로)을 BSON으로 직렬화하여 압축합니다.
+        """
+        return Binary(zlib.compress(bson.encode({"value": turns}), self.level))
+
+    @staticmethod
+    def raw_size(turns: List[Dict]) -> int:
+        """
+        압축하기 전 대화 턴 목록의 BSON 크기(byte)를 반환합니다.
+        """
+        return len(bson.encode({"value": turns}))
+
+    @staticmethod
+    def unpack(document: Dict) -> List[Dict]:
+        """
+        보관 문서의 압축된 대화 턴 목록을 복원합니다.
+        """
+        return bson.decode(zlib.decompress(bytes(document["payload"])))["value"]
+
+    async def save(self, router: str, user_id: str, header: Dict, turns: List[Dict], payload: Binary) -> None:
+        """
+        대화방을 보관 문서로 저장합니다. 같은 대화방의 보관 문서가 있으면 덮어씁니다.
+        대화방 목록 조회에 필요한 필드는 압축하지 않고 함께 저장합니다.
+
+        :param header: 대화방 문서에서 '_id', 'value'와 사용자 범위 필드를 뺀 헤더
+        :param turns: 대화 턴 목록
+        :param payload: pack(turns)의 결과
+        """
+        collection = await self.collection(router)
+        document = {
+            "user_id": user_id,
+            "id": header["id"],
+            "created_at": header.get("created_at"),
+            "updated_at": header.get("updated_at"),
+            "turns": len(turns),
+            "archived_at": datetime.datetime.now(datetime.timezone.utc),
+            "header": header,
+            "payload": payload,
+        }
+        if "character_idx" in header:
+            document["character_idx"] = header["character_idx"]
+        await collection.replace_one({"user_id": user_id, "id": header["id"]}, document, upsert=True)
+
+    async def find(self, router: str, user_id: str, document_id: str) -> Optional[Dict]:
+        """
+        보관된 대화방 문서를 반환합니다. 없으면 None을 반환합니다.
+        """
+        collection = await self.collection(router)
+        return await collection.find_one({"user_id": user_id, "id": document_id})
+
+    async def delete(self, router: str, user_id: str, document_id: str) -> None:
+        """
+        보관된 대화방 문서를 삭제합니다.
+        """
+        collection = await self.collection(router)
+        await collection.delete_one({"user_id": user_id, "id": document_id})
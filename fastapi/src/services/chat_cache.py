@@ -0,0 +1,129 @@
+'''
+채팅 로그 조회 결과를 캐시하는 모듈입니다.
+
+대화 한 턴마다 같은 대화방에 대해 조회(GET)와 저장(PUT/PATCH)이 번갈아 일어나므로,
+저장 시 캐시 항목을 제자리에서 수정하여 다음 조회가 MongoDB를 거치지 않도록 합니다.
+캐시 백엔드(memory | redis)와 워커 간 무효화는 cache_backends 모듈을 사용합니다.
+'''
+from typing import Awaitable, Callable, Dict, List, Optional, Tuple
+
+from .cache_backends import CacheBackend, VersionedCache
+
+CacheKey = Tuple[str, str, str]
+
+class ChatLogCache(VersionedCache):
+    def __init__(self, backend: CacheBackend, ttl: float, max_entry_bytes: int = 1024 * 1024) -> None:
+        """
+        ChatLogCache 클래스 초기화.
+        대화방 하나를 {'value': [...], 'character_idx': ..., 'version': ...} 형태의 압축된 JSON 항목 하나로 저장합니다.
+        'version'은 항목 내용에 해당하는 대화방 version이며, 알 수 없으면 None입니다.
+
+        :param backend: 캐시 백엔드
+        :param ttl: 항목 유지 시간(초). 0이면 캐시를 사용하지 않음
+        :param max_entry_bytes: 항목 하나의 최대 크기. 이보다 큰 대화방은 캐시하지 않음
+        """
+        super().__init__(backend, "chatlog", ttl, max_entry_bytes)
+
+    @staticmethod
+    def _key(key: CacheKey) -> str:
+        router, user_id, document_id = key
+        return f"{router}:{user_id}:{document_id}"
+
+    @staticmethod
+    def _to_document(key: CacheKey, entry: Dict) -> Dict:
+        document = {"id": key[2], "value": entry["value"], "version": entry.get("version")}
+        if entry.get("character_idx") is not None:
+            document["character_idx"] = entry["character_idx"]
+        return document
+
+    async def get(self, key: CacheKey) -> Optional[Dict]:
+        """
+        캐시된 대화방 문서를 반환합니다. 없으면 None을 반환합니다.
+        """
+        found, entry = await self.peek(self._key(key))
+        return self._to_document(key, entry) if found else None
+
+    async def read_through(self, key: CacheKey, loader: Callable[[], Awaitable[Dict]]) -> Dict:
+        """
+        캐시에 있으면 캐시된 대화방을, 없으면 loader로 읽은 대화방을 캐시에 저장한 뒤 반환합니다.
+        """
+        async def load() -> Dict:
+            document = await loader()
+            return {
+                "value": document.get("value") or [],
+                "character_idx": document.get("character_idx"),
+                "version": document.get("version", 0),
+            }
+
+        return self._to_document(key, await self.get_or_load(self._key(key), load))
+
+    async def append(self, key: CacheKey, turn: Dict, version: Optional[int] = None) -> None:
+        """
+        새로 추가된 대화 턴을 캐시 항목 끝에 붙입니다. 인덱스가 이어지지 않으면 항목을 제거합니다.
+
+        :param version: 추가한 뒤의 대화방 version
+        """
+        await self.extend(key, [turn], version)
+
+    async def extend(self, key: CacheKey, turns: List[Dict], version: Optional[int] = None) -> None:
+        """
+        연속된 인덱스로 추가된 대화 턴들을 캐시 항목 끝에 붙입니다. 인덱스가 이어지지 않으면 항목을 제거합니다.
+
+        :param version: 추가한 뒤의 대화방 version
+        """
+        def patch(entry: Dict) -> Optional[Dict]:
+            value: List[Dict] = entry["value"]
+            last_index = value[-1]["index"] if value else 0
+            if not turns or turns[0]["index"] != last_index + 1:
+                return None
+            value.extend(turns)
+            entry["version"] = version
+            return entry
+
+        await self.update(self._key(key), patch)
+
+    async def replace_latest(self, key: CacheKey, turn: Dict, version: Optional[int] = None) -> None:
+        """
+        캐시 항목의 최신 대화 턴을 교체합니다. 인덱스가 일치하지 않으면 항목을 제거합니다.
+
+        :param version: 수정한 뒤의 대화방 version
+        """
+        def patch(entry: Dict) -> Optional[Dict]:
+            value: List[Dict] = entry["value"]
+            if not value or value[-1]["index"] != turn["index"]:
+                return None
+            value[-1] = turn
+            entry["version"] = version
+            return entry
+
+        await self.update(self._key(key), patch)
+
+    async def truncate(self, key: CacheKey, from_index: int, version: Optional[int] = None) -> None:
+        """
+        캐시 항목에서 from_index 이상의 대화를 제거합니다.
+
+        :param version: 제거한 뒤의 대화방 version
+        """
+        def patch(entry: Dict) -> Dict:
+            entry["value"] = [turn for turn in entry["value"] if turn["index"] < from_index]
+            entry["version"] = version
+            return entry
+
+        await self.update(self._key(key), patch)
+
+    async def invalidate(self, key: CacheKey) -> None:
+        """
+        캐시 항목을 모든 워커에서 무효화합니다.
+        """
+        await self.update(self._key(key))
+
+    async def full_stats(self) -> Dict:
+        """
+        캐시 적중률과 백엔드 메모리 사용량을 반환합니다.
+        """
+        stats = self.stats()
+        try:
+            stats.update(await self.backend.stats())
+        except Exception as e:
+            stats["backend_error"] = str(e)
+        return stats
@@ -0,0 +1,346 @@
+'''
+사용자의 채팅 기록을 검색하기 위한 n-gram 색인 모듈입니다.
+
+한국어는 어절에 조사가 붙으므로 띄어쓰기 단위로 색인하는 MongoDB text 인덱스로는 찾지 못하는 경우가 많습니다.
+대화 턴마다 input_data/output_data를 소문자로 바꾼 뒤 어절 안의 2-gram 목록('grams', 대화 턴당 최대 max_grams개)만
+'chat_search' 컬렉션에 저장하고, 검색어의 2-gram을 모두 포함하는 대화 턴을 (user_id, grams) 인덱스로 찾은 뒤
+채팅 로그에서 해당 대화 턴을 읽어 검색어가 실제로 있는지 확인하고 발췌문을 만듭니다.
+원문은 색인에 저장하지 않으므로 대화 턴 압축(turn_codec)과 관계없이 저장 공간이 늘어나지 않습니다.
+
+색인은 대화 추가, 수정, 삭제 후 백그라운드 작업에서 요청 순서대로 갱신하며 (MONGO_SEARCH_INDEX=true),
+기존 대화는 CLI로 색인합니다 (src 디렉토리에서 실행):
+    python -m services.mongo_migrations search-index
+'''
+import json
+import base64
+import asyncio
+import datetime
+from collections import deque
+from typing import Awaitable, Callable, Deque, Dict, Iterable, List, Optional, Tuple
+
+from bson import ObjectId
+from bson.errors import InvalidId
+from motor.motor_asyncio import AsyncIOMotorCollection, AsyncIOMotorDatabase
+from pymongo import UpdateOne
+from pymongo.errors import PyMongoError
+
+from utils import error_tools
+from . import mongo_indexes
+
+SEARCH_COLLECTION = "chat_search"
+
+SEARCHED_FIELDS = ("input_data", "output_data")
+
+# (router, user_id, document_id, 대화 인덱스 목록) -> {대화 인덱스: 응답 형식의 대화 턴}
+TurnLoader = Callable[[str, str, str, List[int]], Awaitable[Dict[int, Dict]]]
+
+def normalize(text: str) -> str:
+    """
+    검색 비교용으로 소문자로 바꾸고 연속된 공백을 하나로 합칩니다.
+    """
+    return " ".join(str(text).lower().split())
+
+def ngrams(text: str, limit: Optional[int] = None) -> List[str]:
+    """
+    어절 안의 2-gram 목록을 처음 나온 순서대로 중복 없이 반환합니다. 한 글자 어절은 그 글자를 그대로 포함합니다.
+
+    :param limit: 주어지면 앞에서부터 최대 limit개만 반환
+    """
+    grams: Dict[str, None] = {}
+    for token in normalize(text).split(" "):
+        if len(token) == 1:
+            grams[token] = None
+        for i in range(len(token) - 1):
+            grams[token[i:i + 2]] = None
+            if limit is not None and len(grams) >= limit:
+                return list(grams)
+    return list(grams)
+
+class ChatSearchIndex:
+    def __init__(
+        self,
+        db: AsyncIOMotorDatabase,
+        index_manager: mongo_indexes.IndexManager,
+        enabled: bool = False,
+        context: int = 40,
+        max_scan: int = 500,
+        max_grams: int = 256
+    ) -> None:
+        """
+        ChatSearchIndex 클래스 초기화.
+
+        :param db: 데이터베이스
+        :param index_manager: 검색 컬렉션의 인덱스를 생성할 관리자
+        :param enabled: False이면 대화 저장 시 색인을 갱신하지 않음
+        :param context: 발췌문에 포함할 검색어 앞뒤 글자 수
+        :param max_scan: 한 페이지를 찾기 위해 확인할 최대 후보 수
+        :param max_grams: 대화 턴 하나에 저장할 최대 2-gram 수 (멀티키 인덱스 항목 수 제한, 이후에만 나오는 단어는 검색되지 않음)
+        """
+        self.db = db
+        self.index_manager = index_manager
+        self.enabled = enabled
+        self.context = context
+        self.max_scan = max_scan
+        self.max_grams = max_grams
+
+        self._pending: Deque[Tuple[Callable[..., Awaitable], Tuple]] = deque()
+        self._task: Optional[asyncio.Task] = None
+        self._idle = asyncio.Event()
+        self._idle.set()
+
+    async def collection(self) -> AsyncIOMotorCollection:
+        collection = self.db[SEARCH_COLLECTION]
+        await self.index_manager.ensure(collection)
+        return collection
+
+    @staticmethod
+    def _key(router: str, user_id: str, document_id: str, index: int) -> Dict:
+        return {"user_id": user_id, "router": router, "document_id": document_id, "index": index}
+
+    def _entry(self, turn: Dict, character_idx: Optional[int]) -> Dict:
+        """
+        대화 턴의 검색 항목을 생성합니다. 원문은 저장하지 않고 2-gram 목록과 정렬용 timestamp만 저장합니다.
+        timestamp는 date만 저장하고 (문자열이면 None) 키셋 페이지네이션에서 BSON 타입이 섞이지 않도록 합니다.
+        """
+        timestamp = turn.get("timestamp")
+        entry = {
+            "timestamp": timestamp if isinstance(timestamp, datetime.datetime) else None,
+            "grams": ngrams(" ".join(str(turn.get(field) or "") for field in SEARCHED_FIELDS), self.max_grams),
+        }
+        if character_idx is not None:
+            entry["character_idx"] = character_idx
+        return entry
+
+    def schedule_index(
+        self,
+        router: str,
+        user_id: str,
+        document_id: str,
+        character_idx: Optional[int],
+        turns: Iterable[Tuple[int, Dict]]
+    ) -> None:
+        """
+        색인이 켜져 있으면 index_turns를 백그라운드 작업에 넣고 바로 반환합니다.
+        """
+        if self.enabled:
+            self._schedule(self.index_turns, (router, user_id, document_id, character_idx, list(turns)))
+
+    def schedule_remove(self, router: str, user_id: str, document_id: str, from_index: Optional[int] = None) -> None:
+        """
+        색인이 켜져 있으면 remove를 백그라운드 작업에 넣고 바로 반환합니다.
+        """
+        if self.enabled:
+            self._schedule(self.remove, (router, user_id, document_id, from_index))
+
+    def _schedule(self, operation: Callable[..., Awaitable], args: Tuple) -> None:
+        # 추가 후 삭제처럼 같은 대화 턴에 대한 작업이 뒤바뀌지 않도록 작업 하나가 요청 순서대로 실행
+        self._pending.append((operation, args))
+        self._idle.clear()
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+
+    async def _run(self) -> None:
+        while self._pending:
+            operation, args = self._pending.popleft()
+            try:
+                await operation(*args)
+            except Exception as e:
+                error_tools.logger.warning(f"Search index update failed for {args[:3]}: {str(e)}")
+        self._idle.set()
+
+    async def drain(self) -> None:
+        """
+        백그라운드 작업에 남은 색인 갱신을 모두 반영할 때까지 기다립니다.
+        """
+        if self._task is not None and not self._task.done():
+            await self._idle.wait()
+
+    async def close(self) -> None:
+        """
+        애플리케이션 종료 시 남은 색인 갱신을 반영합니다.
+        """
+        await self.drain()
+
+    async def index_turns(
+        self,
+        router: str,
+        user_id: str,
+        document_id: str,
+        character_idx: Optional[int],
+        turns: Iterable[Tuple[int, Dict]]
+    ) -> None:
+        """
+        (대화 인덱스, 대화 턴) 목록을 색인합니다. 같은 인덱스의 항목이 있으면 덮어씁니다.
+        색인에 실패해도 대화 저장은 실패하지 않도록 로그만 남깁니다.
+
+        :param character_idx: 캐릭터 인덱스 (None이면 기존 값을 유지)
+        :param turns: 압축하지 않은 대화 턴과 그 인덱스
+        """
+        requests = [
+            UpdateOne(self._key(router, user_id, document_id, index), {"$set": self._entry(turn, character_idx)}, upsert=True)
+            for index, turn in turns
+        ]
+        if not requests:
+            return
+        try:
+            collection = await self.collection()
+            await collection.bulk_write(requests, ordered=False)
+        except PyMongoError as e:
+            error_tools.logger.warning(f"Search indexing failed for {router}:{user_id}:{document_id}: {str(e)}")
+
+    async def remove(self, router: str, user_id: str, document_id: str, from_index: Optional[int] = None) -> None:
+        """
+        대화방의 검색 항목을 삭제합니다. from_index가 주어지면 그 인덱스 이후의 대화만 삭제합니다.
+        """
+        query: Dict = {"user_id": user_id, "router": router, "document_id": document_id}
+        if from_index is not None:
+            query["index"] = {"$gte": from_index}
+        try:
+            collection = await self.collection()
+            await collection.delete_many(query)
+        except PyMongoError as e:
+            error_tools.logger.warning(f"Search index cleanup failed for {router}:{user_id}:{document_id}: {str(e)}")
+
+    @staticmethod
+    def encode_cursor(timestamp: Optional[datetime.datetime], entry_id: ObjectId) -> str:
+        """
+        검색 결과의 다음 페이지 위치(마지막으로 확인한 항목의 timestamp, _id)를 URL에 쓸 수 있는 문자열로 인코딩합니다.
+        """
+        position = [timestamp.isoformat() if timestamp is not None else None, str(entry_id)]
+        return base64.urlsafe_b64encode(json.dumps(position).encode("utf-8")).decode("ascii")
+
+    @staticmethod
+    def decode_cursor(cursor: str) -> Tuple[Optional[datetime.datetime], ObjectId]:
+        """
+        encode_cursor로 만든 문자열을 (timestamp, _id)로 복원합니다.
+
+        :raises ValueError: 올바른 형식이 아닐 경우
+        """
+        try:
+            timestamp, entry_id = json.loads(base64.urlsafe_b64decode(cursor.encode("ascii")))
+            return (datetime.datetime.fromisoformat(timestamp) if timestamp is not None else None), ObjectId(entry_id)
+        except (ValueError, TypeError, InvalidId) as e:
+            raise ValueError(f"Invalid cursor: {cursor}") from e
+
+    def _snippet(self, text: str, needle: str) -> Optional[str]:
+        """
+        검색어가 포함된 부분의 앞뒤 context 글자를 발췌합니다. 검색어가 없으면 None을 반환합니다.
+        """
+        text = " ".join(text.split())
+        position = text.lower().find(needle)
+        if position < 0:
+            return None
+        start = max(0, position - self.context)
+        end = min(len(text), position + len(needle) + self.context)
+        return ("…" if start > 0 else "") + text[start:end] + ("…" if end < len(text) else "")
+
+    async def _match(self, entries: List[Dict], needle: str, user_id: str, load_turns: TurnLoader) -> List[Optional[Dict]]:
+        """
+        후보 항목의 대화 턴을 대화방별로 한 번에 읽어 검색어가 실제로 있는지 확인합니다.
+
+        :return: entries와 같은 순서의 검색 결과 (검색어가 없거나 대화 턴이 삭제되었으면 None)
+        """
+        rooms: Dict[Tuple[str, str], List[int]] = {}
+        for entry in entries:
+            rooms.setdefault((entry["router"], entry["document_id"]), []).append(entry["index"])
+        loaded = {
+            room: await load_turns(room[0], user_id, room[1], indexes)
+            for room, indexes in rooms.items()
+        }
+
+        matches: List[Optional[Dict]] = []
+        for entry in entries:
+            turn = loaded[(entry["router"], entry["document_id"])].get(entry["index"])
+            match = None
+            for field in SEARCHED_FIELDS if turn is not None else ():
+                snippet = self._snippet(str(turn.get(field) or ""), needle)
+                if snippet is not None:
+                    match = {
+                        "router": entry["router"],
+                        "document_id": entry["document_id"],
+                        "index": entry["index"],
+                        "field": field,
+                        "snippet": snippet,
+                        "timestamp": turn.get("timestamp"),
+                    }
+                    if "character_idx" in entry:
+                        match["character_idx"] = entry["character_idx"]
+                    break
+            matches.append(match)
+        return matches
+
+    async def search(
+        self,
+        user_id: str,
+        query: str,
+        load_turns: TurnLoader,
+        router: Optional[str] = None,
+        limit: int = 20,
+        after: Optional[Tuple[Optional[datetime.datetime], ObjectId]] = None
+    ) -> Tuple[List[Dict], Optional[Tuple[Optional[datetime.datetime], ObjectId]]]:
+        """
+        검색어가 포함된 대화 턴을 최신순으로 반환합니다.
+        (timestamp, _id) 기준 키셋 페이지네이션을 사용하며, 한 페이지에서 max_scan개의 후보를 확인해도
+        limit개를 채우지 못하면 확인한 위치까지를 반환하고 다음 페이지에서 이어서 찾습니다.
+        후보는 limit의 두 배씩 모아 대화방별로 한 번에 읽습니다.
+
+        :param user_id: 사용자 ID
+        :param query: 검색어 (두 글자 이상의 어절 포함)
+        :param load_turns: 대화방에서 주어진 인덱스의 대화 턴(응답 형식)을 읽는 함수
+        :param router: 특정 라우터만 검색할 경우 'office' 또는 'chatbot'
+        :param limit: 한 페이지의 최대 결과 수
+        :param after: 이전 페이지의 마지막 위치
+        :return: ({'router', 'document_id', 'index', 'field', 'snippet', 'timestamp', 'character_idx'(chatbot)} 목록,
+                 다음 페이지가 있으면 마지막 위치 아니면 None)
+        :raises ValueError: 검색어에 두 글자 이상의 어절이 없을 경우
+        """
+        needle = normalize(query)
+        query_grams = [gram for gram in ngrams(needle) if len(gram) == 2]
+        if not query_grams:
+            raise ValueError("검색어에는 두 글자 이상의 단어가 있어야 합니다.")
+
+        conditions: Dict = {"user_id": user_id, "grams": {"$all": query_grams}}
+        if router is not None:
+            conditions["router"] = router
+        if after is not None:
+            timestamp, entry_id = after
+            if timestamp is None:
+                conditions.update({"timestamp": None, "_id": {"$lt": entry_id}})
+            else:
+                conditions["$or"] = [
+                    {"timestamp": {"$lt": timestamp}},
+                    {"timestamp": timestamp, "_id": {"$lt": entry_id}},
+                    {"timestamp": None},
+                ]
+
+        collection = await self.collection()
+        batch = min(limit * 2, self.max_scan)
+        cursor = collection.find(conditions, {"grams": 0}).sort([("timestamp", -1), ("_id", -1)]).limit(self.max_scan + 1)
+        results: List[Dict] = []
+        candidates: List[Dict] = []
+        scanned, last_position = 0, None
+
+        async def examine() -> bool:
+            # 후보를 순서대로 확인하고, 페이지를 채워 남은 후보가 있으면 True
+            nonlocal scanned, last_position
+            matches = await self._match(candidates, needle, user_id, load_turns)
+            for entry, match in zip(candidates, matches):
+                if len(results) == limit or scanned == self.max_scan:
+                    return True
+                scanned += 1
+                last_position = (entry.get("timestamp"), entry["_id"])
+                if match is not None:
+                    results.append(match)
+            return False
+
+        async for entry in cursor.batch_size(batch):
+            if len(results) == limit or scanned == self.max_scan:
+                return results, last_position
+            candidates.append(entry)
+            if len(candidates) == batch:
+                if await examine():
+                    return results, last_position
+                candidates = []
+        if candidates and await examine():
+            return results, last_position
+        return results, None
@@ -0,0 +1,134 @@
+'''
+Idempotency-Key 헤더로 같은 쓰기 요청의 재시도를 한 번만 처리하는 모듈입니다.
+
+요청 키마다 처리 상태를 캐시 백엔드(memory | redis)에 저장합니다.
+- 처음 도착한 요청은 'pending' 항목을 SET NX로 선점한 뒤 처리하고, 성공 응답을 저장합니다.
+- 같은 키의 재시도는 저장된 응답을 그대로 돌려주며 MongoDB에 다시 쓰지 않습니다.
+- 처리 중인 키로 들어온 요청은 결과가 저장될 때까지 잠시 기다리고, 그래도 끝나지 않으면 409를 반환합니다.
+- 같은 키로 다른 내용의 요청이 들어오면 422를 반환합니다.
+
+항목은 TTL이 지나면 사라지며, memory 백엔드는 최대 메모리를 넘으면 오래된 항목부터 제거합니다.
+'''
+import json
+import base64
+import asyncio
+from typing import Dict, Optional, Sequence, Tuple
+
+from utils import error_tools
+from .cache_backends import CacheBackend
+
+class IdempotencyStore:
+    def __init__(
+        self,
+        backend: CacheBackend,
+        ttl: float = 86400,
+        pending_ttl: float = 60,
+        wait_timeout: float = 5,
+        poll_interval: float = 0.05
+    ) -> None:
+        """
+        IdempotencyStore 클래스 초기화.
+
+        :param backend: 캐시 백엔드
+        :param ttl: 처리가 끝난 응답을 보관하는 시간(초). 0이면 사용하지 않음
+        :param pending_ttl: 처리 중 표시의 유지 시간(초). 처리 도중 프로세스가 종료되어도 이 시간 뒤에는 다시 처리 가능
+        :param wait_timeout: 처리 중인 같은 키의 결과를 기다리는 최대 시간(초)
+        :param poll_interval: 결과를 기다리는 동안 확인하는 간격(초)
+        """
+        self.backend = backend
+        self.ttl = ttl
+        self.pending_ttl = pending_ttl
+        self.wait_timeout = wait_timeout
+        self.poll_interval = poll_interval
+
+        self.replays = 0
+        self.conflicts = 0
+        self.errors = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.ttl > 0
+
+    @staticmethod
+    def _key(scope: str) -> str:
+        return f"idempotency:{scope}"
+
+    async def _read(self, key: str) -> Optional[Dict]:
+        raw = (await self.backend.mget([key]))[0]
+        return json.loads(raw) if raw is not None else None
+
+    async def begin(self, scope: str, fingerprint: str) -> Optional[Dict]:
+        """
+        요청 처리를 시작합니다.
+
+        :param scope: 요청 키 (메서드, 경로, Idempotency-Key를 포함)
+        :param fingerprint: 요청 내용의 해시
+        :return: 이미 처리된 요청이면 저장된 응답 {'status_code', 'media_type', 'body', 'headers'}, 처리를 맡게 되면 None
+        :raises error_tools.ValueErrorException: 같은 키로 다른 내용의 요청이 들어온 경우
+        :raises error_tools.ConflictException: 같은 키의 요청이 아직 처리 중인 경우
+        """
+        key = self._key(scope)
+        pending = json.dumps({"state": "pending", "fingerprint": fingerprint}).encode("utf-8")
+        deadline = asyncio.get_running_loop().time() + self.wait_timeout
+        while True:
+            if await self.backend.set(key, pending, self.pending_ttl, nx=True):
+                return None
+
+            entry = await self._read(key)
+            if entry is None:
+                # 확인하는 사이 만료된 경우 다시 선점 시도
+                continue
+            if entry["fingerprint"] != fingerprint:
+                raise error_tools.ValueErrorException("같은 Idempotency-Key로 다른 내용의 요청을 보낼 수 없습니다.")
+            if entry["state"] == "done":
+                self.replays += 1
+                return entry["response"]
+            if asyncio.get_running_loop().time() >= deadline:
+                self.conflicts += 1
+                raise error_tools.ConflictException("같은 Idempotency-Key의 요청이 아직 처리 중입니다.")
+            await asyncio.sleep(self.poll_interval)
+
+    async def complete(
+        self,
+        scope: str,
+        fingerprint: str,
+        status_code: int,
+        media_type: Optional[str],
+        body: bytes,
+        headers: Sequence[Tuple[str, str]] = ()
+    ) -> None:
+        """
+        처리한 요청의 응답을 저장합니다.
+
+        :param headers: 재사용 응답에 다시 붙일 (이름, 값) 목록 (ETag, Vary 등)
+        """
+        entry = {
+            "state": "done",
+            "fingerprint": fingerprint,
+            "response": {
+                "status_code": status_code,
+                "media_type": media_type,
+                "body": base64.b64encode(body).decode("ascii"),
+                "headers": [list(header) for header in headers],
+            },
+        }
+        await self.backend.set(self._key(scope), json.dumps(entry).encode("utf-8"), self.ttl)
+
+    async def release(self, scope: str) -> None:
+        """
+        처리에 실패한 요청의 처리 중 표시를 제거하여 재시도가 다시 처리되도록 합니다.
+        """
+        await self.backend.delete(self._key(scope))
+
+    @staticmethod
+    def decode_body(response: Dict) -> bytes:
+        """
+        저장된 응답 본문을 bytes로 복원합니다.
+        """
+        return base64.b64decode(response["body"])
+
+    def stats(self) -> Dict:
+        """
+        재사용한 응답 수와 충돌 수를 반환합니다.
+        """
+        return {"enabled": self.enabled, "ttl": self.ttl, "replays": self.replays, "conflicts": self.conflicts, "errors": self.errors}
@@ -0,0 +1,59 @@
+'''
+사용자의 채팅 기록 전체를 NDJSON(한 줄에 대화 턴 하나)으로 내보내는 모듈입니다.
+
+API(GET /mongo/users/{user_id}/export)와 CLI가 같은 인코더를 사용합니다.
+사용 예시 (src 디렉토리에서 실행):
+    python -m services.mongo_export --user-id shaa97102 > shaa97102.ndjson
+    python -m services.mongo_export --user-id shaa97102 --router chatbot --output chatbot.ndjson
+'''
+import sys
+import json
+import asyncio
+import argparse
+from typing import AsyncIterator, List, Sequence
+
+from services import mongodb_client
+
+ROUTERS = ("office", "chatbot")
+
+# 전송 단위. 대화 턴마다 전송하지 않고 이 크기만큼 모아서 전송
+CHUNK_SIZE = 64 * 1024
+
+async def iter_ndjson(
+    handler: mongodb_client.MongoDBHandler,
+    user_id: str,
+    routers: Sequence[str] = ROUTERS
+) -> AsyncIterator[bytes]:
+    """
+    사용자의 대화 턴을 NDJSON bytes로 인코딩하여 CHUNK_SIZE 단위로 반환합니다.
+    """
+    chunk = bytearray()
+    async for row in handler.iter_user_log(user_id, routers):
+        chunk += json.dumps(row, ensure_ascii=False, default=str).encode("utf-8")
+        chunk += b"\n"
+        if len(chunk) >= CHUNK_SIZE:
+            yield bytes(chunk)
+            chunk.clear()
+    if chunk:
+        yield bytes(chunk)
+
+async def main(argv: List[str] = None):
+    parser = argparse.ArgumentParser(description="사용자 채팅 기록 NDJSON 내보내기 도구")
+    parser.add_argument("--user-id", required=True, help="내보낼 사용자 ID")
+    parser.add_argument("--router", choices=ROUTERS, action="append", help="대상 라우터 (기본값: 전체)")
+    parser.add_argument("--output", help="저장할 파일 경로 (기본값: 표준 출력)")
+    args = parser.parse_args(argv)
+
+    handler = mongodb_client.MongoDBHandler()
+    output = open(args.output, "wb") if args.output else sys.stdout.buffer
+    try:
+        async for chunk in iter_ndjson(handler, args.user_id, args.router or ROUTERS):
+            output.write(chunk)
+        output.flush()
+    finally:
+        if args.output:
+            output.close()
+        handler.client.close()
+
+if __name__ == "__main__":
+    asyncio.run(main())
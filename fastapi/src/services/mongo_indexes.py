@@ -0,0 +1,192 @@
+'''
+채팅 로그 컬렉션의 인덱스를 관리하는 모듈입니다.
+
+사용자별 컬렉션은 요청 처리 중 처음 사용될 때 인덱스를 생성하며,
+기존 컬렉션 전체에 인덱스를 채우려면 CLI를 사용합니다 (src 디렉토리에서 실행):
+    python -m services.mongo_indexes
+    python -m services.mongo_indexes --dry-run
+'''
+import re
+import asyncio
+import argparse
+from typing import Dict, List, Optional, Pattern, Set, Tuple
+
+from motor.motor_asyncio import AsyncIOMotorCollection, AsyncIOMotorDatabase
+from pymongo import ASCENDING, DESCENDING, IndexModel
+from pymongo.errors import OperationFailure, PyMongoError
+
+from utils import error_tools
+
+# 컬렉션 이름 패턴별로 필요한 인덱스 정의
+INDEX_SPECS: List[Tuple[Pattern, List[IndexModel]]] = [
+    (
+        re.compile(r'^(office|chatbot)_log_.+$'),
+        [
+            IndexModel([("id", ASCENDING)], unique=True, name="id_unique"),
+            # 대화방 목록 (마지막 대화 시간 최신순 키셋 페이지네이션)
+            IndexModel([("updated_at", DESCENDING), ("id", DESCENDING)], name="updated_at_id"),
+        ],
+    ),
+    (
+        re.compile(r'^(office|chatbot)_bucket_.+$'),
+        [
+            IndexModel([("id", ASCENDING), ("bucket", ASCENDING)], unique=True, name="id_bucket_unique"),
+            # 시간 범위 조회 (since/until)에서 해당 시간의 대화가 있는 버킷만 읽기
+            IndexModel([("id", ASCENDING), ("value.timestamp", ASCENDING)], name="id_value_timestamp"),
+        ],
+    ),
+    # 라우터별 단일 컬렉션 레이아웃 (MONGO_CHAT_LAYOUT=consolidated)
+    (
+        re.compile(r'^(office|chatbot)_log$'),
+        [
+            IndexModel([("user_id", ASCENDING), ("id", ASCENDING)], unique=True, name="user_id_id_unique"),
+            IndexModel(
+                [("user_id", ASCENDING), ("updated_at", DESCENDING), ("id", DESCENDING)],
+                name="user_id_updated_at_id"
+            ),
+        ],
+    ),
+    (
+        re.compile(r'^(office|chatbot)_bucket$'),
+        [
+            IndexModel(
+                [("user_id", ASCENDING), ("id", ASCENDING), ("bucket", ASCENDING)],
+                unique=True,
+                name="user_id_id_bucket_unique"
+            ),
+            IndexModel(
+                [("user_id", ASCENDING), ("id", ASCENDING), ("value.timestamp", ASCENDING)],
+                name="user_id_id_value_timestamp"
+            ),
+        ],
+    ),
+    # 보관된 대화방 (chat_archive)
+    (
+        re.compile(r'^(office|chatbot)_archive$'),
+        [
+            IndexModel([("user_id", ASCENDING), ("id", ASCENDING)], unique=True, name="user_id_id_unique"),
+            IndexModel(
+                [("user_id", ASCENDING), ("updated_at", DESCENDING), ("id", DESCENDING)],
+                name="user_id_updated_at_id"
+            ),
+        ],
+    ),
+    # 채팅 검색 색인 (chat_search)
+    (
+        re.compile(r'^chat_search$'),
+        [
+            IndexModel(
+                [("user_id", ASCENDING), ("router", ASCENDING), ("document_id", ASCENDING), ("index", ASCENDING)],
+                unique=True,
+                name="user_id_router_document_index_unique"
+            ),
+            IndexModel(
+                [("user_id", ASCENDING), ("grams", ASCENDING), ("timestamp", DESCENDING), ("_id", DESCENDING)],
+                name="user_id_grams_timestamp"
+            ),
+        ],
+    ),
+    # 일별 사용량 집계 (usage_rollups)
+    (
+        re.compile(r'^chat_usage_daily$'),
+        [IndexModel([("router", ASCENDING), ("date", ASCENDING), ("character_idx", ASCENDING)], name="router_date_character")],
+    ),
+    (
+        re.compile(r'^chat_usage_active_rooms$'),
+        [IndexModel([("expire_at", ASCENDING)], expireAfterSeconds=0, name="expire_at_ttl")],
+    ),
+]
+
+# 다시 시도해도 같은 결과인 인덱스 생성 오류 코드
+# (11000: 기존 데이터의 중복 키, 85/86: 같은 이름이나 키의 인덱스가 다른 옵션으로 이미 있음)
+PERMANENT_INDEX_ERRORS = {11000, 85, 86}
+
+class IndexManager:
+    def __init__(self, db: AsyncIOMotorDatabase) -> None:
+        """
+        IndexManager 클래스 초기화.
+        인덱스 생성을 마친 컬렉션 이름을 캐시하여 같은 컬렉션에 대해 다시 요청하지 않습니다.
+        """
+        self.db = db
+        self._indexed: Set[str] = set()
+        self._backfill_task: Optional[asyncio.Task] = None
+
+    @staticmethod
+    def index_models(collection_name: str) -> List[IndexModel]:
+        """
+        컬렉션 이름에 해당하는 인덱스 정의를 반환합니다.
+        """
+        for pattern, models in INDEX_SPECS:
+            if pattern.match(collection_name):
+                return models
+        return []
+
+    async def ensure(self, collection: AsyncIOMotorCollection) -> None:
+        """
+        컬렉션에 필요한 인덱스가 없다면 생성합니다.
+        인덱스를 생성한 컬렉션은 캐시에 기록되어 이후 호출은 네트워크 요청 없이 반환됩니다.
+        연결 오류 등 일시적인 오류로 실패하면 캐시에 기록하지 않고 다음 호출에서 다시 시도합니다.
+
+        :param collection: 대상 컬렉션
+        """
+        if collection.name in self._indexed:
+            return
+        models = self.index_models(collection.name)
+        if models:
+            try:
+                await collection.create_indexes(models)
+            except PyMongoError as e:
+                # 요청 처리는 계속하고, 다시 시도해도 실패하는 오류만 재시도하지 않도록 캐시에 기록
+                error_tools.logger.warning(f"Index creation failed for {collection.name}: {str(e)}")
+                if not (isinstance(e, OperationFailure) and e.code in PERMANENT_INDEX_ERRORS):
+                    return
+        self._indexed.add(collection.name)
+
+    async def backfill(self, dry_run: bool = False) -> Dict[str, int]:
+        """
+        데이터베이스의 모든 채팅 로그 컬렉션에 인덱스를 생성합니다.
+
+        :param dry_run: True이면 인덱스를 생성하지 않고 대상 컬렉션만 집계
+        :return: 대상 컬렉션 수와 인덱스를 생성한 컬렉션 수
+        """
+        names = await self.db.list_collection_names()
+        targets = [name for name in sorted(names) if self.index_models(name)]
+        if not dry_run:
+            for name in targets:
+                await self.ensure(self.db[name])
+        return {"collections": len(targets), "indexed": 0 if dry_run else len(targets)}
+
+    def start_backfill(self) -> None:
+        """
+        애플리케이션 시작 시 기존 컬렉션의 인덱스 생성을 백그라운드에서 실행합니다.
+        """
+        if self._backfill_task is None or self._backfill_task.done():
+            self._backfill_task = asyncio.create_task(self.backfill())
+
+    async def close(self) -> None:
+        """
+        진행 중인 백그라운드 인덱스 생성을 취소합니다.
+        """
+        if self._backfill_task is not None and not self._backfill_task.done():
+            self._backfill_task.cancel()
+            try:
+                await self._backfill_task
+            except asyncio.CancelledError:
+                pass
+
+async def main(argv: List[str] = None):
+    from services import mongodb_client
+
+    parser = argparse.ArgumentParser(description="채팅 로그 컬렉션 인덱스 생성 도구")
+    parser.add_argument("--dry-run", action="store_true", help="인덱스를 생성하지 않고 대상 컬렉션 수만 출력")
+    args = parser.parse_args(argv)
+
+    handler = mongodb_client.MongoDBHandler()
+    try:
+        result = await handler.index_manager.backfill(dry_run=args.dry_run)
+        print(f"INFO:     대상 컬렉션 {result['collections']}개 중 {result['indexed']}개의 인덱스를 확인했습니다.")
+    finally:
+        handler.client.close()
+
+if __name__ == "__main__":
+    asyncio.run(main())
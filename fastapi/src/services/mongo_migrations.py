@@ -0,0 +1,568 @@
+'''
+MongoDB 채팅 로그 데이터 변환 작업을 실행하는 CLI 모듈입니다.
+
+사용 예시 (src 디렉토리에서 실행):
+    python -m services.mongo_migrations buckets
+    python -m services.mongo_migrations buckets --router chatbot --user-id shaa97102
+    MONGO_CHAT_LAYOUT=consolidated python -m services.mongo_migrations layout --batch-size 200
+    MONGO_TURN_COMPRESSION=zlib python -m services.mongo_migrations compress --router office
+    python -m services.mongo_migrations timestamps
+    python -m services.mongo_migrations turn-dates --timezone +0900
+    python -m services.mongo_migrations usage --before 2024-06-01
+    python -m services.mongo_migrations archive --days 180 --dry-run
+    python -m services.mongo_migrations search-index --user-id shaa97102
+'''
+import re
+import time
+import asyncio
+import argparse
+import datetime
+from collections import Counter
+from typing import Dict, List, Tuple
+
+from bson import ObjectId
+from pymongo import UpdateOne
+from motor.motor_asyncio import AsyncIOMotorCollection
+
+from services import chat_archive, mongodb_client, turn_codec, usage_rollups
+
+ROUTERS = ("office", "chatbot")
+
+# 레이아웃 변환 진행 상황(컬렉션별 마지막으로 처리한 _id)을 저장하는 컬렉션
+LAYOUT_CHECKPOINT_COLLECTION = "chat_layout_migration"
+
+async def find_user_collections(handler: mongodb_client.MongoDBHandler, router: str) -> List[Tuple[str, str]]:
+    """
+    '{router}_log_{user_id}' 형식의 컬렉션을 찾아 (컬렉션 이름, 사용자 ID) 목록을 반환합니다.
+    """
+    pattern = re.compile(rf'^{router}_log_(.+)$')
+    names = await handler.db.list_collection_names(filter={"name": {"$regex": pattern.pattern}})
+    return [(name, pattern.match(name).group(1)) for name in sorted(names)]
+
+async def migrate_buckets(handler: mongodb_client.MongoDBHandler, routers: List[str], user_id: str = None):
+    """
+    기존 'value' 배열 방식의 대화방을 버킷 저장 방식으로 변환합니다.
+    """
+    for router in routers:
+        targets = [(f'{router}_log_{user_id}', user_id)] if user_id else await find_user_collections(handler, router)
+        for collection_name, target_user in targets:
+            migrated = await handler.migrate_to_buckets(user_id=target_user, router=router)
+            print(f"INFO:     {collection_name}: {migrated}개 대화방을 버킷 방식으로 변환했습니다.")
+
+async def move_room(
+    legacy: mongodb_client.ChatLogStore,
+    target: mongodb_client.ChatLogStore,
+    legacy_id: ObjectId,
+    max_attempts: int = 3,
+    retry_delay: float = 0.05
+) -> str:
+    """
+    사용자별 컬렉션의 대화방 하나를 단일 컬렉션으로 옮깁니다.
+
+    서버가 consolidated 레이아웃으로 동작 중이면 복사본이 생긴 뒤의 쓰기는 복사본으로 향합니다.
+    원본은 복사한 시점과 같은 내용일 때만 삭제하며, 그 사이 원본이 바뀌었다면
+    복사본이 아직 수정되지 않은 경우에 한해 다시 복사합니다.
+
+    bucket 방식 대화방은 헤더의 'seq'를 올린 뒤 버킷에 쓰므로, 복사한 버킷에 1부터 'seq'까지의 대화가
+    모두 있을 때만 복사본을 만들고, 원본 헤더를 삭제하기 전에 원본 버킷이 복사한 내용과 같은지 다시 확인합니다.
+
+    :return: 'migrated', 'missing' 또는 'conflict'
+    """
+    legacy_logs = legacy.db[legacy.log_name]
+    legacy_buckets = legacy.db[legacy.bucket_name]
+    target_logs = await target.logs()
+    last_copy = None
+    copied_buckets = None
+
+    async def read_buckets(document_id: str) -> List[Dict]:
+        return [bucket async for bucket in legacy_buckets.find({"id": document_id}, {"_id": 0}).sort("bucket", 1)]
+
+    for attempt in range(max_attempts):
+        if attempt > 0:
+            await asyncio.sleep(retry_delay)
+        snapshot = await legacy_logs.find_one({"_id": legacy_id})
+        if snapshot is None:
+            return "missing"
+
+        document_id = snapshot["id"]
+        bucketed = snapshot.get("storage") == "bucket"
+        current = await target_logs.find_one(target.room(document_id), {"_id": 0})
+        if current is None or current == last_copy:
+            copy = {**target.scope, **{key: value for key, value in snapshot.items() if key not in ("_id", "user_id")}}
+            if bucketed:
+                buckets = await read_buckets(document_id)
+                indexes = sorted(turn.get("index") for bucket in buckets for turn in bucket.get("value") or [])
+                if indexes != list(range(1, snapshot.get("seq", 0) + 1)):
+                    # 헤더에서 인덱스를 예약한 뒤 아직 버킷에 쓰지 않은 대화가 있으면 쓰기가 끝난 뒤 다시 복사
+                    continue
+                target_buckets = await target.buckets()
+                await target_buckets.delete_many(target.room(document_id))
+                for bucket in buckets:
+                    await target_buckets.insert_one({**target.scope, **bucket})
+                copied_buckets = buckets
+            await target_logs.replace_one(target.room(document_id), copy, upsert=True)
+            last_copy = copy
+
+        # 최신 대화 수정은 버킷을 먼저 바꾼 뒤 헤더의 'version'을 올리므로 버킷도 복사한 내용과 같은지 확인
+        if bucketed and copied_buckets is not None and await read_buckets(document_id) != copied_buckets:
+            continue
+        # 복사한 시점의 원본 헤더와 정확히 같을 때만 삭제
+        result = await legacy_logs.delete_one(snapshot)
+        if result.deleted_count > 0:
+            await legacy_buckets.delete_many({"id": document_id})
+            return "migrated"
+    return "conflict"
+
+async def migrate_layout(
+    handler: mongodb_client.MongoDBHandler,
+    routers: List[str],
+    user_id: str = None,
+    batch_size: int = 100,
+    drop_empty: bool = False
+):
+    """
+    사용자별 컬렉션의 대화방을 라우터별 단일 컬렉션으로 배치 단위로 옮깁니다.
+    배치마다 진행 상황을 기록하므로 중단된 뒤 다시 실행하면 이어서 진행합니다.
+    """
+    if handler.layout != "consolidated":
+        raise SystemExit("MONGO_CHAT_LAYOUT=consolidated 상태에서만 실행할 수 있습니다. 서버를 먼저 전환하세요.")
+
+    checkpoints = handler.db[LAYOUT_CHECKPOINT_COLLECTION]
+    for router in routers:
+        targets = [(f'{router}_log_{user_id}', user_id)] if user_id else await find_user_collections(handler, router)
+        for collection_name, target_user in targets:
+            checkpoint = await checkpoints.find_one({"_id": collection_name}) or {}
+            if checkpoint.get("done"):
+                continue
+
+            legacy = handler.per_user_store(router, target_user)
+            target = handler.consolidated_store(router, target_user)
+            legacy_logs = legacy.db[legacy.log_name]
+            counts: Dict[str, int] = Counter()
+            last_id = checkpoint.get("last_id")
+
+            while True:
+                query = {} if last_id is None else {"_id": {"$gt": last_id}}
+                batch = await legacy_logs.find(query, {"_id": 1}).sort("_id", 1).limit(batch_size).to_list(length=batch_size)
+                if not batch:
+                    break
+                for document in batch:
+                    counts[await move_room(legacy, target, document["_id"])] += 1
+                last_id = batch[-1]["_id"]
+                await checkpoints.update_one(
+                    {"_id": collection_name},
+                    {"$set": {"router": router, "user_id": target_user, "last_id": last_id}},
+                    upsert=True
+                )
+
+            # 충돌로 남은 대화방이 있으면 다음 실행에서 처음부터 다시 확인
+            remaining = await legacy_logs.count_documents({})
+            await checkpoints.update_one(
+                {"_id": collection_name},
+                {"$set": {"done": remaining == 0, "last_id": None if remaining else last_id}},
+                upsert=True
+            )
+            if remaining == 0 and drop_empty:
+                await legacy_logs.drop()
+                await legacy.db[legacy.bucket_name].drop()
+
+            print(
+                f"INFO:     {collection_name}: 이동 {counts['migrated']}, 충돌 {counts['conflict']}, "
+                f"남은 대화방 {remaining}"
+            )
+
+async def compress_collection(
+    collection: AsyncIOMotorCollection,
+    codec: turn_codec.TurnCodec,
+    query: Dict,
+    batch_size: int = 100
+) -> int:
+    """
+    컬렉션에 압축하지 않은 채 저장된 큰 대화 턴을 압축된 형식으로 다시 씁니다.
+    턴마다 읽은 시점과 같은 내용일 때만 교체하므로 서버가 동작 중이어도 실행할 수 있으며,
+    그 사이 수정된 턴은 건너뛰고 다음 실행에서 다시 확인합니다.
+
+    :return: 압축한 대화 턴 수
+    """
+    fields = turn_codec.COMPRESSED_FIELDS
+    # 기준 크기 이상의 문자열 필드가 있는 문서만 서버에서 골라 전송
+    large_turn = {"$or": [
+        {"$cond": [
+            {"$eq": [{"$type": f"$$turn.{field}"}, "string"]},
+            {"$gte": [{"$strLenBytes": f"$$turn.{field}"}, codec.min_bytes]},
+            False
+        ]}
+        for field in fields
+    ]}
+    query = {**query, "$expr": {"$anyElementTrue": [
+        {"$map": {"input": {"$ifNull": ["$value", []]}, "as": "turn", "in": large_turn}}
+    ]}}
+
+    compressed = 0
+    requests: List[UpdateOne] = []
+
+    async def write() -> None:
+        nonlocal compressed
+        if requests:
+            result = await collection.bulk_write(requests, ordered=False)
+            compressed += result.modified_count
+            requests.clear()
+
+    async for document in collection.find(query, {"_id": 1, "value": 1}):
+        for turn in document.get("value") or []:
+            encoded = codec.encode(turn)
+            changed = [field for field in fields if encoded.get(field) is not turn.get(field)]
+            if not changed:
+                continue
+            requests.append(UpdateOne(
+                {"_id": document["_id"], "value": {"$elemMatch": {
+                    "index": turn.get("index"),
+                    **{field: turn[field] for field in changed}
+                }}},
+                {"$set": {
+                    **{f"value.$.{field}": encoded[field] for field in changed},
+                    "value.$.compressed": encoded["compressed"]
+                }}
+            ))
+            if len(requests) >= batch_size:
+                await write()
+    await write()
+    return compressed
+
+async def compress_turns(
+    handler: mongodb_client.MongoDBHandler,
+    routers: List[str],
+    user_id: str = None,
+    batch_size: int = 100
+):
+    """
+    이미 저장된 대화방의 큰 대화 턴을 현재 압축 설정으로 다시 씁니다.
+    embedded 방식 대화방과 버킷 문서를 모두 처리하며, 여러 번 실행해도 결과가 같습니다.
+    """
+    if not handler.codec.enabled:
+        raise SystemExit("MONGO_TURN_COMPRESSION=zlib 또는 zstd 상태에서만 실행할 수 있습니다.")
+
+    for router in routers:
+        user_collections = [] if user_id else await find_user_collections(handler, router)
+        for store in target_stores(handler, router, user_collections, user_id):
+            embedded = await compress_collection(
+                handler.db[store.log_name], handler.codec, {**store.scope, "storage": {"$ne": "bucket"}}, batch_size
+            )
+            bucketed = await compress_collection(
+                handler.db[store.bucket_name], handler.codec, dict(store.scope), batch_size
+            )
+            if embedded or bucketed:
+                print(f"INFO:     {store.log_name}: 대화 턴 {embedded + bucketed}개를 압축했습니다.")
+
+def target_stores(handler: mongodb_client.MongoDBHandler, router: str, user_collections: List[Tuple[str, str]], user_id: str = None) -> List[mongodb_client.ChatLogStore]:
+    """
+    변환 대상 저장소 목록을 반환합니다. 사용자를 지정하지 않으면 모든 사용자별 컬렉션과 단일 컬렉션 전체가 대상입니다.
+    """
+    if user_id:
+        return handler._stores(router, user_id)
+    stores = [handler.per_user_store(router, target_user) for _, target_user in user_collections]
+    if handler.layout == "consolidated":
+        stores.append(mongodb_client.ChatLogStore(handler.db, handler.index_manager, f'{router}_log', f'{router}_bucket', {}))
+    return stores
+
+def room_time_expr(handler: mongodb_client.MongoDBHandler, expr) -> Dict:
+    """
+    대화 턴의 timestamp(date 또는 변환 전 문자열)를 대화방 시간 필드의 문자열 형식으로 바꾸는 집계 표현식입니다.
+    """
+    return {"$cond": [
+        {"$eq": [{"$type": expr}, "date"]},
+        {"$dateToString": {"date": expr, "format": mongodb_client.TIMESTAMP_FORMAT, "timezone": handler.legacy_timezone}},
+        expr
+    ]}
+
+async def backfill_room_timestamps(handler: mongodb_client.MongoDBHandler, routers: List[str], user_id: str = None):
+    """
+    생성 시간('created_at')과 마지막 대화 시간('updated_at')이 없는 기존 대화방에 첫/마지막 대화 시간을 기록합니다.
+    이미 값이 있는 필드는 바꾸지 않으므로 서버가 동작 중이어도 여러 번 실행할 수 있습니다.
+    """
+    missing = {"$or": [{"created_at": {"$exists": False}}, {"updated_at": {"$exists": False}}]}
+    for router in routers:
+        user_collections = [] if user_id else await find_user_collections(handler, router)
+        for store in target_stores(handler, router, user_collections, user_id):
+            logs = handler.db[store.log_name]
+            buckets = handler.db[store.bucket_name]
+
+            # embedded 방식은 서버에서 'value' 배열의 첫/마지막 대화 시간을 계산
+            result = await logs.update_many(
+                {**store.scope, "storage": {"$ne": "bucket"}, **missing},
+                [{"$set": {
+                    # BSON 정렬 순서상 문자열이 date보다 작으므로 최솟값은 변환 전 기록, 최댓값은 최신 기록
+                    "created_at": {"$ifNull": ["$created_at", room_time_expr(handler, {"$min": "$value.timestamp"})]},
+                    "updated_at": {"$ifNull": ["$updated_at", room_time_expr(handler, {"$max": "$value.timestamp"})]},
+                }}]
+            )
+            updated = result.modified_count
+
+            # bucket 방식은 첫 번째와 마지막 버킷만 읽음
+            async for header in logs.find({**store.scope, "storage": "bucket", **missing}, {"_id": 1, "id": 1}):
+                room = {**store.scope, "id": header["id"]}
+                first = await buckets.find_one(room, {"_id": 0, "value.timestamp": 1}, sort=[("bucket", 1)])
+                last = await buckets.find_one(room, {"_id": 0, "value.timestamp": 1}, sort=[("bucket", -1)])
+                first_times = [
+                    handler.render_timestamp(turn["timestamp"])
+                    for turn in (first or {}).get("value") or [] if turn.get("timestamp")
+                ]
+                last_times = [
+                    handler.render_timestamp(turn["timestamp"])
+                    for turn in (last or {}).get("value") or [] if turn.get("timestamp")
+                ]
+                result = await logs.update_one(
+                    {"_id": header["_id"]},
+                    [{"$set": {
+                        "created_at": {"$ifNull": ["$created_at", {"$literal": min(first_times, default=None)}]},
+                        "updated_at": {"$ifNull": ["$updated_at", {"$literal": max(last_times, default=None)}]},
+                    }}]
+                )
+                updated += result.modified_count
+            if updated:
+                print(f"INFO:     {store.log_name}: {updated}개 대화방의 생성/마지막 대화 시간을 기록했습니다.")
+
+async def convert_turn_dates(handler: mongodb_client.MongoDBHandler, routers: List[str], user_id: str = None):
+    """
+    문자열('%Y-%m-%d %H:%M:%S', handler.legacy_timezone 기준)로 저장된 대화 턴의 timestamp를 UTC BSON date로 변환합니다.
+    변환은 서버에서 파이프라인 update로 수행하며, 문자열 timestamp가 남은 문서만 다시 쓰므로 서버가 동작 중이어도 여러 번 실행할 수 있습니다.
+    형식이 맞지 않는 문자열은 그대로 둡니다.
+    """
+    converted = {"$ifNull": [handler._timestamp_expr("$$turn.timestamp"), "$$turn.timestamp"]}
+    pipeline = [{"$set": {"value": {"$map": {
+        "input": "$value",
+        "as": "turn",
+        "in": {"$cond": [
+            {"$eq": [{"$type": "$$turn.timestamp"}, "string"]},
+            {"$mergeObjects": ["$$turn", {"timestamp": converted}]},
+            "$$turn"
+        ]}
+    }}}}]
+    legacy = {"value.timestamp": {"$type": "string"}}
+
+    for router in routers:
+        user_collections = [] if user_id else await find_user_collections(handler, router)
+        for store in target_stores(handler, router, user_collections, user_id):
+            logs = await store.logs()
+            buckets = await store.buckets()
+            result = await logs.update_many({**store.scope, "storage": {"$ne": "bucket"}, **legacy}, pipeline)
+            updated = result.modified_count
+            result = await buckets.update_many({**store.scope, **legacy}, pipeline)
+            updated += result.modified_count
+            if updated:
+                print(f"INFO:     {store.log_name}: {updated}개 문서의 대화 시간을 date로 변환했습니다.")
+
+async def rebuild_usage(handler: mongodb_client.MongoDBHandler, routers: List[str], before: str):
+    """
+    기존 대화방을 모두 읽어 before 날짜 이전의 일별 사용량 집계를 다시 계산합니다.
+    집계 문서를 계산한 값으로 덮어쓰므로 여러 번 실행해도 결과가 같으며,
+    실시간 집계가 시작된 날(before)부터의 집계는 바꾸지 않습니다.
+    """
+    users = set()
+    for router in routers:
+        users.update(target_user for _, target_user in await find_user_collections(handler, router))
+        if handler.layout == "consolidated":
+            users.update(await handler.db[f'{router}_log'].distinct("user_id"))
+
+    totals: Dict[str, Dict] = {}
+    for user_id in sorted(users):
+        # 대화 턴은 대화방 단위로 이어서 반환되므로 현재 대화방의 날짜만 기억하면 활성 대화방 수를 셀 수 있음
+        current_room, room_days = None, set()
+        async for row in handler.iter_user_log(user_id, routers):
+            day = str(row.get("timestamp") or "")[:10]
+            if not day or day >= before:
+                continue
+            key = usage_rollups.UsageRollups.key(day, row["router"], row.get("character_idx"))
+            entry = totals.setdefault(key, {
+                "date": day,
+                "router": row["router"],
+                "character_idx": row.get("character_idx"),
+                **{field: 0 for field in usage_rollups.COUNTER_FIELDS}
+            })
+            for field, value in usage_rollups.UsageRollups.counters([row]).items():
+                entry[field] += value
+
+            room = (row["router"], row["document_id"])
+            if room != current_room:
+                current_room, room_days = room, set()
+            if key not in room_days:
+                room_days.add(key)
+                entry["active_rooms"] += 1
+
+    collection = handler.db[usage_rollups.USAGE_COLLECTION]
+    await handler.index_manager.ensure(collection)
+    for key, entry in totals.items():
+        await collection.replace_one({"_id": key}, entry, upsert=True)
+    print(f"INFO:     사용자 {len(users)}명의 {before} 이전 일별 집계 {len(totals)}개를 다시 계산했습니다.")
+
+async def archive_inactive(
+    handler: mongodb_client.MongoDBHandler,
+    routers: List[str],
+    days: int,
+    user_id: str = None,
+    dry_run: bool = False
+):
+    """
+    days일 동안 대화나 복원이 없었던 대화방을 보관 컬렉션으로 옮기고, 실행 지표를 출력한 뒤 chat_archive_runs에 기록합니다.
+    dry_run이면 옮기지 않고 보관 대상과 예상 압축 결과만 계산합니다.
+    """
+    started_at = datetime.datetime.now(datetime.timezone.utc)
+    started = time.perf_counter()
+    cutoff = (datetime.datetime.now() - datetime.timedelta(days=days)).strftime(mongodb_client.TIMESTAMP_FORMAT)
+
+    totals: Dict[str, Dict[str, int]] = {}
+    for router in routers:
+        users = {user_id} if user_id else set(target_user for _, target_user in await find_user_collections(handler, router))
+        if not user_id and handler.layout == "consolidated":
+            users.update(await handler.db[f'{router}_log'].distinct("user_id"))
+
+        metrics = totals.setdefault(router, {field: 0 for field in chat_archive.METRIC_FIELDS})
+        for target_user in sorted(users):
+            for field, value in (await handler.archive_inactive_rooms(target_user, router, cutoff, dry_run=dry_run)).items():
+                metrics[field] += value
+        ratio = metrics["archived_bytes"] / metrics["raw_bytes"] if metrics["raw_bytes"] else 0
+        print(
+            f"INFO:     {router}: {'보관 대상' if dry_run else '보관'} {metrics['archived']}/{metrics['scanned']}개 대화방 "
+            f"(대화 {metrics['turns']}개, {metrics['raw_bytes']} → {metrics['archived_bytes']} byte, 압축률 {ratio:.2f}), "
+            f"새 대화로 건너뜀 {metrics['skipped']}개"
+        )
+
+    run = {
+        "started_at": started_at,
+        "duration_seconds": round(time.perf_counter() - started, 3),
+        "dry_run": dry_run,
+        "days": days,
+        "cutoff": cutoff,
+        "user_id": user_id,
+        "routers": totals,
+    }
+    await handler.db[chat_archive.RUNS_COLLECTION].insert_one(run)
+    print(f"INFO:     {run['duration_seconds']}초 동안 실행했습니다 (dry_run={dry_run}, 기준 시간 {cutoff}).")
+
+async def build_search_index(handler: mongodb_client.MongoDBHandler, routers: List[str], user_id: str = None, batch_size: int = 500):
+    """
+    기존 대화를 모두 읽어 검색 색인(chat_search)을 만듭니다.
+    대화 인덱스 기준으로 덮어쓰므로 서버가 동작 중이어도 여러 번 실행할 수 있습니다.
+    """
+    users = {user_id} if user_id else set()
+    if not user_id:
+        for router in routers:
+            users.update(target_user for _, target_user in await find_user_collections(handler, router))
+            if handler.layout == "consolidated":
+                users.update(await handler.db[f'{router}_log'].distinct("user_id"))
+
+    def stored_timestamp(value):
+        # iter_user_log는 응답 형식(서버 로컬 시간 문자열)으로 반환하므로 저장 형식(UTC)으로 되돌림
+        if isinstance(value, str):
+            try:
+                return datetime.datetime.strptime(value, mongodb_client.TIMESTAMP_FORMAT).astimezone(datetime.timezone.utc)
+            except ValueError:
+                return None
+        return value
+
+    async def flush(target_user: str, rows: List[Dict]):
+        room = rows[0]
+        await handler.search.index_turns(
+            room["router"], target_user, room["document_id"], room.get("character_idx"),
+            [(row["index"], {**row, "timestamp": stored_timestamp(row.get("timestamp"))}) for row in rows]
+        )
+
+    indexed = 0
+    for target_user in sorted(users):
+        # 대화 턴은 대화방 단위로 이어서 반환되므로 대화방이 바뀌거나 batch_size를 채우면 색인
+        batch: List[Dict] = []
+        async for row in handler.iter_user_log(target_user, routers):
+            room = (row["router"], row["document_id"])
+            if batch and (len(batch) >= batch_size or room != (batch[0]["router"], batch[0]["document_id"])):
+                await flush(target_user, batch)
+                batch = []
+            batch.append(row)
+            indexed += 1
+        if batch:
+            await flush(target_user, batch)
+    print(f"INFO:     사용자 {len(users)}명의 대화 {indexed}개를 검색 색인에 추가했습니다.")
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(description="MongoDB 채팅 로그 변환 도구")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    buckets = subparsers.add_parser("buckets", help="'value' 배열을 고정 크기 버킷 문서로 분할")
+    buckets.add_argument("--router", choices=ROUTERS, action="append", help="대상 라우터 (기본값: 전체)")
+    buckets.add_argument("--user-id", help="특정 사용자만 변환")
+
+    layout = subparsers.add_parser("layout", help="사용자별 컬렉션을 라우터별 단일 컬렉션으로 이동")
+    layout.add_argument("--router", choices=ROUTERS, action="append", help="대상 라우터 (기본값: 전체)")
+    layout.add_argument("--user-id", help="특정 사용자만 이동")
+    layout.add_argument("--batch-size", type=int, default=100, help="한 번에 처리할 대화방 수")
+    layout.add_argument("--drop-empty", action="store_true", help="모두 이동한 사용자별 컬렉션 삭제")
+
+    compress = subparsers.add_parser("compress", help="저장된 큰 대화 턴을 현재 압축 설정으로 다시 쓰기")
+    compress.add_argument("--router", choices=ROUTERS, action="append", help="대상 라우터 (기본값: 전체)")
+    compress.add_argument("--user-id", help="특정 사용자만 압축")
+    compress.add_argument("--batch-size", type=int, default=100, help="한 번에 쓰는 대화 턴 수")
+
+    timestamps = subparsers.add_parser("timestamps", help="기존 대화방에 생성/마지막 대화 시간 기록")
+    timestamps.add_argument("--router", choices=ROUTERS, action="append", help="대상 라우터 (기본값: 전체)")
+    timestamps.add_argument("--user-id", help="특정 사용자만 기록")
+
+    turn_dates = subparsers.add_parser("turn-dates", help="문자열로 저장된 대화 턴 시간을 UTC date로 변환")
+    turn_dates.add_argument("--router", choices=ROUTERS, action="append", help="대상 라우터 (기본값: 전체)")
+    turn_dates.add_argument("--user-id", help="특정 사용자만 변환")
+    turn_dates.add_argument(
+        "--timezone",
+        help="기존 문자열이 기록된 서버 시간대 (예: +0900, Asia/Seoul, 기본값: MONGO_LEGACY_TIMEZONE 또는 서버 로컬 시간대)"
+    )
+
+    usage = subparsers.add_parser("usage", help="기존 대화로 일별 사용량 집계 다시 계산")
+    usage.add_argument("--router", choices=ROUTERS, action="append", help="대상 라우터 (기본값: 전체)")
+    usage.add_argument(
+        "--before",
+        default=datetime.date.today().isoformat(),
+        help="이 날짜(YYYY-MM-DD) 이전만 다시 계산 (기본값: 오늘, 실시간 집계를 켠 날짜를 지정)"
+    )
+
+    archive = subparsers.add_parser("archive", help="오래 사용하지 않은 대화방을 압축하여 보관 컬렉션으로 이동")
+    archive.add_argument("--router", choices=ROUTERS, action="append", help="대상 라우터 (기본값: 전체)")
+    archive.add_argument("--user-id", help="특정 사용자만 보관")
+    archive.add_argument("--days", type=int, default=180, help="이 기간(일) 동안 대화가 없던 대화방을 보관")
+    archive.add_argument("--dry-run", action="store_true", help="옮기지 않고 보관 대상과 압축 결과만 출력")
+
+    search_index = subparsers.add_parser("search-index", help="기존 대화로 검색 색인 만들기")
+    search_index.add_argument("--router", choices=ROUTERS, action="append", help="대상 라우터 (기본값: 전체)")
+    search_index.add_argument("--user-id", help="특정 사용자만 색인")
+    search_index.add_argument("--batch-size", type=int, default=500, help="한 번에 쓰는 대화 턴 수")
+    return parser
+
+async def main(argv: List[str] = None):
+    args = build_parser().parse_args(argv)
+    handler = mongodb_client.MongoDBHandler()
+    try:
+        if args.command == "buckets":
+            await migrate_buckets(handler, args.router or list(ROUTERS), args.user_id)
+        elif args.command == "layout":
+            await migrate_layout(
+                handler,
+                args.router or list(ROUTERS),
+                args.user_id,
+                batch_size=args.batch_size,
+                drop_empty=args.drop_empty
+            )
+        elif args.command == "compress":
+            await compress_turns(handler, args.router or list(ROUTERS), args.user_id, batch_size=args.batch_size)
+        elif args.command == "timestamps":
+            await backfill_room_timestamps(handler, args.router or list(ROUTERS), args.user_id)
+        elif args.command == "turn-dates":
+            if args.timezone:
+                handler.legacy_timezone = args.timezone
+            await convert_turn_dates(handler, args.router or list(ROUTERS), args.user_id)
+        elif args.command == "usage":
+            await rebuild_usage(handler, args.router or list(ROUTERS), args.before)
+        elif args.command == "search-index":
+            await build_search_index(handler, args.router or list(ROUTERS), args.user_id, batch_size=args.batch_size)
+        elif args.command == "archive":
+            await archive_inactive(handler, args.router or list(ROUTERS), args.days, args.user_id, dry_run=args.dry_run)
+    finally:
+        handler.client.close()
+
+if __name__ == "__main__":
+    asyncio.run(main())
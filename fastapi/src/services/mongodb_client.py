@@ -1,15 +1,84 @@
 import os
+import json
 import uuid
+import base64
+import asyncio
 import datetime
 
 from pathlib import Path
 from dotenv import load_dotenv
-from typing import Dict, List
-from motor.motor_asyncio import AsyncIOMotorClient
-from pymongo.errors import PyMongoError
+from typing import AsyncIterator, Awaitable, Callable, Dict, List, Optional, Sequence, Tuple
+from motor.motor_asyncio import AsyncIOMotorClient, AsyncIOMotorCollection, AsyncIOMotorDatabase
+from pymongo import ReturnDocument, UpdateOne
+from pymongo.errors import BulkWriteError, DuplicateKeyError, PyMongoError
 
 
-from utils import error_tools
+from utils import error_tools, text_metrics
+from . import cache_backends, chat_archive, chat_cache, chat_search, idempotency, mongo_indexes, turn_codec, usage_rollups, write_buffer
+
+# 응답과 대화방 문서(created_at, updated_at)에 사용하는 시간 문자열 형식 (서버 로컬 시간)
+TIMESTAMP_FORMAT = "%Y-%m-%d %H:%M:%S"
+
+# 최근 대화 문맥(get_recent_context)을 처음 읽을 때의 대화 턴 수
+CONTEXT_PAGE_SIZE = 32
+
+class RoomNotFoundException(error_tools.NotFoundException):
+    """
+    대화방 문서 자체가 해당 저장소에 없음을 나타내는 예외입니다.
+    컬렉션 레이아웃 전환 중에는 이 예외가 발생하면 다음 저장소에서 다시 찾습니다.
+    """
+
+class ChatLogStore:
+    def __init__(
+        self,
+        db: AsyncIOMotorDatabase,
+        index_manager: mongo_indexes.IndexManager,
+        log_name: str,
+        bucket_name: str,
+        scope: Dict
+    ) -> None:
+        """
+        대화방 문서와 버킷 문서가 저장되는 컬렉션, 그리고 사용자 범위 조건을 묶은 클래스입니다.
+
+        :param log_name: 대화방 문서(헤더) 컬렉션 이름
+        :param bucket_name: 버킷 문서 컬렉션 이름
+        :param scope: 모든 조회 조건에 추가되는 사용자 범위 조건 (사용자별 컬렉션이면 빈 dict)
+        """
+        self.db = db
+        self.index_manager = index_manager
+        self.log_name = log_name
+        self.bucket_name = bucket_name
+        self.scope = scope
+
+    async def logs(self, ensure_indexes: bool = True) -> AsyncIOMotorCollection:
+        """
+        대화방 문서 컬렉션을 반환합니다.
+        조회 전용 요청은 ensure_indexes=False로 호출하여 존재하지 않는 컬렉션이 생성되지 않도록 합니다.
+        """
+        collection = self.db[self.log_name]
+        if ensure_indexes:
+            await self.index_manager.ensure(collection)
+        return collection
+
+    async def buckets(self) -> AsyncIOMotorCollection:
+        """
+        버킷 문서 컬렉션을 반환합니다.
+        """
+        collection = self.db[self.bucket_name]
+        await self.index_manager.ensure(collection)
+        return collection
+
+    def room(self, document_id: str, **conditions) -> Dict:
+        """
+        대화방 문서를 찾는 조회 조건을 생성합니다.
+        """
+        return {**self.scope, "id": document_id, **conditions}
+
+    def bucket(self, document_id: str, bucket_no, **conditions) -> Dict:
+        """
+        버킷 문서를 찾는 조회 조건을 생성합니다.
+        """
+        return {**self.scope, "id": document_id, "bucket": bucket_no, **conditions}
 
 class MongoDBHandler:
     def __init__(self) -> None:
@@ -38,9 +107,84 @@ class MongoDBHandler:
                 f"mongodb://{mongo_user}:{mongo_password}@{mongo_host}:{mongo_port}/{mongo_db}?authSource={mongo_auth}"
             )
             
+            # 채팅 로그 저장 방식 설정
+            # - embedded: 대화방 문서 하나의 'value' 배열에 모든 대화를 저장 (기존 방식)
+            # - bucket: 대화방 헤더 문서 + 고정 크기 버킷 문서({router}_bucket_{user_id})에 나눠 저장
+            self.storage_mode = os.getenv("MONGO_CHAT_STORAGE", "embedded")
+            if self.storage_mode not in ("embedded", "bucket"):
+                raise ValueError(f"지원하지 않는 MONGO_CHAT_STORAGE 값입니다: {self.storage_mode}")
+            self.bucket_size = int(os.getenv("MONGO_CHAT_BUCKET_SIZE", 100))
+            if self.bucket_size <= 0:
+                raise ValueError("MONGO_CHAT_BUCKET_SIZE는 양수여야 합니다.")
+
+            # 채팅 로그 컬렉션 레이아웃 설정
+            # - per_user: 사용자마다 '{router}_log_{user_id}' 컬렉션 사용 (기존 방식)
+            # - consolidated: 라우터마다 '{router}_log' 컬렉션 하나에 (user_id, id)로 저장
+            #   전환 중에는 consolidated에 없는 대화방을 사용자별 컬렉션에서 찾아 계속 제공
+            self.layout = os.getenv("MONGO_CHAT_LAYOUT", "per_user")
+            if self.layout not in ("per_user", "consolidated"):
+                raise ValueError(f"지원하지 않는 MONGO_CHAT_LAYOUT 값입니다: {self.layout}")
+
             # MongoDB 클라이언트 초기화
             self.client = AsyncIOMotorClient(self.mongo_uri)
             self.db = self.client[mongo_db]
+
+            # 사용자별 컬렉션의 인덱스를 처음 사용할 때 생성하는 관리자
+            self.index_manager = mongo_indexes.IndexManager(self.db)
+
+            # 채팅 로그 조회 캐시 설정 (MONGO_CHAT_CACHE_TTL=0이면 사용하지 않음)
+            # 다른 워커의 쓰기가 반영되도록 CACHE_BACKEND=redis일 때만 기본으로 사용 (memory는 단일 워커용으로 직접 설정)
+            log_cache_backend = cache_backends.create_cache_backend()
+            self.log_cache = chat_cache.ChatLogCache(
+                log_cache_backend,
+                ttl=cache_backends.shared_ttl(log_cache_backend, "MONGO_CHAT_CACHE_TTL", 300)
+            )
+
+            # 대화 턴 추가를 대화방별로 모아서 쓰는 write-behind 버퍼 설정 (기본값: 사용 안 함)
+            self.write_buffer = write_buffer.WriteBehindBuffer(
+                self._flush_turns,
+                enabled=os.getenv("MONGO_WRITE_BEHIND", "false").lower() == "true",
+                interval=int(os.getenv("MONGO_WRITE_BEHIND_INTERVAL_MS", 50)) / 1000,
+                max_turns=int(os.getenv("MONGO_WRITE_BEHIND_MAX_TURNS", 50)),
+                durability=os.getenv("MONGO_WRITE_BEHIND_DURABILITY", "flush")
+            )
+
+            # 큰 output_data를 압축하여 저장하는 설정 (기본값: 사용 안 함)
+            # 설정과 관계없이 이미 압축되어 저장된 대화는 읽을 때 항상 복원
+            self.codec = turn_codec.TurnCodec(
+                algorithm=os.getenv("MONGO_TURN_COMPRESSION", "off"),
+                min_bytes=int(os.getenv("MONGO_TURN_COMPRESSION_MIN_BYTES", 2048))
+            )
+
+            # 문자열로 저장된 기존 대화 턴의 timestamp를 해석할 시간대 (예: '+0900', 기본값: 서버 로컬 시간대)
+            self.legacy_timezone = os.getenv("MONGO_LEGACY_TIMEZONE") or datetime.datetime.now().astimezone().strftime("%z")
+
+            # 오래 사용하지 않은 대화방의 보관 저장소 (MONGO_ARCHIVE_DATABASE를 설정하면 별도 데이터베이스 사용)
+            archive_db = os.getenv("MONGO_ARCHIVE_DATABASE")
+            self.archive = chat_archive.ChatArchive(self.client[archive_db] if archive_db else self.db, self.index_manager)
+
+            # Idempotency-Key 헤더로 재시도된 쓰기 요청을 한 번만 처리하기 위한 응답 저장소
+            # (IDEMPOTENCY_TTL=0이면 사용하지 않음, 다른 워커로 재시도된 요청도 찾도록 CACHE_BACKEND=redis일 때만 기본으로 사용)
+            idempotency_backend = cache_backends.create_cache_backend()
+            self.idempotency = idempotency.IdempotencyStore(
+                idempotency_backend,
+                ttl=cache_backends.shared_ttl(idempotency_backend, "IDEMPOTENCY_TTL", 86400)
+            )
+
+            # 대화 턴 추가, 수정, 삭제 후 백그라운드에서 갱신하는 검색용 n-gram 색인 (chat_search, 기본값: 사용 안 함)
+            self.search = chat_search.ChatSearchIndex(
+                self.db,
+                self.index_manager,
+                enabled=os.getenv("MONGO_SEARCH_INDEX", "false").lower() == "true",
+                max_grams=int(os.getenv("MONGO_SEARCH_MAX_GRAMS", 256))
+            )
+
+            # 대화 턴 추가 후 백그라운드에서 더하는 일별 사용량 집계 (chat_usage_daily, 기본값: 사용 안 함)
+            self.usage = usage_rollups.UsageRollups(
+                self.db,
+                self.index_manager,
+                enabled=os.getenv("MONGO_USAGE_ROLLUPS", "false").lower() == "true"
+            )
         except PyMongoError as e:
             raise error_tools.InternalServerErrorException(detail=f"MongoDB connection error: {str(e)}")
         except Exception as e:
@@ -79,6 +223,656 @@ class MongoDBHandler:
         except Exception as e:
             raise error_tools.InternalServerErrorException(detail=f"Unexpected error: {str(e)}")
 
+    async def initialize(self) -> None:
+        """
+        애플리케이션 시작 시 호출되어 인덱스 관리 작업을 준비합니다.
+        MONGO_INDEX_BACKFILL_ON_STARTUP이 설정되면 기존 컬렉션의 인덱스를 백그라운드에서 생성합니다.
+        """
+        if os.getenv("MONGO_INDEX_BACKFILL_ON_STARTUP", "false").lower() == "true":
+            self.index_manager.start_backfill()
+        self.write_buffer.start()
+
+    async def close(self) -> None:
+        """
+        애플리케이션 종료 시 백그라운드 작업을 정리하고 연결을 닫습니다.
+        """
+        await self.write_buffer.close()
+        await self.search.close()
+        await self.usage.close()
+        await self.index_manager.close()
+        await self.log_cache.backend.close()
+        await self.idempotency.backend.close()
+        self.client.close()
+
+    async def flush_writes(self) -> Dict:
+        """
+        write-behind 버퍼에 남은 대화 턴을 모두 MongoDB에 반영하고 버퍼 지표를 반환합니다.
+        """
+        await self.write_buffer.flush_all()
+        return self.write_buffer.stats()
+
+    def get_write_buffer_stats(self) -> Dict:
+        """
+        write-behind 버퍼의 반영 횟수, 묶음 크기, 대기 중인 대화 턴 수를 반환합니다.
+        """
+        return self.write_buffer.stats()
+
+    async def get_cache_stats(self) -> Dict:
+        """
+        채팅 로그 조회 캐시의 적중률과 메모리 사용량을 반환합니다.
+        """
+        return await self.log_cache.full_stats()
+
+    def per_user_store(self, router: str, user_id: str) -> ChatLogStore:
+        """
+        사용자별 컬렉션 레이아웃의 저장소를 반환합니다.
+        """
+        return ChatLogStore(self.db, self.index_manager, f'{router}_log_{user_id}', f'{router}_bucket_{user_id}', {})
+
+    def consolidated_store(self, router: str, user_id: str) -> ChatLogStore:
+        """
+        라우터별 단일 컬렉션 레이아웃의 저장소를 반환합니다.
+        """
+        return ChatLogStore(self.db, self.index_manager, f'{router}_log', f'{router}_bucket', {"user_id": user_id})
+
+    def _stores(self, router: str, user_id: str) -> List[ChatLogStore]:
+        """
+        대화방을 찾을 저장소 목록을 우선순위 순으로 반환합니다. 첫 번째 저장소에 새 대화방이 생성됩니다.
+        """
+        if self.layout == "consolidated":
+            return [self.consolidated_store(router, user_id), self.per_user_store(router, user_id)]
+        return [self.per_user_store(router, user_id)]
+
+    async def _in_room_store(
+        self,
+        router: str,
+        user_id: str,
+        document_id: str,
+        operation: Callable[[ChatLogStore], Awaitable],
+        restore: bool = True
+    ):
+        """
+        대화방이 있는 저장소를 우선순위 순으로 찾아 operation을 실행합니다.
+        operation이 RoomNotFoundException을 발생시키면 다음 저장소에서 다시 시도하고,
+        어느 저장소에도 없으면 보관된 대화방을 우선 저장소로 복원한 뒤 다시 실행합니다.
+
+        :param restore: False이면 보관된 대화방을 복원하지 않고 RoomNotFoundException을 그대로 발생 (삭제 요청용)
+        """
+        stores = self._stores(router, user_id)
+        for store in stores[:-1]:
+            try:
+                return await operation(store)
+            except RoomNotFoundException:
+                continue
+        try:
+            return await operation(stores[-1])
+        except RoomNotFoundException:
+            if not restore or not await self._restore_room(router, user_id, document_id):
+                raise
+        return await operation(stores[0])
+
+    async def _restore_room(self, router: str, user_id: str, document_id: str) -> bool:
+        """
+        보관된 대화방을 보관 당시의 저장 방식(embedded | bucket)으로 우선 저장소에 복원합니다.
+        복원 시간('restored_at')을 기록하여 다음 보관 작업에서 바로 다시 보관되지 않도록 합니다.
+
+        :return: 보관된 대화방이 있어 복원했으면 True
+        """
+        archived = await self.archive.find(router, user_id, document_id)
+        if archived is None:
+            return False
+
+        store = self._stores(router, user_id)[0]
+        collection = await store.logs()
+        header = {**archived["header"], **store.scope, "restored_at": self._now()}
+        turns = self.archive.unpack(archived)
+        if header.get("storage") == "bucket":
+            grouped: Dict[int, List[Dict]] = {}
+            for turn in turns:
+                grouped.setdefault(self._bucket_no(turn["index"]), []).append(turn)
+            buckets = await store.buckets()
+            for bucket_no, items in grouped.items():
+                await buckets.replace_one(
+                    store.bucket(document_id, bucket_no),
+                    store.bucket(document_id, bucket_no, value=items),
+                    upsert=True
+                )
+        else:
+            header["value"] = turns
+
+        try:
+            await collection.insert_one(header)
+        except DuplicateKeyError:
+            # 다른 요청이 먼저 복원한 경우
+            pass
+        await self.archive.delete(router, user_id, document_id)
+        self.archive.restores += 1
+        return True
+
+    def _bucket_no(self, index: int) -> int:
+        """
+        대화 인덱스(1부터 시작)가 속하는 버킷 번호(0부터 시작)를 계산합니다.
+        """
+        return (index - 1) // self.bucket_size
+
+    @staticmethod
+    def _now() -> str:
+        """
+        대화방에 기록하는 현재 시간 문자열을 반환합니다.
+        """
+        return datetime.datetime.now().strftime(TIMESTAMP_FORMAT)
+
+    def _new_room_document(self, document_id: str) -> Dict:
+        """
+        현재 저장 방식에 맞는 새 대화방 문서를 생성합니다.
+        생성 시간('created_at')과 마지막 대화 시간('updated_at')을 함께 기록합니다.
+        'version'은 대화를 추가, 수정, 삭제할 때마다 1씩 증가하며 조회 응답의 ETag로 사용합니다 (없으면 0).
+        """
+        now = self._now()
+        if self.storage_mode == "bucket":
+            return {"id": document_id, "storage": "bucket", "seq": 0, "version": 0, "created_at": now, "updated_at": now}
+        return {"id": document_id, "value": [], "version": 0, "created_at": now, "updated_at": now}
+
+    @staticmethod
+    def _build_turn(new_data: Dict) -> Dict:
+        """
+        요청 데이터에서 'id', 'user_id' 필드를 제외하고 현재 시간을 추가한 대화 턴을 생성합니다.
+        최근 대화 구간 조회 시 다시 계산하지 않도록 글자 수('chars')와 토큰 수('tokens')를 함께 저장합니다.
+        """
+        turn = {
+            key: value for key, value in new_data.items() if key not in ['id', 'user_id']
+        }
+        turn.update(text_metrics.measure_turn(turn))
+        # MongoDB에는 UTC BSON datetime으로 저장하고, 캐시와 응답에는 기존 문자열 형식으로 변환 (_from_db)
+        turn["timestamp"] = datetime.datetime.now(datetime.timezone.utc)
+        return turn
+
+    @staticmethod
+    def render_timestamp(value):
+        """
+        BSON datetime을 기존 응답 형식의 문자열('%Y-%m-%d %H:%M:%S', 서버 로컬 시간)로 변환합니다.
+        변환 전에 문자열로 저장된 값은 그대로 반환합니다.
+        """
+        if isinstance(value, datetime.datetime):
+            if value.tzinfo is None:
+                # MongoDB에서 읽은 datetime은 시간대 정보가 없는 UTC
+                value = value.replace(tzinfo=datetime.timezone.utc)
+            return value.astimezone().strftime(TIMESTAMP_FORMAT)
+        return value
+
+    @staticmethod
+    def _to_utc(value: datetime.datetime) -> datetime.datetime:
+        """
+        조회 조건의 시간을 UTC로 변환합니다. 시간대가 없으면 서버 로컬 시간으로 해석합니다.
+        """
+        return value.astimezone(datetime.timezone.utc)
+
+    def _from_db(self, turn: Dict, keep_metrics: bool = False) -> Dict:
+        """
+        MongoDB에서 읽은 대화 턴을 응답 형식으로 변환합니다 (압축 해제, 시간 문자열 변환). 턴을 직접 수정합니다.
+        저장 시 기록한 길이('chars', 'tokens')는 최근 대화 구간 조회용이므로 keep_metrics가 아니면 제거합니다.
+        """
+        self.codec.decode(turn)
+        if "timestamp" in turn:
+            turn["timestamp"] = self.render_timestamp(turn["timestamp"])
+        if not keep_metrics:
+            for field in text_metrics.METRIC_FIELDS:
+                turn.pop(field, None)
+        return turn
+
+    def _rendered(self, turn: Dict) -> Dict:
+        """
+        새로 저장한 대화 턴의 응답 형식 사본을 반환합니다 (캐시 갱신용).
+        """
+        return self._from_db(dict(turn))
+
+    def _timestamp_expr(self, path: str) -> Dict:
+        """
+        대화 턴의 timestamp를 date로 비교하기 위한 집계 표현식입니다.
+        아직 변환하지 않은 문자열 timestamp는 기록 당시 서버 시간대(MONGO_LEGACY_TIMEZONE)로 해석합니다.
+        """
+        return {"$cond": [
+            {"$eq": [{"$type": path}, "string"]},
+            {"$dateFromString": {
+                "dateString": path,
+                "format": TIMESTAMP_FORMAT,
+                "timezone": self.legacy_timezone,
+                "onError": None
+            }},
+            path
+        ]}
+
+    def _time_conditions(self, since: Optional[datetime.datetime], until: Optional[datetime.datetime]) -> List[Dict]:
+        """
+        '$$turn'의 timestamp가 [since, until) 구간에 있는지 확인하는 집계 조건 목록을 생성합니다.
+        해석할 수 없거나 없는 timestamp(null)는 BSON 비교 순서상 모든 date보다 작으므로 date인 경우만 포함합니다.
+        """
+        if since is None and until is None:
+            return []
+        timestamp = self._timestamp_expr("$$turn.timestamp")
+        conditions = [{"$eq": [{"$type": timestamp}, "date"]}]
+        if since is not None:
+            conditions.append({"$gte": [timestamp, self._to_utc(since)]})
+        if until is not None:
+            conditions.append({"$lt": [timestamp, self._to_utc(until)]})
+        return conditions
+
+    async def _read_bucket_log(
+        self,
+        store: ChatLogStore,
+        document_id: str,
+        first_index: Optional[int] = None,
+        last_index: Optional[int] = None,
+        since: Optional[datetime.datetime] = None,
+        until: Optional[datetime.datetime] = None,
+        keep_metrics: bool = False
+    ) -> List[Dict]:
+        """
+        버킷 문서들을 버킷 번호 순으로 읽어 하나의 대화 목록으로 합칩니다.
+        인덱스 범위가 주어지면 해당 범위가 포함된 버킷만 읽고, 범위 밖의 대화는 서버에서 걸러냅니다.
+        시간 범위(since 이상, until 미만)가 주어지면 (id, value.timestamp) 인덱스로 해당 시간의 대화가 있는 버킷만 읽습니다.
+        """
+        buckets = await store.buckets()
+        query = store.room(document_id)
+        projection = {"_id": 0, "value": 1}
+        conditions = []
+        if first_index is not None and last_index is not None:
+            query["bucket"] = {"$gte": self._bucket_no(first_index), "$lte": self._bucket_no(last_index)}
+            conditions += [
+                {"$gte": ["$$turn.index", first_index]},
+                {"$lte": ["$$turn.index", last_index]}
+            ]
+        if since is not None or until is not None:
+            time_range = {}
+            if since is not None:
+                time_range["$gte"] = self._to_utc(since)
+            if until is not None:
+                time_range["$lt"] = self._to_utc(until)
+            # 아직 변환하지 않은 문자열 timestamp가 있는 버킷은 서버에서 조건을 확인
+            query["$or"] = [
+                {"value": {"$elemMatch": {"timestamp": time_range}}},
+                {"value.timestamp": {"$type": "string"}},
+            ]
+            conditions += self._time_conditions(since, until)
+        if conditions:
+            projection["value"] = {"$filter": {"input": "$value", "as": "turn", "cond": {"$and": conditions}}}
+
+        value_list = []
+        async for bucket in buckets.find(query, projection).sort("bucket", 1):
+            value_list.extend(self._from_db(turn, keep_metrics) for turn in bucket.get("value") or [])
+        return value_list
+
+    def _window_projection(
+        self,
+        last: Optional[int] = None,
+        before_index: Optional[int] = None,
+        after_index: Optional[int] = None,
+        since: Optional[datetime.datetime] = None,
+        until: Optional[datetime.datetime] = None
+    ) -> Optional[Dict]:
+        """
+        'value' 배열 중 요청한 구간만 반환하도록 하는 find 프로젝션 표현식을 생성합니다.
+        구간 조건이 없으면 None을 반환합니다.
+        """
+        if last is None and before_index is None and after_index is None and since is None and until is None:
+            return None
+
+        value_expr = "$value"
+        conditions = []
+        if after_index is not None:
+            conditions.append({"$gt": ["$$turn.index", after_index]})
+        if before_index is not None:
+            conditions.append({"$lt": ["$$turn.index", before_index]})
+        conditions += self._time_conditions(since, until)
+        if conditions:
+            value_expr = {"$filter": {"input": "$value", "as": "turn", "cond": {"$and": conditions}}}
+        if last is not None:
+            value_expr = {"$slice": [value_expr, -last]}
+        return {"value": value_expr}
+
+    @staticmethod
+    def _apply_window(
+        value_list: List[Dict],
+        last: Optional[int] = None,
+        before_index: Optional[int] = None,
+        after_index: Optional[int] = None
+    ) -> List[Dict]:
+        """
+        인덱스 순으로 정렬된 대화 목록(응답 형식)에 _window_projection과 같은 인덱스 구간 조건을 적용합니다.
+        """
+        if after_index is not None:
+            value_list = [turn for turn in value_list if turn["index"] > after_index]
+        if before_index is not None:
+            value_list = [turn for turn in value_list if turn["index"] < before_index]
+        if last is not None:
+            value_list = value_list[-last:]
+        return value_list
+
+    @staticmethod
+    def _next_version_expr() -> Dict:
+        """
+        문서의 'version'을 1 증가시키는 집계 표현식입니다. 'version'이 없는 기존 문서는 0에서 시작합니다.
+        """
+        return {"$add": [{"$ifNull": ["$version", 0]}, 1]}
+
+    @staticmethod
+    def _latest_index_expr() -> Dict:
+        """
+        문서의 최신 대화 인덱스를 계산하는 집계 표현식입니다.
+        'seq' 카운터가 없는 기존 문서는 'value' 배열의 최대 인덱스를 사용합니다.
+        """
+        return {"$ifNull": ["$seq", {"$ifNull": [{"$max": "$value.index"}, 0]}]}
+
+    async def _append_turns(
+        self,
+        router: str,
+        user_id: str,
+        document_id: str,
+        turns: List[Dict]
+    ) -> Tuple[int, int]:
+        """
+        저장 방식에 따라 대화방에 대화 턴 여러 개를 연속된 인덱스로 추가합니다.
+        embedded 방식은 'seq' 카운터 증가와 배열 추가를 한 번의 원자적 업데이트로 처리하고,
+        bucket 방식은 'seq'를 한 번에 증가시켜 인덱스 구간을 예약한 뒤 버킷에 '$push $each'로 추가합니다.
+
+        저장을 마치면 일별 사용량 집계와 검색 색인에 더합니다.
+
+        :return: (추가된 첫 번째 대화 턴의 인덱스, 증가한 대화방 'version')
+        """
+        count = len(turns)
+        now = self._now()
+        plain_turns = turns
+        # 캐시와 응답에는 원문을 사용하고, MongoDB에는 압축한 사본을 저장
+        turns = [self.codec.encode(turn) for turn in turns]
+
+        async def append(store: ChatLogStore) -> Tuple[int, int]:
+            collection = await store.logs()
+
+            async def append_embedded() -> Optional[Dict]:
+                # 사용자 입력이 '$'로 시작해도 필드 경로로 해석되지 않도록 $literal로 감쌈
+                return await collection.find_one_and_update(
+                    store.room(document_id, storage={"$ne": "bucket"}),
+                    [
+                        {"$set": {
+                            "seq": {"$add": [self._latest_index_expr(), count]},
+                            "version": self._next_version_expr(),
+                            "updated_at": now
+                        }},
+                        {"$set": {"value": {"$concatArrays": [
+                            {"$ifNull": ["$value", []]},
+                            [
+                                {"$mergeObjects": [
+                                    {"index": {"$add": ["$seq", position - count + 1]}},
+                                    {"$literal": turn}
+                                ]}
+                                for position, turn in enumerate(turns)
+                            ]
+                        ]}}},
+                    ],
+                    projection={"_id": 0, "seq": 1, "version": 1, "character_idx": 1},
+                    return_document=ReturnDocument.AFTER
+                )
+
+            async def append_bucket() -> Optional[Dict]:
+                header = await collection.find_one_and_update(
+                    store.room(document_id, storage="bucket"),
+                    {"$inc": {"seq": count, "version": 1}, "$set": {"updated_at": now}},
+                    projection={"_id": 0, "seq": 1, "version": 1, "character_idx": 1},
+                    return_document=ReturnDocument.AFTER
+                )
+                if header is not None:
+                    first_index = header["seq"] - count + 1
+                    grouped: Dict[int, List[Dict]] = {}
+                    for position, turn in enumerate(turns):
+                        index = first_index + position
+                        grouped.setdefault(self._bucket_no(index), []).append({"index": index, **turn})
+                    # 인덱스를 예약한 순서와 버킷에 쓰는 순서가 다를 수 있으므로 '$sort'로 버킷 안을 인덱스 순으로 유지
+                    writes = [
+                        (store.bucket(document_id, bucket_no), {"$push": {"value": {"$each": items, "$sort": {"index": 1}}}})
+                        for bucket_no, items in grouped.items()
+                    ]
+                    buckets = await store.buckets()
+                    if len(writes) == 1:
+                        await buckets.update_one(*writes[0], upsert=True)
+                    else:
+                        await buckets.bulk_write([UpdateOne(query, update, upsert=True) for query, update in writes], ordered=False)
+                return header
+
+            # 현재 설정된 저장 방식을 먼저 시도하고, 일치하지 않으면 다른 방식으로 저장된 문서인지 확인
+            attempts = (append_bucket, append_embedded) if self.storage_mode == "bucket" else (append_embedded, append_bucket)
+            for attempt in attempts:
+                document = await attempt()
+                if document is not None:
+                    first_index = document["seq"] - count + 1
+                    self.usage.schedule(router, user_id, document_id, document.get("character_idx"), plain_turns)
+                    self.search.schedule_index(
+                        router, user_id, document_id, document.get("character_idx"), enumerate(plain_turns, start=first_index)
+                    )
+                    return first_index, document["version"]
+            raise RoomNotFoundException(f"No document found with ID: {document_id} or no data added.")
+
+        return await self._in_room_store(router, user_id, document_id, append)
+
+    async def _add_log(self, router: str, user_id: str, document_id: str, new_data: Dict) -> str:
+        """
+        대화방에 새로운 대화 턴 하나를 추가합니다.
+        """
+        turn = self._build_turn(new_data)
+        if self.write_buffer.enabled:
+            future = self.write_buffer.add((router, user_id, document_id), turn)
+            if future is not None:
+                await future
+            return f"Successfully added data to document with ID: {document_id}"
+
+        index, version = await self._append_turns(router, user_id, document_id, [turn])
+        await self.log_cache.append((router, user_id, document_id), {"index": index, **self._rendered(turn)}, version)
+        return f"Successfully added data to document with ID: {document_id}"
+
+    async def _flush_turns(self, key: Tuple[str, str, str], turns: List[Dict]) -> int:
+        """
+        write-behind 버퍼에 모인 한 대화방의 대화 턴을 한 번의 쓰기로 반영합니다.
+        """
+        router, user_id, document_id = key
+        first_index, version = await self._append_turns(router, user_id, document_id, turns)
+        await self.log_cache.extend(
+            key,
+            [{"index": first_index + position, **self._rendered(turn)} for position, turn in enumerate(turns)],
+            version
+        )
+        return first_index
+
+    async def _update_latest_log(self, router: str, user_id: str, document_id: str, new_Data: Dict) -> str:
+        """
+        저장 방식에 따라 대화방의 가장 큰 인덱스(최신 대화)를 수정합니다.
+        embedded 방식은 'seq' 카운터가 가리키는 항목을 한 번의 원자적 업데이트로 교체합니다.
+        """
+        turn = self._build_turn(new_Data)
+        stored = self.codec.encode(turn)
+        now = self._now()
+        await self.write_buffer.flush_key((router, user_id, document_id))
+
+        async def update(store: ChatLogStore) -> Tuple[int, Optional[int]]:
+            collection = await store.logs()
+
+            async def update_embedded() -> Optional[Dict]:
+                # 최신 인덱스의 대화가 실제로 있는 문서만 수정 (없으면 수정하지 않고 None)
+                return await collection.find_one_and_update(
+                    store.room(document_id, storage={"$ne": "bucket"}, **{
+                        "value.0": {"$exists": True},
+                        "$expr": {"$in": [self._latest_index_expr(), {"$ifNull": ["$value.index", []]}]}
+                    }),
+                    [
+                        {"$set": {"seq": self._latest_index_expr(), "version": self._next_version_expr(), "updated_at": now}},
+                        {"$set": {"value": {"$map": {
+                            "input": "$value",
+                            "as": "turn",
+                            "in": {"$cond": [
+                                {"$eq": ["$$turn.index", "$seq"]},
+                                {"$mergeObjects": [{"index": "$seq"}, {"$literal": stored}]},
+                                "$$turn"
+                            ]}
+                        }}}},
+                    ],
+                    projection={"_id": 0, "seq": 1, "version": 1},
+                    return_document=ReturnDocument.AFTER
+                )
+
+            if self.storage_mode != "bucket":
+                document = await update_embedded()
+                if document is not None:
+                    return document["seq"], document["version"]
+
+            # 버킷 방식 문서이거나 업데이트할 대화가 없는 경우
+            document = await collection.find_one(store.room(document_id), {"storage": 1, "seq": 1})
+
+            if document is None:
+                raise RoomNotFoundException(f"No document found with ID: {document_id}")
+
+            if document.get("storage") != "bucket":
+                # 버킷 방식으로 설정된 상태에서 아직 변환되지 않은 문서
+                if self.storage_mode == "bucket":
+                    document = await update_embedded()
+                    if document is not None:
+                        return document["seq"], document["version"]
+                raise error_tools.NotFoundException(f"No conversations found in document with ID: {document_id}")
+
+            latest_index = document.get("seq", 0)
+            if latest_index <= 0:
+                raise error_tools.NotFoundException(f"No conversations found in document with ID: {document_id}")
+
+            buckets = await store.buckets()
+            result = await buckets.update_one(
+                store.bucket(document_id, self._bucket_no(latest_index), **{"value.index": latest_index}),
+                {"$set": {"value.$": {"index": latest_index, **stored}}}
+            )
+            if result.matched_count > 0:
+                # 버킷을 수정한 뒤 'version'을 올려 새 version의 ETag가 이전 내용과 함께 반환되지 않도록 함
+                header = await collection.find_one_and_update(
+                    store.room(document_id),
+                    {"$set": {"updated_at": now}, "$inc": {"version": 1}},
+                    projection={"_id": 0, "version": 1},
+                    return_document=ReturnDocument.AFTER
+                )
+                return latest_index, (header or {}).get("version")
+            raise error_tools.NotFoundException(f"Failed to update data in document with ID: {document_id}")
+
+        latest_index, version = await self._in_room_store(router, user_id, document_id, update)
+        self.search.schedule_index(router, user_id, document_id, None, [(latest_index, turn)])
+        await self.log_cache.replace_latest((router, user_id, document_id), {"index": latest_index, **self._rendered(turn)}, version)
+        return f"Successfully updated latest conversation (index: {latest_index}) in document with ID: {document_id}"
+
+    async def _get_log_document(
+        self,
+        router: str,
+        user_id: str,
+        document_id: str,
+        last: Optional[int] = None,
+        before_index: Optional[int] = None,
+        after_index: Optional[int] = None,
+        since: Optional[datetime.datetime] = None,
+        until: Optional[datetime.datetime] = None,
+        keep_metrics: bool = False
+    ) -> Dict:
+        """
+        대화방 문서를 읽고, 저장 방식과 관계없이 인덱스 순으로 정렬된 'value'를 채워 반환합니다.
+        last, before_index, after_index, since, until이 주어지면 해당 구간의 대화만 MongoDB에서 가져옵니다.
+        keep_metrics가 True이면 MongoDB에서 읽은 대화 턴에 저장 시 기록한 길이('chars', 'tokens')를 남깁니다 (캐시된 대화에는 없음).
+        """
+        window = self._window_projection(last, before_index, after_index, since, until)
+        cache_key = (router, user_id, document_id)
+        await self.write_buffer.flush_key(cache_key)
+
+        async def read(store: ChatLogStore) -> Dict:
+            collection = await store.logs(ensure_indexes=False)
+            if window is None:
+                document = await collection.find_one(store.room(document_id))
+            else:
+                document = await collection.find_one(
+                    store.room(document_id),
+                    {"id": 1, "character_idx": 1, "storage": 1, "seq": 1, "version": 1, **window}
+                )
+
+            if document is None:
+                raise RoomNotFoundException(f"No document found with ID: {document_id}")
+            await self.index_manager.ensure(collection)
+
+            if document.get("storage") == "bucket":
+                # 버킷 안의 대화는 '$push $sort'로 인덱스 순으로 저장되므로 다시 정렬할 필요가 없음
+                expected_index = document.get("seq", 0)
+                if window is None:
+                    document["value"] = await self._read_bucket_log(store, document_id, keep_metrics=keep_metrics)
+                else:
+                    # 대화 인덱스는 1부터 'seq'까지 연속이므로 읽을 범위를 미리 계산할 수 있음
+                    first_index = 1 if after_index is None else after_index + 1
+                    last_index = document.get("seq", 0) if before_index is None else min(before_index - 1, document.get("seq", 0))
+                    time_filtered = since is not None or until is not None
+                    if last is not None and not time_filtered:
+                        first_index = max(first_index, last_index - last + 1)
+                    document["value"] = (
+                        await self._read_bucket_log(store, document_id, first_index, last_index, since, until, keep_metrics)
+                        if first_index <= last_index else []
+                    )
+                    expected_index = None if time_filtered or first_index > last_index else last_index
+                    if last is not None and time_filtered:
+                        # 시간 범위에 해당하는 대화의 인덱스는 미리 알 수 없으므로 읽은 뒤 자름
+                        document["value"] = document["value"][-last:] if last > 0 else []
+                # 헤더의 'seq'와 'version'을 올린 뒤 버킷에 쓰기 전인 대화가 있으면 읽은 내용이 헤더의 version보다 오래됨
+                last_read = document["value"][-1]["index"] if document["value"] else 0
+                if expected_index is not None and last_read != expected_index:
+                    document["version"] = None
+            else:
+                document["value"] = [
+                    self._from_db(turn, keep_metrics)
+                    for turn in sorted(document.get("value") or [], key=lambda x:x.get("index"))
+                ]
+            return document
+
+        if window is None:
+            return await self.log_cache.read_through(
+                cache_key,
+                lambda: self._in_room_store(router, user_id, document_id, read)
+            )
+
+        # 인덱스 구간 조회는 캐시된 전체 대화가 있으면 메모리에서 자르고, 없으면 해당 구간만 MongoDB에서 읽음
+        # 시간 범위 조회는 항상 MongoDB에서 읽음 (캐시된 시간 문자열은 변환한 값과 기존 문자열(MONGO_LEGACY_TIMEZONE)을 구분할 수 없음)
+        if since is None and until is None:
+            document = await self.log_cache.get(cache_key)
+            if document is not None:
+                document["value"] = self._apply_window(document["value"], last, before_index, after_index)
+                return document
+        return await self._in_room_store(router, user_id, document_id, read)
+
+    async def get_log_version(self, user_id: str, document_id: str, router: str) -> int:
+        """
+        대화방의 'version'만 읽어 반환합니다. 대화 내용은 읽지 않으므로 조건부 조회(If-None-Match)에 사용합니다.
+
+        :param user_id: 사용자 ID
+        :param document_id: 문서의 ID
+        :param router: 라우터 타입 ('office' 또는 'chatbot')
+        :return: 대화방의 version ('version'이 없는 기존 문서는 0)
+        :raises error_tools.NotFoundException: 문서가 존재하지 않을 경우
+        :raises error_tools.InternalServerErrorException: 데이터를 가져오는 도중 문제가 발생할 경우
+        """
+        try:
+            # 버퍼에 남은 대화 턴도 version에 반영되도록 먼저 저장
+            await self.write_buffer.flush_key((router, user_id, document_id))
+
+            async def read(store: ChatLogStore) -> int:
+                collection = await store.logs(ensure_indexes=False)
+                header = await collection.find_one(store.room(document_id), {"_id": 0, "version": 1})
+                if header is None:
+                    raise RoomNotFoundException(f"No document found with ID: {document_id}")
+                return header.get("version", 0)
+
+            return await self._in_room_store(router, user_id, document_id, read)
+        except error_tools.NotFoundException:
+            # 없는 대화방은 조회와 같이 404로 응답하도록 그대로 전달
+            raise
+        except PyMongoError as e:
+            raise error_tools.InternalServerErrorException(detail=f"Error retrieving chatlog version: {str(e)}")
+        except Exception as e:
+            raise error_tools.InternalServerErrorException(detail=f"Unexpected error: {str(e)}")
+
     async def remove_log(self, user_id: str, document_id: str, selected_count: int, router: str) -> str:
         """
         특정 대화의 최신 대화 ~ 선택한 대화를 지웁니다.
@@ -91,33 +885,114 @@ class MongoDBHandler:
         :raises error_tools.InternalServerErrorException: 데이터를 제거하는 도중 문제가 발생할 경우
         """
         try:
-            collection = self.db[f'{router}_log_{user_id}']
-            document = await collection.find_one({"id": document_id})
+            await self.write_buffer.flush_key((router, user_id, document_id))
 
-            if document is None:
-                raise error_tools.NotFoundException(f"No document found with ID: {document_id}")
+            async def remove(store: ChatLogStore) -> Tuple[str, Optional[int]]:
+                collection = await store.logs()
+                document = await collection.find_one(store.room(document_id), {"storage": 1, "seq": 1, "value.index": 1})
 
-            # 'value' 필드에서 삭제할 항목 필터링 (selected_count 이상)
-            value_to_remove = [item for item in document.get("value", []) if item.get("index") >= selected_count]
+                if document is None:
+                    raise RoomNotFoundException(f"No document found with ID: {document_id}")
 
-            if not value_to_remove:
-                raise error_tools.NotFoundException(f"No data found to remove starting from index: {selected_count}")
+                if document.get("storage") == "bucket":
+                    latest_index = document.get("seq", 0)
+                    first_index = max(selected_count, 1)
+                    if first_index > latest_index:
+                        raise error_tools.NotFoundException(f"No data found to remove starting from index: {selected_count}")
 
-            # 해당 index부터 마지막 데이터까지 삭제
-            result = await collection.update_one(
-                {"id": document_id},
-                {"$pull": {"value": {"index": {"$gte": selected_count}}}}
-            )
+                    # 시작 버킷 이후의 버킷은 통째로 삭제하고, 시작 버킷에서는 해당 index 이후만 제거
+                    buckets = await store.buckets()
+                    first_bucket = self._bucket_no(first_index)
+                    await buckets.delete_many(store.bucket(document_id, {"$gt": first_bucket}))
+                    await buckets.update_one(
+                        store.bucket(document_id, first_bucket),
+                        {"$pull": {"value": {"index": {"$gte": first_index}}}}
+                    )
+                    header = await collection.find_one_and_update(
+                        store.room(document_id),
+                        {"$set": {"seq": first_index - 1}, "$inc": {"version": 1}},
+                        projection={"_id": 0, "version": 1},
+                        return_document=ReturnDocument.AFTER
+                    )
+                    return (
+                        f"Successfully removed data from index: {selected_count} to the end in document with ID: {document_id}",
+                        (header or {}).get("version")
+                    )
 
-            if result.modified_count > 0:
-                return f"Successfully removed data from index: {selected_count} to the end in document with ID: {document_id}"
-            else:
-                raise error_tools.NotFoundException(f"No data removed for document with ID: {document_id}")
+                # 'value' 필드에서 삭제할 항목 필터링 (selected_count 이상)
+                value_to_remove = [item for item in document.get("value", []) if item.get("index") >= selected_count]
+
+                if not value_to_remove:
+                    raise error_tools.NotFoundException(f"No data found to remove starting from index: {selected_count}")
+
+                # 해당 index부터 마지막 데이터까지 삭제하고 'seq' 카운터를 남은 대화의 최대 인덱스로 되돌림
+                result = await collection.find_one_and_update(
+                    store.room(document_id, **{"value.index": {"$gte": selected_count}}),
+                    [
+                        {"$set": {"value": {"$filter": {
+                            "input": "$value",
+                            "as": "turn",
+                            "cond": {"$lt": ["$$turn.index", selected_count]}
+                        }}}},
+                        {"$set": {
+                            "seq": {"$ifNull": [{"$max": "$value.index"}, 0]},
+                            "version": self._next_version_expr()
+                        }},
+                    ],
+                    projection={"_id": 0, "version": 1},
+                    return_document=ReturnDocument.AFTER
+                )
+
+                if result is not None:
+                    return (
+                        f"Successfully removed data from index: {selected_count} to the end in document with ID: {document_id}",
+                        result["version"]
+                    )
+                else:
+                    raise error_tools.NotFoundException(f"No data removed for document with ID: {document_id}")
+
+            try:
+                message, version = await self._in_room_store(router, user_id, document_id, remove, restore=False)
+            except RoomNotFoundException:
+                # 보관된 대화방은 복원하지 않고 보관 문서에서 지움
+                message, version = await self._remove_archived_turns(router, user_id, document_id, selected_count)
+            await self.log_cache.truncate((router, user_id, document_id), selected_count, version)
+            self.search.schedule_remove(router, user_id, document_id, from_index=selected_count)
+            return message
         except PyMongoError as e:
             raise error_tools.InternalServerErrorException(detail=f"Error removing chatlog value: {str(e)}")
         except Exception as e:
             raise error_tools.InternalServerErrorException(detail=f"Unexpected error: {str(e)}")
 
+    async def _remove_archived_turns(
+        self,
+        router: str,
+        user_id: str,
+        document_id: str,
+        selected_count: int
+    ) -> Tuple[str, Optional[int]]:
+        """
+        보관된 대화방을 복원하지 않고 보관 문서에서 selected_count 이후의 대화를 지웁니다.
+
+        :return: (성공 메시지, 증가한 'version')
+        """
+        archived = await self.archive.find(router, user_id, document_id)
+        if archived is None:
+            raise RoomNotFoundException(f"No document found with ID: {document_id}")
+        turns = self.archive.unpack(archived)
+        remaining = [turn for turn in turns if turn.get("index") < selected_count]
+        if len(remaining) == len(turns):
+            raise error_tools.NotFoundException(f"No data found to remove starting from index: {selected_count}")
+
+        header = archived["header"]
+        header["seq"] = max((turn["index"] for turn in remaining), default=0)
+        header["version"] = header.get("version", 0) + 1
+        await self.archive.save(router, user_id, header, remaining, self.archive.pack(remaining))
+        return (
+            f"Successfully removed data from index: {selected_count} to the end in document with ID: {document_id}",
+            header["version"]
+        )
+
     async def remove_collection(self, user_id: str, document_id: str, router: str) -> str:
         """
         특정 대화방을 지웁니다.
@@ -129,23 +1004,832 @@ class MongoDBHandler:
         :raises error_tools.InternalServerErrorException: 데이터를 제거하는 도중 문제가 발생할 경우
         """
         try:
-            collection = self.db[f'{router}_log_{user_id}']
-            document = await collection.find_one({"id": document_id})
+            await self.write_buffer.flush_key((router, user_id, document_id))
 
-            if document is None:
-                raise error_tools.NotFoundException(f"No document found with ID: {document_id}")
+            async def remove(store: ChatLogStore) -> str:
+                collection = await store.logs()
+                document = await collection.find_one(store.room(document_id), {"storage": 1})
+
+                if document is None:
+                    raise RoomNotFoundException(f"No document found with ID: {document_id}")
+
+                remove_collection = await collection.delete_one(store.room(document_id))  # 수정: 조건으로 ID 사용
 
-            remove_collection = await collection.delete_one({"id": document_id})  # 수정: 조건으로 ID 사용
+                if document.get("storage") == "bucket":
+                    buckets = await store.buckets()
+                    await buckets.delete_many(store.room(document_id))
 
-            if remove_collection.deleted_count == 0:
-                raise error_tools.NotFoundException(f"No data found to remove document: {document_id}")
-            elif remove_collection.deleted_count > 0:
+                if remove_collection.deleted_count == 0:
+                    raise error_tools.NotFoundException(f"No data found to remove document: {document_id}")
                 return f"Successfully deleted document with ID: {document_id}"
+
+            try:
+                message = await self._in_room_store(router, user_id, document_id, remove, restore=False)
+            except RoomNotFoundException:
+                # 보관된 대화방은 복원하지 않고 보관 문서를 바로 삭제
+                if await self.archive.find(router, user_id, document_id) is None:
+                    raise
+                await self.archive.delete(router, user_id, document_id)
+                message = f"Successfully deleted document with ID: {document_id}"
+            await self.log_cache.invalidate((router, user_id, document_id))
+            self.search.schedule_remove(router, user_id, document_id)
+            return message
         except PyMongoError as e:
             raise error_tools.InternalServerErrorException(detail=f"Error deleting document: {str(e)}")
         except Exception as e:
             raise error_tools.InternalServerErrorException(detail=f"Unexpected error: {str(e)}")
-        
+
+    def _summary_pipeline(self, store: ChatLogStore, document_ids: List[str], preview_length: int) -> List[Dict]:
+        """
+        대화방 요약(첫 입력, 마지막 대화 시간, 대화 수)을 계산하는 집계 파이프라인을 생성합니다.
+        """
+        bucketed = {"$eq": ["$storage", "bucket"]}
+        bucket_match = [
+            "$$bucketed",
+            {"$eq": ["$id", "$$room_id"]},
+            {"$in": ["$bucket", [0, "$$last_bucket"]]},
+        ]
+        bucket_let = {
+            "room_id": "$id",
+            "bucketed": bucketed,
+            "last_bucket": {"$floor": {"$divide": [
+                {"$subtract": [{"$ifNull": ["$seq", 0]}, 1]}, self.bucket_size
+            ]}},
+        }
+        if store.scope:
+            bucket_match.append({"$eq": ["$user_id", "$$user_id"]})
+            bucket_let["user_id"] = "$user_id"
+
+        return [
+            {"$match": {**store.scope, "id": {"$in": document_ids}}},
+            # 버킷 방식 문서는 첫 버킷과 마지막 버킷만 조인
+            {"$lookup": {
+                "from": store.bucket_name,
+                "let": bucket_let,
+                "pipeline": [
+                    {"$match": {"$expr": {"$and": bucket_match}}},
+                    {"$sort": {"bucket": 1}},
+                    {"$project": {"_id": 0, "first": {"$first": "$value"}, "last": {"$last": "$value"}}},
+                ],
+                "as": "edges"
+            }},
+            {"$project": {
+                "_id": 0,
+                "id": 1,
+                "character_idx": 1,
+                "first_turn": {"$cond": [bucketed, {"$first": "$edges.first"}, {"$first": "$value"}]},
+                "last_turn": {"$cond": [bucketed, {"$last": "$edges.last"}, {"$last": "$value"}]},
+                "turn_count": {"$cond": [
+                    bucketed, {"$ifNull": ["$seq", 0]}, {"$size": {"$ifNull": ["$value", []]}}
+                ]},
+            }},
+            {"$project": {
+                "id": 1,
+                "character_idx": 1,
+                # 한글이 깨지지 않도록 바이트가 아닌 코드 포인트 단위로 자름
+                "title": {"$substrCP": [{"$ifNull": ["$first_turn.input_data", ""]}, 0, preview_length]},
+                "last_timestamp": {"$ifNull": ["$last_turn.timestamp", None]},
+                "turn_count": 1,
+            }},
+        ]
+
+    async def get_recent_context(
+        self,
+        user_id: str,
+        document_id: str,
+        router: str,
+        budget: int,
+        unit: str = "tokens"
+    ) -> Dict:
+        """
+        최신 대화부터 거슬러 올라가며 글자 수 또는 토큰 수 예산 안에 들어가는 대화만 반환합니다.
+        저장 시 기록한 길이를 사용하므로 이전 대화를 다시 측정하지 않으며, 예산을 넘는 대화에서 멈춥니다.
+        최신 CONTEXT_PAGE_SIZE개부터 구간을 늘려 가며 읽으므로 긴 대화방도 필요한 대화만 읽습니다.
+
+        :param user_id: 사용자 ID
+        :param document_id: 문서의 ID
+        :param router: 라우터 타입 ('office' 또는 'chatbot')
+        :param budget: 글자 수 또는 토큰 수 예산
+        :param unit: 'chars' 또는 'tokens'
+        :return: {'value': 최신순 대화 목록, 'used': 사용한 예산, 'truncated': 예산 때문에 제외된 이전 대화가 있는지,
+                  'character_idx': 캐릭터 인덱스(있는 경우)}
+        :raises error_tools.NotFoundException: 문서가 존재하지 않을 경우
+        :raises error_tools.InternalServerErrorException: 데이터를 가져오는 도중 문제가 발생할 경우
+        """
+        try:
+            cache_key = (router, user_id, document_id)
+            await self.write_buffer.flush_key(cache_key)
+            context = {"value": [], "used": 0, "truncated": False}
+
+            def take(turns: List[Dict]) -> bool:
+                """최신순 대화를 예산 안에서 추가하고, 예산을 넘으면 False를 반환합니다."""
+                for turn in turns:
+                    metrics = {field: turn.pop(field) for field in text_metrics.METRIC_FIELDS if field in turn}
+                    size = metrics.get(unit)
+                    if size is None:
+                        # 캐시에서 읽었거나 길이를 저장하기 전에 기록된 대화
+                        size = text_metrics.measure_turn(turn)[unit]
+                    if context["used"] + size > budget:
+                        context["truncated"] = True
+                        return False
+                    context["used"] += size
+                    context["value"].append(turn)
+                return True
+
+            # 캐시에 전체 대화가 없으면 _get_log_document의 '$slice' 프로젝션으로 최신 대화부터 필요한 만큼만 읽음
+            # (bucket 방식은 해당 구간의 버킷만 읽음), 예산이 남으면 이전 구간을 두 배 크기로 이어서 읽음
+            page, before_index = CONTEXT_PAGE_SIZE, None
+            while True:
+                document = await self._get_log_document(
+                    router, user_id, document_id, last=page, before_index=before_index, keep_metrics=True
+                )
+                if "character_idx" in document:
+                    context["character_idx"] = document["character_idx"]
+                turns = document["value"]
+                if not take(reversed(turns)) or len(turns) < page or turns[0]["index"] <= 1:
+                    return context
+                page, before_index = page * 2, turns[0]["index"]
+        except PyMongoError as e:
+            raise error_tools.InternalServerErrorException(detail=f"Error retrieving recent context: {str(e)}")
+        except Exception as e:
+            raise error_tools.InternalServerErrorException(detail=f"Unexpected error: {str(e)}")
+
+    def _archived_summary(self, archived: Dict, preview_length: int) -> Dict:
+        """
+        보관 문서에서 _summary_pipeline과 같은 형식의 대화방 요약을 계산합니다.
+        """
+        turns = sorted(self.archive.unpack(archived), key=lambda x:x.get("index"))
+        summary = {
+            "id": archived["id"],
+            "title": str((turns[0].get("input_data") if turns else None) or "")[:preview_length],
+            "last_timestamp": self.render_timestamp(turns[-1].get("timestamp") if turns else None),
+            "turn_count": archived.get("turns", len(turns)),
+        }
+        if "character_idx" in archived:
+            summary["character_idx"] = archived["character_idx"]
+        return summary
+
+    async def get_room_summaries(
+        self,
+        user_id: str,
+        document_ids: List[str],
+        router: str,
+        preview_length: int = 50
+    ) -> List[Dict]:
+        """
+        여러 대화방의 요약 정보를 한 번의 집계 쿼리로 반환합니다.
+        대화 내용 전체를 전송하지 않고 첫 입력(잘라낸 제목), 마지막 대화 시간, 대화 수, character_idx만 계산합니다.
+        보관된 대화방은 복원하지 않고 보관 문서에서 계산합니다.
+
+        :param user_id: 사용자 ID
+        :param document_ids: 요약할 문서 ID 목록
+        :param router: 라우터 타입 ('office' 또는 'chatbot')
+        :param preview_length: 제목으로 사용할 첫 입력의 최대 글자 수
+        :return: 요청한 순서대로 정렬된 대화방 요약 목록 (존재하지 않는 문서는 제외)
+        :raises error_tools.InternalServerErrorException: 데이터를 가져오는 도중 문제가 발생할 경우
+        """
+        try:
+            await asyncio.gather(*(
+                self.write_buffer.flush_key((router, user_id, document_id)) for document_id in document_ids
+            ))
+            summaries: Dict[str, Dict] = {}
+            # 레이아웃 전환 중에는 우선 저장소에서 찾지 못한 대화방만 다음 저장소에서 집계
+            for store in self._stores(router, user_id):
+                remaining = [document_id for document_id in document_ids if document_id not in summaries]
+                if not remaining:
+                    break
+                collection = await store.logs(ensure_indexes=False)
+                async for summary in collection.aggregate(self._summary_pipeline(store, remaining, preview_length)):
+                    summary["last_timestamp"] = self.render_timestamp(summary.get("last_timestamp"))
+                    summaries[summary["id"]] = summary
+
+            remaining = [document_id for document_id in document_ids if document_id not in summaries]
+            if remaining:
+                archive = await self.archive.collection(router)
+                async for archived in archive.find({"user_id": user_id, "id": {"$in": remaining}}):
+                    summaries[archived["id"]] = self._archived_summary(archived, preview_length)
+            return [summaries[document_id] for document_id in document_ids if document_id in summaries]
+        except PyMongoError as e:
+            raise error_tools.InternalServerErrorException(detail=f"Error retrieving chatroom summaries: {str(e)}")
+        except Exception as e:
+            raise error_tools.InternalServerErrorException(detail=f"Unexpected error: {str(e)}")
+
+    @staticmethod
+    def encode_room_cursor(updated_at: Optional[str], document_id: str) -> str:
+        """
+        대화방 목록의 다음 페이지 위치(마지막 대화방의 updated_at, id)를 URL에 쓸 수 있는 문자열로 인코딩합니다.
+        """
+        return base64.urlsafe_b64encode(json.dumps([updated_at, document_id]).encode("utf-8")).decode("ascii")
+
+    @staticmethod
+    def decode_room_cursor(cursor: str) -> Tuple[Optional[str], str]:
+        """
+        encode_room_cursor로 만든 문자열을 (updated_at, id)로 복원합니다.
+
+        :raises ValueError: 올바른 형식이 아닐 경우
+        """
+        try:
+            updated_at, document_id = json.loads(base64.urlsafe_b64decode(cursor.encode("ascii")))
+        except Exception as e:
+            raise ValueError(f"Invalid cursor: {cursor}") from e
+        if not isinstance(document_id, str) or not (updated_at is None or isinstance(updated_at, str)):
+            raise ValueError(f"Invalid cursor: {cursor}")
+        return updated_at, document_id
+
+    @staticmethod
+    def _room_sort_key(room: Dict) -> Tuple:
+        """
+        MongoDB의 ('updated_at' 내림차순, 'id' 내림차순) 정렬과 같은 순서를 만드는 키입니다.
+        'updated_at'이 없는 기존 대화방은 가장 뒤에 위치합니다.
+        """
+        return (room.get("updated_at") is not None, room.get("updated_at") or "", room["id"])
+
+    async def list_rooms(
+        self,
+        user_id: str,
+        router: str,
+        limit: int = 20,
+        after: Optional[Tuple[Optional[str], str]] = None
+    ) -> Tuple[List[Dict], Optional[Tuple[Optional[str], str]]]:
+        """
+        사용자의 대화방 목록을 마지막 대화 시간 최신순으로 반환합니다.
+        'value' 배열은 전송하지 않고 대화 수는 서버에서 계산하므로 대화 수와 관계없이 대화방 수에 비례하는 비용이 듭니다.
+        (updated_at, id) 기준 키셋 페이지네이션을 사용하므로 페이지가 뒤로 가도 건너뛰는 문서가 늘어나지 않습니다.
+
+        :param user_id: 사용자 ID
+        :param router: 라우터 타입 ('office' 또는 'chatbot')
+        :param limit: 한 페이지의 최대 대화방 수
+        :param after: 이전 페이지의 마지막 대화방 (updated_at, id)
+        :return: (대화방 목록, 다음 페이지가 있으면 마지막 대화방의 (updated_at, id) 아니면 None)
+        :raises error_tools.InternalServerErrorException: 데이터를 가져오는 도중 문제가 발생할 경우
+        """
+        try:
+            await self.write_buffer.flush_matching(lambda key: key[0] == router and key[1] == user_id)
+
+            query: Dict = {}
+            if after is not None:
+                updated_at, document_id = after
+                if updated_at is None:
+                    query = {"updated_at": None, "id": {"$lt": document_id}}
+                else:
+                    query = {"$or": [
+                        {"updated_at": {"$lt": updated_at}},
+                        {"updated_at": updated_at, "id": {"$lt": document_id}},
+                        {"updated_at": None},
+                    ]}
+            projection = {
+                "_id": 0, "id": 1, "character_idx": 1, "created_at": 1, "updated_at": 1,
+                # 대화 인덱스는 1부터 연속이므로 'seq'가 대화 수와 같음 ('seq'가 없는 기존 문서는 배열 크기)
+                "turns": {"$ifNull": ["$seq", {"$size": {"$ifNull": ["$value", []]}}]},
+            }
+
+            # 레이아웃 전환 중에는 두 저장소에서 각각 한 페이지씩 읽어 합치고, 우선 저장소의 대화방을 사용
+            rooms: Dict[str, Dict] = {}
+            for store in self._stores(router, user_id):
+                collection = await store.logs(ensure_indexes=False)
+                cursor = collection.find({**store.scope, **query}, projection).sort([("updated_at", -1), ("id", -1)])
+                async for room in cursor.limit(limit + 1):
+                    rooms.setdefault(room["id"], room)
+
+            # 보관된 대화방도 같은 순서로 한 페이지를 읽어 합침 (대화 수는 보관 문서에 기록된 값)
+            archive = await self.archive.collection(router)
+            cursor = archive.find({"user_id": user_id, **query}, {**projection, "turns": 1}).sort([("updated_at", -1), ("id", -1)])
+            async for room in cursor.limit(limit + 1):
+                rooms.setdefault(room["id"], room)
+
+            page = sorted(rooms.values(), key=self._room_sort_key, reverse=True)[:limit + 1]
+            next_after = None
+            if len(page) > limit:
+                page = page[:limit]
+                next_after = (page[-1].get("updated_at"), page[-1]["id"])
+            return [
+                {
+                    "id": room["id"],
+                    **({"character_idx": room["character_idx"]} if "character_idx" in room else {}),
+                    "turns": room.get("turns", 0),
+                    "created_at": room.get("created_at"),
+                    "updated_at": room.get("updated_at"),
+                }
+                for room in page
+            ], next_after
+        except PyMongoError as e:
+            raise error_tools.InternalServerErrorException(detail=f"Error listing chatrooms: {str(e)}")
+        except Exception as e:
+            raise error_tools.InternalServerErrorException(detail=f"Unexpected error: {str(e)}")
+
+    async def _load_turns(self, router: str, user_id: str, document_id: str, indexes: List[int]) -> Dict[int, Dict]:
+        """
+        대화방에서 주어진 인덱스의 대화 턴만 읽어 {인덱스: 응답 형식의 대화 턴}으로 반환합니다.
+        보관된 대화방은 복원하지 않고 보관 저장소에서 읽으며, 대화방이 없으면 빈 딕셔너리를 반환합니다.
+        """
+        turn_filter = {"$filter": {"input": "$value", "as": "turn", "cond": {"$in": ["$$turn.index", indexes]}}}
+        turns: List[Dict] = []
+        for store in self._stores(router, user_id):
+            collection = await store.logs(ensure_indexes=False)
+            document = await collection.find_one(store.room(document_id), {"_id": 0, "storage": 1, "value": turn_filter})
+            if document is None:
+                continue
+            if document.get("storage") == "bucket":
+                buckets = await store.buckets()
+                bucket_query = store.bucket(document_id, {"$in": sorted({self._bucket_no(index) for index in indexes})})
+                async for bucket in buckets.find(bucket_query, {"_id": 0, "value": turn_filter}):
+                    turns.extend(bucket.get("value") or [])
+            else:
+                turns = document.get("value") or []
+            break
+        else:
+            archived = await self.archive.find(router, user_id, document_id)
+            if archived is not None:
+                wanted = set(indexes)
+                turns = [turn for turn in self.archive.unpack(archived) if turn.get("index") in wanted]
+        return {turn["index"]: self._from_db(turn) for turn in turns}
+
+    async def search_logs(
+        self,
+        user_id: str,
+        query: str,
+        router: Optional[str] = None,
+        limit: int = 20,
+        after: Optional[Tuple] = None
+    ) -> Tuple[List[Dict], Optional[Tuple]]:
+        """
+        사용자의 채팅 기록에서 검색어가 포함된 대화를 최신순으로 찾아 발췌문과 함께 반환합니다.
+        검색 색인(chat_search)으로 후보를 찾고, 발췌문은 후보 대화 턴만 대화방에서 읽어 만듭니다 (_load_turns).
+
+        :param user_id: 사용자 ID
+        :param query: 검색어
+        :param router: 특정 라우터만 검색할 경우 'office' 또는 'chatbot'
+        :param limit: 한 페이지의 최대 결과 수
+        :param after: 이전 페이지의 마지막 위치 (chat_search.ChatSearchIndex.decode_cursor)
+        :return: (검색 결과 목록, 다음 페이지가 있으면 마지막 위치 아니면 None)
+        :raises ValueError: 검색어에 두 글자 이상의 단어가 없을 경우
+        :raises error_tools.InternalServerErrorException: 데이터를 가져오는 도중 문제가 발생할 경우
+        """
+        try:
+            # 방금 저장한 대화도 검색되도록 버퍼와 색인 작업에 남은 갱신을 먼저 반영
+            await self.write_buffer.flush_matching(lambda key: key[1] == user_id and (router is None or key[0] == router))
+            await self.search.drain()
+            return await self.search.search(user_id, query, self._load_turns, router, limit, after)
+        except ValueError:
+            raise
+        except PyMongoError as e:
+            raise error_tools.InternalServerErrorException(detail=f"Error searching chatlog: {str(e)}")
+        except Exception as e:
+            raise error_tools.InternalServerErrorException(detail=f"Unexpected error: {str(e)}")
+
+    async def get_usage_stats(
+        self,
+        router: str,
+        start: str,
+        end: str,
+        character_idx: Optional[int] = None
+    ) -> List[Dict]:
+        """
+        미리 집계한 일별 사용량(대화 수, 활성 대화방 수, 평균 응답 길이)을 반환합니다.
+
+        :param router: 라우터 타입 ('office' 또는 'chatbot')
+        :param start: 시작 날짜 (YYYY-MM-DD, 포함)
+        :param end: 끝 날짜 (YYYY-MM-DD, 포함)
+        :param character_idx: 특정 캐릭터만 조회할 경우 캐릭터 인덱스
+        :return: 날짜, character_idx 순으로 정렬된 일별 집계 목록
+        :raises error_tools.InternalServerErrorException: 데이터를 가져오는 도중 문제가 발생할 경우
+        """
+        try:
+            return await self.usage.query(router, start, end, character_idx)
+        except PyMongoError as e:
+            raise error_tools.InternalServerErrorException(detail=f"Error retrieving usage stats: {str(e)}")
+        except Exception as e:
+            raise error_tools.InternalServerErrorException(detail=f"Unexpected error: {str(e)}")
+
+    async def migrate_to_buckets(self, user_id: str, router: str, document_id: Optional[str] = None) -> int:
+        """
+        기존 'value' 배열에 저장된 대화방을 버킷 저장 방식으로 분할합니다.
+        버킷은 (id, bucket) 기준으로 덮어쓰기 때문에 중간에 실패해도 다시 실행할 수 있습니다.
+        변환 중에 대화가 추가, 수정, 삭제되면 'version'이 바뀌므로 헤더를 바꾸지 않고 다음 실행에서 다시 변환합니다.
+
+        :param user_id: 사용자 ID
+        :param router: 라우터 타입 ('office' 또는 'chatbot')
+        :param document_id: 특정 대화방만 변환할 경우 문서 ID
+        :return: 변환된 대화방 수
+        :raises error_tools.InternalServerErrorException: 변환 도중 문제가 발생할 경우
+        """
+        try:
+            migrated = 0
+            for store in self._stores(router, user_id):
+                collection = await store.logs()
+                buckets = await store.buckets()
+                query = {**store.scope, "storage": {"$ne": "bucket"}}
+                if document_id is not None:
+                    query["id"] = document_id
+
+                async for document in collection.find(query, {"id": 1, "value": 1, "version": 1}):
+                    value_list = sorted(document.get("value", []), key=lambda x:x.get("index") or 0)
+                    latest_index = (value_list[-1].get("index") or 0) if value_list else 0
+
+                    grouped: Dict[int, List[Dict]] = {}
+                    for item in value_list:
+                        grouped.setdefault(self._bucket_no(item.get("index") or 1), []).append(item)
+                    for bucket_no, items in grouped.items():
+                        await buckets.replace_one(
+                            store.bucket(document["id"], bucket_no),
+                            store.bucket(document["id"], bucket_no, value=items),
+                            upsert=True
+                        )
+                    # 이전 실행에서 더 많은 대화로 만든 버킷이 남아 있으면 제거 (새 대화가 같은 인덱스로 중복되지 않도록)
+                    # 대화가 없으면 _bucket_no(0)이 -1이므로 모든 버킷을 제거
+                    await buckets.delete_many(store.bucket(document["id"], {"$gt": self._bucket_no(latest_index)}))
+
+                    # 대화 추가, 수정, 삭제는 모두 'version'을 올리므로 읽은 뒤 바뀐 대화방은 헤더를 바꾸지 않음
+                    # ('version'이 없는 기존 문서는 None 조건이 필드가 없는 경우와 일치)
+                    result = await collection.update_one(
+                        {"_id": document["_id"], "storage": {"$ne": "bucket"}, "version": document.get("version")},
+                        {"$set": {"storage": "bucket", "seq": latest_index}, "$unset": {"value": ""}}
+                    )
+                    migrated += result.modified_count
+            return migrated
+        except PyMongoError as e:
+            raise error_tools.InternalServerErrorException(detail=f"Error migrating chatlog to buckets: {str(e)}")
+        except Exception as e:
+            raise error_tools.InternalServerErrorException(detail=f"Unexpected error: {str(e)}")
+
+    async def archive_inactive_rooms(self, user_id: str, router: str, cutoff: str, dry_run: bool = False) -> Dict[str, int]:
+        """
+        마지막 대화 시간과 마지막 복원 시간이 cutoff보다 오래된 대화방을 압축하여 보관 컬렉션으로 옮깁니다.
+        보관 문서를 먼저 저장한 뒤 'updated_at'이 그대로인 경우에만 원래 문서를 삭제하므로,
+        보관하는 사이 새 대화가 추가된 대화방은 보관을 취소하고 그대로 둡니다.
+        'updated_at'이 없는 기존 대화방은 보관하지 않습니다 (mongo_migrations timestamps로 먼저 기록).
+
+        :param user_id: 사용자 ID
+        :param router: 라우터 타입 ('office' 또는 'chatbot')
+        :param cutoff: 기준 시간 문자열 ('%Y-%m-%d %H:%M:%S', 서버 로컬 시간)
+        :param dry_run: True이면 보관할 대화방과 압축 결과만 계산하고 옮기지 않음
+        :return: 지표 {'scanned', 'archived', 'skipped', 'turns', 'raw_bytes', 'archived_bytes'}
+        :raises error_tools.InternalServerErrorException: 보관 도중 문제가 발생할 경우
+        """
+        try:
+            metrics = {field: 0 for field in chat_archive.METRIC_FIELDS}
+            inactive = {
+                "updated_at": {"$lt": cutoff},
+                "$or": [{"restored_at": {"$exists": False}}, {"restored_at": {"$lt": cutoff}}],
+            }
+            for store in self._stores(router, user_id):
+                collection = await store.logs(ensure_indexes=False)
+                async for header in collection.find({**store.scope, **inactive}):
+                    metrics["scanned"] += 1
+                    document_id = header["id"]
+                    if header.get("storage") == "bucket":
+                        buckets = await store.buckets()
+                        turns = []
+                        async for bucket in buckets.find(store.room(document_id), {"_id": 0, "value": 1}).sort("bucket", 1):
+                            turns.extend(bucket.get("value") or [])
+                    else:
+                        turns = sorted(header.get("value") or [], key=lambda x:x.get("index") or 0)
+                    payload = self.archive.pack(turns)
+
+                    if not dry_run:
+                        room_header = {key: value for key, value in header.items() if key not in ("_id", "value", *store.scope)}
+                        await self.archive.save(router, user_id, room_header, turns, payload)
+                        result = await collection.delete_one({
+                            "_id": header["_id"],
+                            "updated_at": header["updated_at"],
+                            "restored_at": header.get("restored_at")
+                        })
+                        if result.deleted_count == 0:
+                            await self.archive.delete(router, user_id, document_id)
+                            metrics["skipped"] += 1
+                            continue
+                        if header.get("storage") == "bucket":
+                            await buckets.delete_many(store.room(document_id))
+                        await self.log_cache.invalidate((router, user_id, document_id))
+
+                    metrics["archived"] += 1
+                    metrics["turns"] += len(turns)
+                    metrics["raw_bytes"] += self.archive.raw_size(turns)
+                    metrics["archived_bytes"] += len(payload)
+            return metrics
+        except PyMongoError as e:
+            raise error_tools.InternalServerErrorException(detail=f"Error archiving chatlog: {str(e)}")
+        except Exception as e:
+            raise error_tools.InternalServerErrorException(detail=f"Unexpected error: {str(e)}")
+
+    async def iter_user_log(self, user_id: str, routers: Sequence[str] = ("office", "chatbot")) -> AsyncIterator[Dict]:
+        """
+        사용자의 모든 대화방을 커서로 순회하며 대화 턴을 하나씩 반환합니다.
+        대화방 전체를 메모리에 올리지 않으므로 대화 기록의 크기와 관계없이 메모리 사용량이 일정합니다.
+        캐시를 거치지 않고 MongoDB에서 직접 읽습니다.
+
+        :param user_id: 사용자 ID
+        :param routers: 내보낼 라우터 목록 ('office', 'chatbot')
+        :return: {'router', 'document_id', 'character_idx'(chatbot), 'index', ...대화 필드} 형태의 대화 턴
+        :raises error_tools.InternalServerErrorException: 데이터를 가져오는 도중 문제가 발생할 경우
+        """
+        try:
+            await self.write_buffer.flush_all()
+            for router in routers:
+                # 레이아웃 전환 중 두 저장소에 모두 있는 대화방은 우선 저장소의 것만 내보냄
+                exported = set()
+                for store in self._stores(router, user_id):
+                    collection = await store.logs(ensure_indexes=False)
+                    found = set()
+
+                    # embedded 방식 대화방은 서버에서 'value' 배열을 풀어 대화 턴 단위로 전송
+                    pipeline = [
+                        {"$match": {**store.scope, "storage": {"$ne": "bucket"}, "id": {"$nin": list(exported)}}},
+                        {"$unwind": "$value"},
+                        {"$project": {"_id": 0, "id": 1, "character_idx": 1, "turn": "$value"}},
+                    ]
+                    async for row in collection.aggregate(pipeline):
+                        found.add(row["id"])
+                        yield self._export_row(router, row["id"], row.get("character_idx"), self._from_db(row["turn"]))
+
+                    # bucket 방식 대화방은 버킷을 순서대로 읽음
+                    headers = collection.find(
+                        {**store.scope, "storage": "bucket", "id": {"$nin": list(exported)}},
+                        {"_id": 0, "id": 1, "character_idx": 1}
+                    )
+                    async for header in headers:
+                        found.add(header["id"])
+                        buckets = await store.buckets()
+                        async for bucket in buckets.find(store.room(header["id"]), {"_id": 0, "value": 1}).sort("bucket", 1):
+                            for turn in bucket.get("value") or []:
+                                yield self._export_row(router, header["id"], header.get("character_idx"), self._from_db(turn))
+                    exported |= found
+
+                # 보관된 대화방은 한 번에 하나씩 압축을 풀어 내보냄
+                archive = await self.archive.collection(router)
+                async for archived in archive.find({"user_id": user_id, "id": {"$nin": list(exported)}}):
+                    for turn in self.archive.unpack(archived):
+                        yield self._export_row(router, archived["id"], archived.get("character_idx"), self._from_db(turn))
+        except PyMongoError as e:
+            raise error_tools.InternalServerErrorException(detail=f"Error exporting chatlog: {str(e)}")
+
+    @staticmethod
+    def _export_row(router: str, document_id: str, character_idx: Optional[int], turn: Dict) -> Dict:
+        """
+        내보내기용 대화 턴 한 줄을 생성합니다.
+        """
+        row = {"router": router, "document_id": document_id}
+        if character_idx is not None:
+            row["character_idx"] = character_idx
+        row.update(turn)
+        return row
+
+    async def _locate_rooms(self, router: str, user_id: str, document_ids: List[str]) -> Dict[str, Tuple[ChatLogStore, Dict]]:
+        """
+        여러 대화방의 헤더(저장 방식, 'seq', 'version', 최신 인덱스('latest'), character_idx)를 저장소마다 한 번의 조회로 읽습니다.
+        어느 저장소에도 없는 대화방은 보관된 대화방을 복원한 뒤 우선 저장소에서 다시 찾습니다.
+
+        :return: 찾은 대화방별 (저장소, 헤더)
+        """
+        found: Dict[str, Tuple[ChatLogStore, Dict]] = {}
+        projection = {
+            "_id": 0, "id": 1, "storage": 1, "seq": 1, "version": 1, "character_idx": 1,
+            "latest": self._latest_index_expr()
+        }
+
+        async def find(store: ChatLogStore, targets: List[str]) -> None:
+            collection = await store.logs()
+            async for header in collection.find({**store.scope, "id": {"$in": targets}}, projection):
+                found.setdefault(header["id"], (store, header))
+
+        stores = self._stores(router, user_id)
+        for store in stores:
+            missing = [document_id for document_id in document_ids if document_id not in found]
+            if missing:
+                await find(store, missing)
+        restored = [
+            document_id for document_id in document_ids
+            if document_id not in found and await self._restore_room(router, user_id, document_id)
+        ]
+        if restored:
+            await find(stores[0], restored)
+        return found
+
+    async def _bulk_append_embedded(
+        self,
+        store: ChatLogStore,
+        rooms: List[Tuple[str, Dict, List[Dict]]],
+        now: str
+    ) -> Tuple[Dict[str, Tuple[int, int]], List[str], Dict[str, str]]:
+        """
+        embedded 방식 대화방들에 (문서 ID, 헤더, 저장 형식의 대화 턴 목록)을 bulk_write(ordered=True) 한 번으로 추가합니다.
+        읽은 'seq'와 'version'이 그대로인 대화방에만 추가하므로 인덱스를 미리 계산할 수 있고,
+        대화 턴과 'seq'를 한 문서에 함께 쓰므로 실패한 대화방의 'seq'는 증가하지 않습니다.
+
+        :return: (추가한 대화방별 (첫 번째 인덱스, version),
+                  다른 요청이 먼저 수정하여 추가하지 못한 대화방 목록,
+                  오류로 추가하지 못한 대화방별 오류 내용)
+        """
+        planned: Dict[str, Tuple[int, int]] = {}
+        requests = []
+        for document_id, header, turns in rooms:
+            first_index = (header.get("latest") or 0) + 1
+            planned[document_id] = (first_index, (header.get("version") or 0) + 1)
+            requests.append(UpdateOne(
+                store.room(document_id, storage={"$ne": "bucket"}, seq=header.get("seq"), version=header.get("version")),
+                {
+                    "$push": {"value": {"$each": [{"index": first_index + position, **turn} for position, turn in enumerate(turns)]}},
+                    "$set": {"seq": first_index + len(turns) - 1, "version": planned[document_id][1], "updated_at": now}
+                }
+            ))
+
+        collection = await store.logs()
+        failed: Dict[str, str] = {}
+        try:
+            matched = (await collection.bulk_write(requests, ordered=True)).matched_count
+            executed = rooms
+        except BulkWriteError as e:
+            # ordered=True이므로 오류가 난 요청과 그 이후의 요청은 반영되지 않음
+            error = e.details["writeErrors"][0]
+            matched = e.details.get("nMatched", 0)
+            executed = rooms[:error["index"]]
+            failed = {document_id: error.get("errmsg", str(e)) for document_id, _, _ in rooms[error["index"]:]}
+
+        if matched == len(executed):
+            return {document_id: planned[document_id] for document_id, _, _ in executed}, [], failed
+
+        # 일부 대화방이 읽은 뒤 수정된 경우, 첫 번째 대화 턴이 계산한 인덱스에 그대로 저장되었는지로 반영 여부를 확인
+        # (timestamp는 밀리초 단위로 저장되므로 같은 시간에 추가된 다른 대화 턴과 구분하도록 모든 필드를 비교)
+        applied = set()
+        query = {"$or": [
+            store.room(document_id, value={"$elemMatch": {"index": planned[document_id][0], **turns[0]}})
+            for document_id, _, turns in executed
+        ]}
+        async for header in collection.find(query, {"_id": 0, "id": 1}):
+            applied.add(header["id"])
+        return (
+            {document_id: planned[document_id] for document_id in applied},
+            [document_id for document_id, _, _ in executed if document_id not in applied],
+            failed
+        )
+
+    async def _bulk_append_buckets(
+        self,
+        store: ChatLogStore,
+        rooms: List[Tuple[str, Dict, List[Dict]]],
+        now: str
+    ) -> Tuple[Dict[str, Tuple[int, int]], Dict[str, str]]:
+        """
+        bucket 방식 대화방들에 (문서 ID, 헤더, 저장 형식의 대화 턴 목록)을 추가합니다.
+        대화방마다 헤더의 'seq'를 원자적으로 증가시켜 인덱스 구간을 예약하고, 모든 버킷 쓰기는 bulk_write(ordered=True) 한 번으로 처리합니다.
+        버킷 쓰기에 실패한 대화방은 일부 쓰인 대화 턴을 지우고, 그 사이 다른 요청이 없었으면 예약한 'seq'를 되돌립니다.
+
+        :return: (추가한 대화방별 (첫 번째 인덱스, version), 버킷 쓰기에 실패한 대화방별 오류 내용)
+                 헤더를 읽은 뒤 삭제된 대화방은 어느 쪽에도 포함하지 않음
+        """
+        collection = await store.logs()
+        buckets = await store.buckets()
+
+        async def reserve(document_id: str, count: int) -> Optional[Dict]:
+            return await collection.find_one_and_update(
+                store.room(document_id, storage="bucket"),
+                {"$inc": {"seq": count, "version": 1}, "$set": {"updated_at": now}},
+                projection={"_id": 0, "seq": 1, "version": 1},
+                return_document=ReturnDocument.AFTER
+            )
+
+        headers = await asyncio.gather(*(reserve(document_id, len(turns)) for document_id, _, turns in rooms))
+        reserved: Dict[str, Tuple[int, int]] = {}
+        failed: Dict[str, str] = {}
+        writes: List[Tuple[str, UpdateOne]] = []
+        for (document_id, _, turns), header in zip(rooms, headers):
+            if header is None:
+                # 헤더를 읽은 뒤 삭제된 대화방 (호출한 쪽에서 not_found로 처리)
+                continue
+            first_index = header["seq"] - len(turns) + 1
+            reserved[document_id] = (first_index, header["version"])
+            grouped: Dict[int, List[Dict]] = {}
+            for position, turn in enumerate(turns):
+                grouped.setdefault(self._bucket_no(first_index + position), []).append({"index": first_index + position, **turn})
+            # 다른 요청이 같은 버킷에 먼저 쓸 수 있으므로 '$sort'로 버킷 안을 인덱스 순으로 유지
+            writes.extend(
+                (document_id, UpdateOne(
+                    store.bucket(document_id, bucket_no),
+                    {"$push": {"value": {"$each": items, "$sort": {"index": 1}}}},
+                    upsert=True
+                ))
+                for bucket_no, items in grouped.items()
+            )
+
+        if not writes:
+            return reserved, failed
+        try:
+            await buckets.bulk_write([request for _, request in writes], ordered=True)
+            return reserved, failed
+        except BulkWriteError as e:
+            error = e.details["writeErrors"][0]
+            unwritten = {document_id for document_id, _ in writes[error["index"]:]}
+
+        counts = {document_id: len(turns) for document_id, _, turns in rooms}
+        for document_id in unwritten:
+            first_index, _ = reserved.pop(document_id)
+            last_index = first_index + counts[document_id] - 1
+            failed[document_id] = error.get("errmsg", f"Failed to write buckets for document with ID: {document_id}")
+            await buckets.update_many(
+                store.bucket(document_id, {"$gte": self._bucket_no(first_index), "$lte": self._bucket_no(last_index)}),
+                {"$pull": {"value": {"index": {"$gte": first_index, "$lte": last_index}}}}
+            )
+            released = await collection.update_one(
+                store.room(document_id, seq=last_index),
+                {"$set": {"seq": first_index - 1}, "$inc": {"version": 1}}
+            )
+            if released.modified_count == 0:
+                error_tools.logger.warning(
+                    f"Bulk append left unused indexes {first_index}-{last_index} in {store.log_name}:{document_id}"
+                )
+        return reserved, failed
+
+    async def add_logs_bulk(self, user_id: str, items: List[Dict], router: str) -> List[Dict]:
+        """
+        한 사용자의 여러 대화방에 여러 대화 턴을 한 번에 추가합니다.
+        대화방 헤더를 저장소마다 한 번에 읽은 뒤, embedded 방식 대화방의 추가와 bucket 방식 대화방의 버킷 쓰기를
+        컬렉션별 bulk_write(ordered=True) 한 번으로 처리합니다. 추가하지 못한 대화방의 'seq'는 증가하지 않으며,
+        사용량 집계와 검색 색인은 대화 턴을 모두 저장한 대화방만 갱신합니다.
+
+        :param user_id: 사용자 ID
+        :param items: [{'document_id': 문서 ID, 'turns': [추가할 JSON 데이터, ...]}, ...] (문서 ID는 중복되지 않아야 함)
+        :param router: 라우터 타입 ('office' 또는 'chatbot')
+        :return: 요청 순서대로 대화방별 결과
+                 {'document_id', 'status': 'added' | 'not_found' | 'error', 'first_index', 'last_index', 'detail'}
+        :raises error_tools.InternalServerErrorException: 데이터를 추가하는 도중 문제가 발생할 경우
+        """
+        try:
+            prepared = [
+                (item["document_id"], [self._build_turn(turn) for turn in item["turns"]])
+                for item in items
+            ]
+            # 버퍼에 먼저 들어온 대화 턴이 앞선 인덱스를 받도록 해당 대화방 큐를 먼저 비움
+            await asyncio.gather(*(
+                self.write_buffer.flush_key((router, user_id, document_id)) for document_id, _ in prepared
+            ))
+
+            now = self._now()
+            located = await self._locate_rooms(router, user_id, [document_id for document_id, _ in prepared])
+            groups: Dict[Tuple[str, bool], Tuple[ChatLogStore, List[Tuple[str, Dict, List[Dict]]]]] = {}
+            for document_id, turns in prepared:
+                if document_id in located:
+                    store, header = located[document_id]
+                    group = groups.setdefault((store.log_name, header.get("storage") == "bucket"), (store, []))
+                    group[1].append((document_id, header, [self.codec.encode(turn) for turn in turns]))
+
+            written: Dict[str, Tuple[int, int]] = {}
+            failed: Dict[str, str] = {}
+            conflicted: List[str] = []
+            for (_, bucketed), (store, rooms) in groups.items():
+                if bucketed:
+                    applied, errors = await self._bulk_append_buckets(store, rooms, now)
+                else:
+                    applied, retry, errors = await self._bulk_append_embedded(store, rooms, now)
+                    conflicted += retry
+                written.update(applied)
+                failed.update(errors)
+
+            # 헤더를 읽은 뒤 다른 요청이 먼저 수정한 대화방은 대화방 단위의 원자적 추가로 다시 시도
+            # (_append_turns가 사용량 집계와 검색 색인도 갱신)
+            turns_of = dict(prepared)
+            for document_id in conflicted:
+                try:
+                    written[document_id] = await self._append_turns(router, user_id, document_id, turns_of[document_id])
+                except error_tools.NotFoundException:
+                    pass
+                except PyMongoError as e:
+                    failed[document_id] = str(e)
+
+            results = []
+            for document_id, turns in prepared:
+                cache_key = (router, user_id, document_id)
+                if document_id in written:
+                    first_index, version = written[document_id]
+                    results.append({
+                        "document_id": document_id,
+                        "status": "added",
+                        "first_index": first_index,
+                        "last_index": first_index + len(turns) - 1,
+                    })
+                    await self.log_cache.extend(
+                        cache_key,
+                        [{"index": first_index + position, **self._rendered(turn)} for position, turn in enumerate(turns)],
+                        version
+                    )
+                    if document_id not in conflicted:
+                        character_idx = located[document_id][1].get("character_idx")
+                        self.usage.schedule(router, user_id, document_id, character_idx, turns)
+                        self.search.schedule_index(router, user_id, document_id, character_idx, enumerate(turns, start=first_index))
+                elif document_id in failed:
+                    results.append({"document_id": document_id, "status": "error", "detail": failed[document_id]})
+                    await self.log_cache.invalidate(cache_key)
+                else:
+                    results.append({
+                        "document_id": document_id,
+                        "status": "not_found",
+                        "detail": f"No document found with ID: {document_id}"
+                    })
+            return results
+        except PyMongoError as e:
+            raise error_tools.InternalServerErrorException(detail=f"Error adding chatlog values in bulk: {str(e)}")
+        except Exception as e:
+            raise error_tools.InternalServerErrorException(detail=f"Unexpected error: {str(e)}")
+
 # Office Collection---------------------------------------------------------------------------------------------------
     async def create_office_collection(self, user_id: str, router: str) -> str:
         """
@@ -156,13 +1840,10 @@ class MongoDBHandler:
         :raises error_tools.InternalServerErrorException: 채팅 로그 컬렉션을 생성하는 도중 문제가 발생할 경우
         """
         try:
-            collection_name = f'{router}_log_{user_id}'
-            collection = self.db[collection_name]
+            store = self._stores(router, user_id)[0]
+            collection = await store.logs()
             document_id = str(uuid.uuid4())
-            document = {
-                "id": document_id,
-                "value": []
-            }
+            document = {**store.scope, **self._new_room_document(document_id)}
             await collection.insert_one(document)
             return document_id
         except PyMongoError as e:
@@ -183,34 +1864,7 @@ class MongoDBHandler:
         :raises error_tools.InternalServerErrorException: 데이터를 추가하는 도중 문제가 발생할 경우
         """
         try:
-            collection = self.db[f'office_log_{user_id}']
-            document = await collection.find_one({"id": document_id})
-            if document is None:
-                raise error_tools.NotFoundException(f"No document found with ID: {document_id}")
-            
-            # 'id', 'user_id' 필드를 제외한 나머지 필드만 사용
-            new_data_filtered = {
-                key: value for key, value in new_data.items() if key not in ['id', 'user_id']
-            }
-
-            # 현재 날짜 시간 정보 추가
-            current_time = datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-            new_data_filtered["timestamp"] = current_time
-
-            new_index = len(document['value']) + 1
-            new_data_with_index = {
-                "index": new_index,
-                **new_data_filtered
-            }
-            result = await collection.update_one(
-                {"id": document_id},
-                {"$push": {"value": new_data_with_index}}
-            )
-
-            if result.modified_count > 0:
-                return f"Successfully added data to document with ID: {document_id}"
-            else:
-                raise error_tools.NotFoundException(f"No document found with ID: {document_id} or no data added.")
+            return await self._add_log("office", user_id, document_id, new_data)
         except PyMongoError as e:
             raise error_tools.InternalServerErrorException(detail=f"Error adding chatlog value: {str(e)}")
         except Exception as e:
@@ -228,93 +1882,51 @@ class MongoDBHandler:
         :raises error_tools.InternalServerErrorException: 데이터를 수정하는 도중 문제가 발생할 경우
         """
         try:
-            collection = self.db[f'office_log_{user_id}']
-            document = await collection.find_one({"id": document_id})
-            
-            if document is None:
-                raise error_tools.NotFoundException(f"No document found with ID: {document_id}")
-                
-            value_list = document.get("value", [])
-            
-            if not value_list:
-                raise error_tools.NotFoundException(f"No conversations found in document with ID: {document_id}")
-                
-            # None 값을 안전하게 처리하는 정렬 키 함수
-            def safe_get_index(item):
-                index = item.get("index")
-                # None 값이거나 정수가 아닌 경우 기본값으로 0 반환
-                return index if index is not None else 0
-                
-            # 가장 큰 인덱스(최신 대화) 찾기
-            sorted_value_list = sorted(value_list, key=safe_get_index)
-            if not sorted_value_list:
-                raise error_tools.NotFoundException(f"No valid conversations found in document with ID: {document_id}")
-                
-            latest_item = sorted_value_list[-1]  # 가장 큰 인덱스를 가진 항목
-            latest_index = latest_item.get("index")
-            
-            if latest_index is None:
-                raise error_tools.NotFoundException(f"Latest conversation has no valid index in document with ID: {document_id}")
-
-            # 'id', 'user_id' 필드를 제외한 나머지 필드만 사용
-            update_data_filtered = {
-                key: value for key, value in new_Data.items() if key not in ['id', 'user_id']
-            }
-            
-            # 현재 날짜 시간 정보 추가
-            current_time = datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-            update_data_filtered["timestamp"] = current_time
-            
-            # 최신 대화에 대한 업데이트 데이터 준비
-            update_data_with_index = {
-                "index": latest_index,
-                **update_data_filtered
-            }
-            
-            # 최신 대화 삭제 후 업데이트된 데이터 추가
-            result_pull = await collection.update_one(
-                {"id": document_id},
-                {"$pull": {"value": {"index": latest_index}}}
-            )
-            
-            result_push = await collection.update_one(
-                {"id": document_id},
-                {"$push": {"value": update_data_with_index}}
-            )
-            
-            if result_pull.modified_count > 0 or result_push.modified_count > 0:
-                return f"Successfully updated latest conversation (index: {latest_index}) in document with ID: {document_id}"
-            else:
-                raise error_tools.NotFoundException(f"Failed to update data in document with ID: {document_id}")
-                
+            return await self._update_latest_log("office", user_id, document_id, new_Data)
         except PyMongoError as e:
             raise error_tools.InternalServerErrorException(detail=f"Error updating chatlog value: {str(e)}")
         except Exception as e:
             raise error_tools.InternalServerErrorException(detail=f"Unexpected error: {str(e)}")
         
-    async def get_offic_log(self, user_id: str, document_id: str, router: str) -> List[Dict]:
+    async def get_offic_log(
+        self,
+        user_id: str,
+        document_id: str,
+        router: str,
+        last: Optional[int] = None,
+        before_index: Optional[int] = None,
+        after_index: Optional[int] = None,
+        since: Optional[datetime.datetime] = None,
+        until: Optional[datetime.datetime] = None,
+        with_version: bool = False
+    ):
         """
         특정 문서의 'value' 필드를 반환합니다.
         
         :param user_id: 사용자 ID
         :param document_id: 문서의 ID
+        :param last: 최근 N개의 대화만 반환
+        :param before_index: 이 인덱스보다 작은 대화만 반환
+        :param after_index: 이 인덱스보다 큰 대화만 반환
+        :param since: 이 시간 이후(포함)의 대화만 반환
+        :param until: 이 시간 이전(미포함)의 대화만 반환
+        :param with_version: True이면 반환한 대화 내용의 version을 함께 반환
         :return: 해당 문서의 'value' 필드 데이터 또는 빈 배열
+                 (with_version이면 (value, version), version을 확정할 수 없으면 None)
         :raises error_tools.NotFoundException: 문서가 존재하지 않을 경우
         :raises error_tools.InternalServerErrorException: 데이터를 가져오는 도중 문제가 발생할 경우
         """
         try:
-            collection = self.db[f'{router}_log_{user_id}']
-            document = await collection.find_one({"id": document_id})
-
-            if document is None:
-                raise error_tools.NotFoundException(f"No document found with ID: {document_id}")
-
-            value_list = document.get("value", [])
-
-            sorted_value_list = sorted(value_list, key=lambda x:x.get("index"))
+            document = await self._get_log_document(
+                router, user_id, document_id,
+                last=last, before_index=before_index, after_index=after_index,
+                since=since, until=until
+            )
 
             # document에서 value를 반환
-            return sorted_value_list
+            if with_version:
+                return document["value"], document.get("version", 0)
+            return document["value"]
         except PyMongoError as e:
             raise error_tools.InternalServerErrorException(detail=f"Error retrieving chatlog value: {str(e)}")
         except Exception as e:
@@ -333,15 +1945,15 @@ class MongoDBHandler:
         :raises error_tools.InternalServerErrorException: 채팅 로그 컬렉션을 생성하는 도중 문제가 발생할 경우
         """
         try:
-            collection_name = f'{router}_log_{user_id}'
-            collection = self.db[collection_name]
+            store = self._stores(router, user_id)[0]
+            collection = await store.logs()
             
             # 항상 새로운 UUID 생성
             document_id = str(uuid.uuid4())
             document = {
-                "id": document_id,
+                **store.scope,
                 "character_idx": character,
-                "value": []
+                **self._new_room_document(document_id)
             }
         
             result = await collection.insert_one(document)
@@ -366,34 +1978,7 @@ class MongoDBHandler:
         :raises error_tools.InternalServerErrorException: 데이터를 추가하는 도중 문제가 발생할 경우
         """
         try:
-            collection = self.db[f'chatbot_log_{user_id}']
-            document = await collection.find_one({"id": document_id})
-            if document is None:
-                raise error_tools.NotFoundException(f"No document found with ID: {document_id}")
-            
-            # 'id', 'user_id' 필드를 제외한 나머지 필드만 사용
-            new_data_filtered = {
-                key: value for key, value in new_data.items() if key not in ['id', 'user_id']
-            }
-            
-            # 현재 날짜 시간 정보 추가
-            current_time = datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-            new_data_filtered["timestamp"] = current_time
-
-            new_index = len(document['value']) + 1
-            new_data_with_index = {
-                "index": new_index,
-                **new_data_filtered
-            }
-            result = await collection.update_one(
-                {"id": document_id},
-                {"$push": {"value": new_data_with_index}}
-            )
-
-            if result.modified_count > 0:
-                return f"Successfully added data to document with ID: {document_id}"
-            else:
-                raise error_tools.NotFoundException(f"No document found with ID: {document_id} or no data added.")
+            return await self._add_log("chatbot", user_id, document_id, new_data)
         except PyMongoError as e:
             raise error_tools.InternalServerErrorException(detail=f"Error adding chatlog value: {str(e)}")
         except Exception as e:
@@ -411,94 +1996,52 @@ class MongoDBHandler:
         :raises error_tools.InternalServerErrorException: 데이터를 수정하는 도중 문제가 발생할 경우
         """
         try:
-            collection = self.db[f'chatbot_log_{user_id}']
-            document = await collection.find_one({"id": document_id})
-            
-            if document is None:
-                raise error_tools.NotFoundException(f"No document found with ID: {document_id}")
-                
-            value_list = document.get("value", [])
-            
-            if not value_list:
-                raise error_tools.NotFoundException(f"No conversations found in document with ID: {document_id}")
-                
-            # None 값을 안전하게 처리하는 정렬 키 함수
-            def safe_get_index(item):
-                index = item.get("index")
-                # None 값이거나 정수가 아닌 경우 기본값으로 0 반환
-                return index if index is not None else 0
-                
-            # 가장 큰 인덱스(최신 대화) 찾기
-            sorted_value_list = sorted(value_list, key=safe_get_index)
-            if not sorted_value_list:
-                raise error_tools.NotFoundException(f"No valid conversations found in document with ID: {document_id}")
-                
-            latest_item = sorted_value_list[-1]  # 가장 큰 인덱스를 가진 항목
-            latest_index = latest_item.get("index")
-            
-            if latest_index is None:
-                raise error_tools.NotFoundException(f"Latest conversation has no valid index in document with ID: {document_id}")
-
-            # 'id', 'user_id' 필드를 제외한 나머지 필드만 사용
-            update_data_filtered = {
-                key: value for key, value in new_Data.items() if key not in ['id', 'user_id']
-            }
-            
-            # 현재 날짜 시간 정보 추가
-            current_time = datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-            update_data_filtered["timestamp"] = current_time
-            
-            # 최신 대화에 대한 업데이트 데이터 준비
-            update_data_with_index = {
-                "index": latest_index,
-                **update_data_filtered
-            }
-            
-            # 최신 대화 삭제 후 업데이트된 데이터 추가
-            result_pull = await collection.update_one(
-                {"id": document_id},
-                {"$pull": {"value": {"index": latest_index}}}
-            )
-            
-            result_push = await collection.update_one(
-                {"id": document_id},
-                {"$push": {"value": update_data_with_index}}
-            )
-            
-            if result_pull.modified_count > 0 or result_push.modified_count > 0:
-                return f"Successfully updated latest conversation (index: {latest_index}) in document with ID: {document_id}"
-            else:
-                raise error_tools.NotFoundException(f"Failed to update data in document with ID: {document_id}")
-                
+            return await self._update_latest_log("chatbot", user_id, document_id, new_Data)
         except PyMongoError as e:
             raise error_tools.InternalServerErrorException(detail=f"Error updating chatlog value: {str(e)}")
         except Exception as e:
             raise error_tools.InternalServerErrorException(detail=f"Unexpected error: {str(e)}")
         
-    async def get_chatbot_log(self, user_id: str, document_id: str, router: str):
+    async def get_chatbot_log(
+        self,
+        user_id: str,
+        document_id: str,
+        router: str,
+        last: Optional[int] = None,
+        before_index: Optional[int] = None,
+        after_index: Optional[int] = None,
+        since: Optional[datetime.datetime] = None,
+        until: Optional[datetime.datetime] = None,
+        with_version: bool = False
+    ):
         """
         특정 문서의 'value' 필드와 'character_idx' 필드를 반환합니다.
         
         :param user_id: 사용자 ID
         :param document_id: 문서의 ID
+        :param last: 최근 N개의 대화만 반환
+        :param before_index: 이 인덱스보다 작은 대화만 반환
+        :param after_index: 이 인덱스보다 큰 대화만 반환
+        :param since: 이 시간 이후(포함)의 대화만 반환
+        :param until: 이 시간 이전(미포함)의 대화만 반환
+        :param with_version: True이면 반환한 대화 내용의 version을 함께 반환
         :return: 해당 문서의 'value' 필드 데이터와 'character_idx'
+                 (with_version이면 (value, character_idx, version), version을 확정할 수 없으면 None)
         :raises error_tools.NotFoundException: 문서가 존재하지 않을 경우
         :raises error_tools.InternalServerErrorException: 데이터를 가져오는 도중 문제가 발생할 경우
         """
         try:
-            collection = self.db[f'{router}_log_{user_id}']
-            document = await collection.find_one({"id": document_id})
-
-            if document is None:
-                raise error_tools.NotFoundException(f"No document found with ID: {document_id}")
-
-            value_list = document.get("value", [])
+            document = await self._get_log_document(
+                router, user_id, document_id,
+                last=last, before_index=before_index, after_index=after_index,
+                since=since, until=until
+            )
             character_idx = document.get("character_idx", 0)  # character_idx가 없으면 0을 반환
 
-            sorted_value_list = sorted(value_list, key=lambda x:x.get("index"))
-
             # document에서 value와 character_idx를 함께 반환
-            return sorted_value_list, character_idx
+            if with_version:
+                return document["value"], character_idx, document.get("version", 0)
+            return document["value"], character_idx
         except PyMongoError as e:
             raise error_tools.InternalServerErrorException(detail=f"Error retrieving chatlog value: {str(e)}")
         except Exception as e:
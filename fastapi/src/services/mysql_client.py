@@ -6,6 +6,8 @@ from typing import NoReturn, List
 from datetime import datetime, timedelta
 from databases import Database
 
+from . import cache_backends
+
 
 class MySQLDBHandler:
     def __init__(self) -> NoReturn:
@@ -23,6 +25,16 @@ class MySQLDBHandler:
             f"{os.getenv('MYSQL_DATABASE')}"
         )
 
+        # membership 조회 캐시 (MYSQL_MEMBERSHIP_CACHE_TTL=0이면 사용하지 않음)
+        # 다른 서비스가 users 테이블을 직접 수정할 수 있으므로 유지 시간을 짧게 설정
+        # 다른 워커의 무효화가 반영되도록 CACHE_BACKEND=redis일 때만 기본으로 사용
+        membership_backend = cache_backends.create_cache_backend()
+        self.membership_cache = cache_backends.VersionedCache(
+            membership_backend,
+            namespace="membership",
+            ttl=cache_backends.shared_ttl(membership_backend, "MYSQL_MEMBERSHIP_CACHE_TTL", 60)
+        )
+
     async def connect(self):
         '''
         데이터베이스 연결
@@ -34,6 +46,7 @@ class MySQLDBHandler:
         데이터베이스 연결 해제
         '''
         await self.database.disconnect()
+        await self.membership_cache.backend.close()
 
     async def fetch_all(self, query: str, params: dict = None) -> List[dict]:
         '''
@@ -59,12 +72,15 @@ class MySQLDBHandler:
         '''
         userid로 membership 등급(BASIC, VIP) 조회
         '''
-        query = """
-            SELECT membership FROM users
-            WHERE userid = :userid
-        """
-        result = await self.fetch_all(query, {'userid': userid})
-        return result[0]['membership'] if result else None
+        async def load() -> str:
+            query = """
+                SELECT membership FROM users
+                WHERE userid = :userid
+            """
+            result = await self.fetch_all(query, {'userid': userid})
+            return result[0]['membership'] if result else None
+
+        return await self.membership_cache.get_or_load(userid, load)
     
     async def create_verification_code(self, code: str, userid: str):
         '''
@@ -139,6 +155,7 @@ class MySQLDBHandler:
                 WHERE userid = :userid
             """
             await self.execute(update_membership_query, {'userid': userid, 'email': email})
+            await self.membership_cache.invalidate(userid)
 
             return "success"
         else:
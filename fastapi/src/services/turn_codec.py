@@ -0,0 +1,105 @@
+'''
+대화 턴의 큰 본문(output_data)을 압축하여 저장하는 모듈입니다.
+
+일정 크기 이상의 output_data를 zlib 또는 zstd로 압축해 BSON Binary로 저장하고,
+압축한 필드와 알고리즘을 턴의 'compressed' 필드({'output_data': 'zlib'})에 기록합니다.
+읽을 때는 설정과 관계없이 'compressed' 필드가 있는 턴을 모두 복원합니다.
+
+zstd는 zstandard 패키지가 설치된 경우에만 사용할 수 있습니다.
+'''
+import zlib
+from typing import Dict, Optional
+
+from bson import Binary
+
+# 압축 대상 필드. input_data는 최대 500자로 짧고 요약 집계에서 문자열로 사용하므로 제외
+COMPRESSED_FIELDS = ("output_data",)
+
+ALGORITHMS = ("off", "zlib", "zstd")
+
+def _zstd():
+    try:
+        import zstandard
+    except ImportError as e:
+        raise RuntimeError("zstd 압축을 사용하려면 zstandard 패키지를 설치해야 합니다.") from e
+    return zstandard
+
+class TurnCodec:
+    def __init__(self, algorithm: str = "off", min_bytes: int = 2048, level: Optional[int] = None) -> None:
+        """
+        TurnCodec 클래스 초기화.
+
+        :param algorithm: 'off', 'zlib' 또는 'zstd'
+        :param min_bytes: 이 크기(UTF-8 byte) 이상인 필드만 압축
+        :param level: 압축 수준 (기본값: zlib 6, zstd 3)
+        """
+        if algorithm not in ALGORITHMS:
+            raise ValueError(f"지원하지 않는 압축 알고리즘입니다: {algorithm}")
+        self.algorithm = algorithm
+        self.min_bytes = min_bytes
+        self.level = level
+        if algorithm == "zstd":
+            zstandard = _zstd()
+            self._zstd_compressor = zstandard.ZstdCompressor(level=level if level is not None else 3)
+
+    @property
+    def enabled(self) -> bool:
+        return self.algorithm != "off"
+
+    def _compress(self, data: bytes) -> bytes:
+        if self.algorithm == "zstd":
+            return self._zstd_compressor.compress(data)
+        return zlib.compress(data, self.level if self.level is not None else 6)
+
+    @staticmethod
+    def _decompress(algorithm: str, data: bytes) -> bytes:
+        if algorithm == "zstd":
+            return _zstd().ZstdDecompressor().decompress(data)
+        return zlib.decompress(data)
+
+    def needs_compression(self, turn: Dict) -> bool:
+        """
+        턴에 아직 압축하지 않은 큰 필드가 있는지 확인합니다.
+        """
+        if not self.enabled:
+            return False
+        return any(
+            isinstance(turn.get(field), str) and len(turn[field].encode("utf-8")) >= self.min_bytes
+            for field in COMPRESSED_FIELDS
+        )
+
+    def encode(self, turn: Dict) -> Dict:
+        """
+        저장할 턴의 큰 필드를 압축한 사본을 반환합니다. 압축해도 작아지지 않으면 원문을 그대로 둡니다.
+        """
+        if not self.needs_compression(turn):
+            return turn
+
+        encoded = dict(turn)
+        compressed = dict(turn.get("compressed") or {})
+        for field in COMPRESSED_FIELDS:
+            value = turn.get(field)
+            if not isinstance(value, str):
+                continue
+            raw = value.encode("utf-8")
+            if len(raw) < self.min_bytes:
+                continue
+            packed = self._compress(raw)
+            if len(packed) < len(raw):
+                encoded[field] = Binary(packed)
+                compressed[field] = self.algorithm
+        if compressed:
+            encoded["compressed"] = compressed
+        return encoded
+
+    def decode(self, turn: Dict) -> Dict:
+        """
+        읽은 턴의 압축된 필드를 원문으로 복원합니다. 턴을 직접 수정하고 반환합니다.
+        """
+        compressed = turn.pop("compressed", None)
+        if compressed:
+            for field, algorithm in compressed.items():
+                value = turn.get(field)
+                if isinstance(value, bytes):
+                    turn[field] = self._decompress(algorithm, bytes(value)).decode("utf-8")
+        return turn
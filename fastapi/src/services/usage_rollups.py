@@ -0,0 +1,188 @@
+'''
+채팅 사용량을 일별로 미리 집계하는 모듈입니다.
+
+집계를 켜면 (MONGO_USAGE_ROLLUPS=true) 대화 턴이 추가될 때마다 (날짜, 라우터, character_idx) 단위의 집계 문서에
+'$inc' upsert로 대화 수, 입력/출력 글자 수, 토큰 수, 활성 대화방 수를 더합니다.
+집계는 백그라운드 작업으로 실행하므로 대화 추가 요청은 집계 쓰기를 기다리지 않습니다.
+조회는 채팅 로그 컬렉션을 읽지 않고 집계 컬렉션만 읽습니다.
+
+기존 데이터는 CLI로 다시 집계합니다 (src 디렉토리에서 실행):
+    python -m services.mongo_migrations usage
+'''
+import asyncio
+import datetime
+from itertools import groupby
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+from motor.motor_asyncio import AsyncIOMotorDatabase
+
+from utils import error_tools, text_metrics
+from . import mongo_indexes
+
+# 일별 집계 컬렉션
+USAGE_COLLECTION = "chat_usage_daily"
+
+# 날짜별로 이미 집계한 대화방 기록 (활성 대화방 수 계산용, TTL 인덱스로 자동 삭제)
+ACTIVE_ROOMS_COLLECTION = "chat_usage_active_rooms"
+ACTIVE_ROOMS_RETENTION = datetime.timedelta(days=2)
+
+COUNTER_FIELDS = ("turns", "active_rooms", "input_chars", "output_chars", "tokens")
+
+class UsageRollups:
+    def __init__(self, db: AsyncIOMotorDatabase, index_manager: mongo_indexes.IndexManager, enabled: bool = False) -> None:
+        """
+        UsageRollups 클래스 초기화.
+        이 프로세스에서 오늘 이미 활성 대화방으로 집계한 대화방을 기억하여 같은 날 다시 확인하지 않습니다.
+
+        :param db: 데이터베이스
+        :param index_manager: 집계 컬렉션의 인덱스를 생성할 관리자
+        :param enabled: False이면 집계하지 않음
+        """
+        self.db = db
+        self.index_manager = index_manager
+        self.enabled = enabled
+        self._active_day: Optional[str] = None
+        self._active_rooms: Set[Tuple[str, str, str]] = set()
+        self._tasks: Set[asyncio.Task] = set()
+
+    @staticmethod
+    def key(day: str, router: str, character_idx: Optional[int]) -> str:
+        """
+        집계 문서의 _id를 생성합니다.
+        """
+        return f"{day}:{router}:{character_idx if character_idx is not None else '-'}"
+
+    @staticmethod
+    def day(turn: Dict) -> str:
+        """
+        대화 턴을 집계할 날짜(YYYY-MM-DD, 서버 로컬 시간)를 반환합니다.
+        timestamp는 UTC datetime이거나 변환 전의 로컬 시간 문자열입니다.
+        """
+        timestamp = turn["timestamp"]
+        if isinstance(timestamp, datetime.datetime):
+            if timestamp.tzinfo is None:
+                timestamp = timestamp.replace(tzinfo=datetime.timezone.utc)
+            return timestamp.astimezone().strftime("%Y-%m-%d")
+        return str(timestamp)[:10]
+
+    @staticmethod
+    def counters(turns: Iterable[Dict]) -> Dict[str, int]:
+        """
+        대화 턴 목록의 대화 수, 입력/출력 글자 수, 토큰 수를 합산합니다.
+        """
+        result = {"turns": 0, "input_chars": 0, "output_chars": 0, "tokens": 0}
+        for turn in turns:
+            result["turns"] += 1
+            result["input_chars"] += len(str(turn.get("input_data") or ""))
+            result["output_chars"] += len(str(turn.get("output_data") or ""))
+            result["tokens"] += turn["tokens"] if "tokens" in turn else text_metrics.measure_turn(turn)["tokens"]
+        return result
+
+    async def _mark_active(self, day: str, router: str, user_id: str, document_id: str) -> bool:
+        """
+        대화방이 해당 날짜에 처음 집계되는지 확인합니다.
+        """
+        room = (router, user_id, document_id)
+        if self._active_day != day:
+            self._active_day = day
+            self._active_rooms = set()
+        if room in self._active_rooms:
+            return False
+
+        collection = self.db[ACTIVE_ROOMS_COLLECTION]
+        await self.index_manager.ensure(collection)
+        result = await collection.update_one(
+            {"_id": f"{day}:{router}:{user_id}:{document_id}"},
+            {"$setOnInsert": {"expire_at": datetime.datetime.now(datetime.timezone.utc) + ACTIVE_ROOMS_RETENTION}},
+            upsert=True
+        )
+        self._active_rooms.add(room)
+        return result.upserted_id is not None
+
+    def schedule(
+        self,
+        router: str,
+        user_id: str,
+        document_id: str,
+        character_idx: Optional[int],
+        turns: List[Dict]
+    ) -> None:
+        """
+        집계가 켜져 있으면 record를 백그라운드 작업으로 실행하고 바로 반환합니다.
+        '$inc'는 순서와 관계없이 같은 결과가 되므로 작업끼리 순서를 맞추지 않습니다.
+        """
+        if not self.enabled or not turns:
+            return
+        task = asyncio.create_task(self.record(router, user_id, document_id, character_idx, turns))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def close(self) -> None:
+        """
+        애플리케이션 종료 시 실행 중인 집계 작업이 끝날 때까지 기다립니다.
+        """
+        if self._tasks:
+            await asyncio.gather(*self._tasks, return_exceptions=True)
+
+    async def record(
+        self,
+        router: str,
+        user_id: str,
+        document_id: str,
+        character_idx: Optional[int],
+        turns: List[Dict]
+    ) -> None:
+        """
+        추가된 대화 턴을 대화 턴의 날짜별 집계에 더합니다.
+        집계에 실패해도 대화 저장은 실패하지 않도록 로그만 남깁니다.
+        """
+        if not self.enabled or not turns:
+            return
+        try:
+            collection = self.db[USAGE_COLLECTION]
+            await self.index_manager.ensure(collection)
+            for day, day_turns in groupby(turns, key=self.day):
+                increments = self.counters(day_turns)
+                if await self._mark_active(day, router, user_id, document_id):
+                    increments["active_rooms"] = 1
+                await collection.update_one(
+                    {"_id": self.key(day, router, character_idx)},
+                    {
+                        "$inc": increments,
+                        "$setOnInsert": {"date": day, "router": router, "character_idx": character_idx}
+                    },
+                    upsert=True
+                )
+        except Exception as e:
+            error_tools.logger.warning(f"Usage rollup failed for {router}:{user_id}:{document_id}: {str(e)}")
+
+    async def query(
+        self,
+        router: str,
+        start: str,
+        end: str,
+        character_idx: Optional[int] = None
+    ) -> List[Dict]:
+        """
+        기간 내 일별 집계를 날짜, character_idx 순으로 반환합니다.
+
+        :param router: 라우터 타입 ('office' 또는 'chatbot')
+        :param start: 시작 날짜 (YYYY-MM-DD, 포함)
+        :param end: 끝 날짜 (YYYY-MM-DD, 포함)
+        :param character_idx: 특정 캐릭터만 조회할 경우 캐릭터 인덱스
+        :return: {'date', 'router', 'character_idx', 집계 값..., 'avg_output_chars', 'avg_tokens'} 목록
+        """
+        query = {"router": router, "date": {"$gte": start, "$lte": end}}
+        if character_idx is not None:
+            query["character_idx"] = character_idx
+
+        rows = []
+        collection = self.db[USAGE_COLLECTION]
+        async for row in collection.find(query, {"_id": 0}).sort([("date", 1), ("character_idx", 1)]):
+            for field in COUNTER_FIELDS:
+                row.setdefault(field, 0)
+            turns = row["turns"]
+            row["avg_output_chars"] = round(row["output_chars"] / turns, 1) if turns else 0.0
+            row["avg_tokens"] = round(row["tokens"] / turns, 1) if turns else 0.0
+            rows.append(row)
+        return rows
@@ -0,0 +1,170 @@
+'''
+채팅 턴 추가를 모아서 쓰는 write-behind 버퍼 모듈입니다.
+
+대화방(router, user_id, document_id)마다 추가 요청을 메모리 큐에 모았다가, 짧은 주기가 지나거나
+큐가 일정 크기에 도달하면 대화방당 한 번의 '$push $each' 쓰기로 MongoDB에 반영합니다.
+
+durability 설정:
+- flush: 실제로 MongoDB에 반영된 뒤 요청에 응답 (기본값, 응답 지연이 최대 한 주기만큼 늘어남)
+- buffer: 큐에 넣은 즉시 응답. 프로세스가 비정상 종료되면 반영되지 않은 대화가 유실될 수 있고,
+          존재하지 않는 대화방에 대한 요청도 성공으로 응답한 뒤 로그에만 기록됨
+'''
+import asyncio
+from typing import Awaitable, Callable, Dict, List, Optional, Tuple
+
+from utils import error_tools
+
+BufferKey = Tuple[str, str, str]
+
+class _Queue:
+    __slots__ = ("items", "lock")
+
+    def __init__(self) -> None:
+        self.items: List[Tuple[Dict, Optional[asyncio.Future]]] = []
+        self.lock = asyncio.Lock()
+
+class WriteBehindBuffer:
+    def __init__(
+        self,
+        flush_fn: Callable[[BufferKey, List[Dict]], Awaitable[int]],
+        enabled: bool = False,
+        interval: float = 0.05,
+        max_turns: int = 50,
+        durability: str = "flush"
+    ) -> None:
+        """
+        WriteBehindBuffer 클래스 초기화.
+
+        :param flush_fn: 대화방 하나의 대화 턴 목록을 한 번에 쓰고 첫 번째 인덱스를 반환하는 함수
+        :param enabled: False이면 버퍼를 사용하지 않음
+        :param interval: 주기적으로 모든 큐를 비우는 간격(초)
+        :param max_turns: 대화방 큐가 이 크기에 도달하면 주기를 기다리지 않고 바로 씀
+        :param durability: 'flush'(반영 후 응답) 또는 'buffer'(큐에 넣은 즉시 응답)
+        """
+        if durability not in ("flush", "buffer"):
+            raise ValueError(f"지원하지 않는 durability 값입니다: {durability}")
+        self.flush_fn = flush_fn
+        self.enabled = enabled
+        self.interval = interval
+        self.max_turns = max_turns
+        self.durability = durability
+
+        self._queues: Dict[BufferKey, _Queue] = {}
+        self._task: Optional[asyncio.Task] = None
+        self._size_flushes: set = set()
+
+        self.flushes = 0
+        self.flushed_turns = 0
+        self.failed_turns = 0
+        self.max_batch = 0
+
+    def start(self) -> None:
+        """
+        주기적으로 큐를 비우는 백그라운드 작업을 시작합니다.
+        """
+        if self.enabled and (self._task is None or self._task.done()):
+            self._task = asyncio.create_task(self._run())
+
+    async def _run(self) -> None:
+        while True:
+            await asyncio.sleep(self.interval)
+            await self.flush_all()
+
+    def add(self, key: BufferKey, turn: Dict) -> Optional[asyncio.Future]:
+        """
+        대화 턴을 대화방 큐에 넣습니다.
+
+        :return: durability가 'flush'이면 반영 후 할당된 인덱스를 돌려주는 Future, 'buffer'이면 None
+        """
+        queue = self._queues.get(key)
+        if queue is None:
+            queue = self._queues[key] = _Queue()
+        future = asyncio.get_running_loop().create_future() if self.durability == "flush" else None
+        queue.items.append((turn, future))
+
+        if len(queue.items) >= self.max_turns:
+            task = asyncio.create_task(self.flush_key(key))
+            self._size_flushes.add(task)
+            task.add_done_callback(self._size_flushes.discard)
+        return future
+
+    async def flush_key(self, key: BufferKey) -> None:
+        """
+        대화방 큐에 쌓인 대화 턴을 한 번에 씁니다.
+        같은 대화방의 쓰기는 잠금으로 순서대로 실행되므로 인덱스 순서가 요청 순서와 같습니다.
+        """
+        queue = self._queues.get(key)
+        if queue is None:
+            return
+        async with queue.lock:
+            items, queue.items = queue.items, []
+            if items:
+                await self._write(key, items)
+            if not queue.items and self._queues.get(key) is queue:
+                del self._queues[key]
+
+    async def _write(self, key: BufferKey, items: List[Tuple[Dict, Optional[asyncio.Future]]]) -> None:
+        try:
+            first_index = await self.flush_fn(key, [turn for turn, _ in items])
+        except Exception as e:
+            self.failed_turns += len(items)
+            for _, future in items:
+                if future is not None and not future.done():
+                    future.set_exception(e)
+            if self.durability == "buffer":
+                error_tools.logger.error(f"Write-behind flush failed for {key}, {len(items)} turns dropped: {str(e)}")
+            return
+
+        self.flushes += 1
+        self.flushed_turns += len(items)
+        self.max_batch = max(self.max_batch, len(items))
+        for position, (_, future) in enumerate(items):
+            if future is not None and not future.done():
+                future.set_result(first_index + position)
+
+    async def flush_all(self) -> None:
+        """
+        모든 대화방 큐를 비웁니다.
+        """
+        keys = list(self._queues)
+        if keys:
+            await asyncio.gather(*(self.flush_key(key) for key in keys))
+
+    async def flush_matching(self, match: Callable[[BufferKey], bool]) -> None:
+        """
+        조건에 맞는 대화방 큐만 비웁니다.
+        """
+        keys = [key for key in self._queues if match(key)]
+        if keys:
+            await asyncio.gather(*(self.flush_key(key) for key in keys))
+
+    async def close(self) -> None:
+        """
+        백그라운드 작업을 멈추고 남은 대화 턴을 모두 씁니다.
+        """
+        if self._task is not None and not self._task.done():
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+        await self.flush_all()
+
+    def stats(self) -> Dict:
+        """
+        버퍼 반영 횟수와 묶음 크기 등의 지표를 반환합니다.
+        """
+        return {
+            "enabled": self.enabled,
+            "durability": self.durability,
+            "interval": self.interval,
+            "max_turns": self.max_turns,
+            "pending_rooms": len(self._queues),
+            "pending_turns": sum(len(queue.items) for queue in self._queues.values()),
+            "flushes": self.flushes,
+            "flushed_turns": self.flushed_turns,
+            "failed_turns": self.failed_turns,
+            "max_batch": self.max_batch,
+            "avg_batch": round(self.flushed_turns / self.flushes, 2) if self.flushes else 0.0,
+            "writes_saved": self.flushed_turns - self.flushes,
+        }
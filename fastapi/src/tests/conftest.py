@@ -0,0 +1,40 @@
+'''
+MongoDBHandler 동작 테스트에서 공통으로 사용하는 fixture입니다. MongoDB 대신 mongomock-motor를 사용합니다.
+'''
+import pytest
+
+from services import mongodb_client
+
+HANDLER_ENV = {
+    "MONGO_DATABASE": "test",
+    "MONGO_CHAT_STORAGE": "embedded",
+    "MONGO_CHAT_LAYOUT": "per_user",
+    "MONGO_CHAT_CACHE_TTL": "0",
+    "IDEMPOTENCY_TTL": "0",
+    "MONGO_WRITE_BEHIND": "false",
+    "MONGO_SEARCH_INDEX": "false",
+    "MONGO_USAGE_ROLLUPS": "false",
+}
+
+@pytest.fixture
+def make_handler(monkeypatch):
+    '''
+    환경 변수를 덮어쓴 MongoDBHandler를 mongomock 데이터베이스에 연결하여 생성하는 함수를 반환합니다.
+    같은 테스트에서 여러 번 호출하면 같은 데이터베이스를 공유합니다 (설정 전환 테스트용).
+    '''
+    mongomock_motor = pytest.importorskip("mongomock_motor")
+    from tests import mongomock_compat
+    mongomock_compat.install()
+    client = mongomock_motor.AsyncMongoMockClient()
+
+    def make(**env) -> mongodb_client.MongoDBHandler:
+        for key, value in {**HANDLER_ENV, **env}.items():
+            monkeypatch.setenv(key, str(value))
+        handler = mongodb_client.MongoDBHandler()
+        handler.client = client
+        handler.db = client["test"]
+        for component in (handler.index_manager, handler.archive, handler.search, handler.usage):
+            component.db = handler.db
+        return handler
+
+    return make
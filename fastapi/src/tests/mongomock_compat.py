@@ -0,0 +1,179 @@
+'''
+테스트에서 실제 MongoDBHandler 코드를 mongomock으로 실행하기 위해 mongomock이 지원하지 않는 기능을 보완합니다.
+
+- 집계 표현식: 배열 리터럴 안의 표현식, $mergeObjects, $first/$last, $type, $dateFromString, 시간대가 있는 datetime 비교
+- find 프로젝션의 집계 표현식 ($filter, $slice [배열, n])
+- let/pipeline을 사용하는 $lookup
+- 현재 pymongo의 UpdateOne과 호환되지 않는 bulk_write
+- '_id'를 제외한 프로젝션에서 수정 후 문서를 다시 찾지 못하는 find_one_and_update
+'''
+import datetime
+import re
+from types import SimpleNamespace
+
+from mongomock import aggregate, collection, helpers
+from pymongo import UpdateOne
+import pytz
+
+_parse = aggregate._Parser.parse
+
+_TYPE_NAMES = [
+    (bool, "bool"), (int, "int"), (float, "double"), (str, "string"),
+    (datetime.datetime, "date"), (list, "array"), (dict, "object"), (bytes, "binData"),
+]
+
+
+def _type_name(value) -> str:
+    if value is None:
+        return "null"
+    for python_type, name in _TYPE_NAMES:
+        if isinstance(value, python_type):
+            return name
+    return type(value).__name__
+
+
+def _localize(value: datetime.datetime, timezone: str) -> datetime.datetime:
+    # MongoDB는 Olson 이름과 함께 '+0900', '-05:30' 같은 UTC 오프셋도 허용
+    offset = re.fullmatch(r"([+-])(\d{2}):?(\d{2})", timezone)
+    if offset is None:
+        return pytz.timezone(timezone).localize(value)
+    sign, hours, minutes = offset.groups()
+    delta = datetime.timedelta(hours=int(hours), minutes=int(minutes))
+    return value.replace(tzinfo=datetime.timezone(delta if sign == "+" else -delta))
+
+
+def _date_from_string(parser, options):
+    value = parser.parse(options["dateString"])
+    try:
+        parsed = datetime.datetime.strptime(value, options.get("format", "%Y-%m-%dT%H:%M:%S"))
+        return _localize(parsed, parser.parse(options.get("timezone", "UTC"))).astimezone(pytz.utc).replace(tzinfo=None)
+    except (TypeError, ValueError):
+        if "onError" in options:
+            return parser.parse(options["onError"])
+        raise
+
+
+def parse(self, expression):
+    if isinstance(expression, list):
+        return list(self.parse_many(expression))
+    if isinstance(expression, dict) and len(expression) == 1:
+        operator, value = next(iter(expression.items()))
+        if operator == "$mergeObjects":
+            merged = {}
+            for item in self.parse_many(value if isinstance(value, list) else [value]):
+                merged.update(item or {})
+            return merged
+        if operator in ("$first", "$last"):
+            array = self.parse(value[0] if isinstance(value, list) and len(value) == 1 else value)
+            if not array:
+                return None
+            return array[0] if operator == "$first" else array[-1]
+        if operator == "$type":
+            try:
+                return _type_name(self.parse(value[0] if isinstance(value, list) else value))
+            except KeyError:
+                return "missing"
+        if operator == "$dateFromString":
+            return _date_from_string(self, value)
+        if operator == "$substrCP":
+            string, start, length = self.parse_many(value)
+            return (string or "")[start:start + length]
+        if operator in aggregate.comparison_operators:
+            # 없는 필드는 null로 비교하고, 시간대가 있는 datetime은 MongoDB처럼 UTC로 비교
+            return _parse(self, {operator: [
+                {"$literal": helpers.patch_datetime_awareness_in_document(_parse_or_none(self, item))} for item in value
+            ]})
+    return _parse(self, expression)
+
+
+def _parse_or_none(parser, expression):
+    try:
+        return parser.parse(expression)
+    except KeyError:
+        return None
+
+
+_lookup = aggregate._handle_lookup_stage
+
+
+def _handle_lookup_stage(in_collection, database, options):
+    if "pipeline" not in options:
+        return _lookup(in_collection, database, options)
+    foreign = list(database.get_collection(options["from"]).find())
+    for doc in in_collection:
+        user_vars = {name: aggregate._Parser(doc).parse(expr) for name, expr in options.get("let", {}).items()}
+        matches = [dict(foreign_doc) for foreign_doc in foreign]
+        for stage in options["pipeline"]:
+            (operator, stage_options), = stage.items()
+            if operator == "$match" and set(stage_options) == {"$expr"}:
+                matches = [
+                    item for item in matches
+                    if helpers.mongodb_to_bool(aggregate._Parser(item, user_vars).parse(stage_options["$expr"]))
+                ]
+            else:
+                matches = aggregate._PIPELINE_HANDLERS[operator](matches, database, stage_options)
+        doc[options["as"]] = list(matches)
+    return in_collection
+
+
+def _is_expression(value) -> bool:
+    if not isinstance(value, dict) or len(value) != 1:
+        return False
+    operator, argument = next(iter(value.items()))
+    if operator == "$slice":
+        # {'$slice': n}, {'$slice': [skip, limit]}는 find 프로젝션 연산자
+        return isinstance(argument, list) and not isinstance(argument[0], int)
+    return operator not in ("$elemMatch",)
+
+
+_copy_only_fields = collection.Collection._copy_only_fields
+
+
+def _copy_with_expressions(self, doc, fields, container):
+    if not isinstance(fields, dict):
+        return _copy_only_fields(self, doc, fields, container)
+    expressions = {key: value for key, value in fields.items() if _is_expression(value)}
+    if not expressions:
+        return _copy_only_fields(self, doc, fields, container)
+    plain = {key: (1 if key in expressions else value) for key, value in fields.items()}
+    doc_copy = _copy_only_fields(self, doc, plain, container)
+    for key, expression in expressions.items():
+        doc_copy.pop(key, None)
+        try:
+            doc_copy[key] = aggregate._Parser(doc).parse(expression)
+        except KeyError:
+            # 없는 필드에 대한 표현식은 결과에서 제외
+            pass
+    return doc_copy
+
+
+_find_and_modify = collection.Collection._find_and_modify
+
+
+def _find_and_modify_by_id(self, query, projection=None, update=None, upsert=False, sort=None, *args, **kwargs):
+    # 수정으로 조건이 더 이상 맞지 않아도 같은 문서를 반환하도록 '_id'로 먼저 찾음
+    found = self.find_one(query, projection={"_id": 1}, sort=sort)
+    if found is not None:
+        query = {"_id": found["_id"]}
+    return _find_and_modify(self, query, projection, update, upsert, sort, *args, **kwargs)
+
+
+def bulk_write(self, requests, ordered=True, **kwargs):
+    matched = modified = upserted = 0
+    for request in requests:
+        if not isinstance(request, UpdateOne):
+            raise NotImplementedError(f"Unsupported bulk_write request: {request!r}")
+        result = self.update_one(request._filter, request._doc, upsert=request._upsert)
+        matched += result.matched_count
+        modified += result.modified_count
+        upserted += result.upserted_id is not None
+    return SimpleNamespace(matched_count=matched, modified_count=modified, upserted_count=upserted)
+
+
+def install():
+    aggregate._Parser.parse = parse
+    aggregate._handle_lookup_stage = _handle_lookup_stage
+    aggregate._PIPELINE_HANDLERS["$lookup"] = _handle_lookup_stage
+    collection.Collection._copy_only_fields = _copy_with_expressions
+    collection.Collection.bulk_write = bulk_write
+    collection.Collection._find_and_modify = _find_and_modify_by_id
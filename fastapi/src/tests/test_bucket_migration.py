@@ -0,0 +1,68 @@
+'''
+embedded 대화방을 버킷 저장 방식으로 변환하는 migrate_to_buckets의 동시 수정 처리 테스트입니다.
+'''
+import pytest
+
+def turn(number: int, output: str = None) -> dict:
+    return {"input_data": f"q{number}", "output_data": output or f"a{number}"}
+
+async def make_embedded_room(make_handler, count: int) -> str:
+    handler = make_handler(MONGO_CHAT_STORAGE="embedded")
+    document_id = await handler.create_office_collection("user", "office")
+    await handler._append_turns("office", "user", document_id, [turn(number) for number in range(1, count + 1)])
+    return document_id
+
+@pytest.mark.asyncio
+async def test_migration_splits_room_into_buckets(make_handler):
+    document_id = await make_embedded_room(make_handler, 5)
+    handler = make_handler(MONGO_CHAT_STORAGE="bucket", MONGO_CHAT_BUCKET_SIZE=2)
+
+    assert await handler.migrate_to_buckets("user", "office") == 1
+
+    header = await (await handler.per_user_store("office", "user").logs()).find_one({"id": document_id})
+    assert (header["storage"], header["seq"], header["version"]) == ("bucket", 5, 1)
+    assert "value" not in header
+    assert [item["index"] for item in await handler.get_offic_log("user", document_id, "office")] == [1, 2, 3, 4, 5]
+    assert await handler._append_turns("office", "user", document_id, [turn(6)]) == (6, 2)
+
+@pytest.mark.asyncio
+async def test_migration_skips_room_updated_during_copy(make_handler, monkeypatch):
+    document_id = await make_embedded_room(make_handler, 3)
+    handler = make_handler(MONGO_CHAT_STORAGE="bucket", MONGO_CHAT_BUCKET_SIZE=2)
+    buckets = await handler.per_user_store("office", "user").buckets()
+    replace_one = type(buckets).replace_one
+    edited = []
+
+    async def replace_then_edit(self, *args, **kwargs):
+        result = await replace_one(self, *args, **kwargs)
+        if not edited:
+            # 버킷을 복사하는 도중 최신 대화가 수정되어 대화 수는 그대로이고 내용만 바뀜
+            edited.append(True)
+            await make_handler(MONGO_CHAT_STORAGE="embedded")._update_latest_log(
+                "office", "user", document_id, turn(3, "edited")
+            )
+        return result
+
+    monkeypatch.setattr(type(buckets), "replace_one", replace_then_edit)
+    assert await handler.migrate_to_buckets("user", "office") == 0
+    monkeypatch.undo()
+
+    header = await (await handler.per_user_store("office", "user").logs()).find_one({"id": document_id})
+    assert "storage" not in header
+    assert await handler.migrate_to_buckets("user", "office") == 1
+    assert [item["output_data"] for item in await handler.get_offic_log("user", document_id, "office")] == ["a1", "a2", "edited"]
+
+@pytest.mark.asyncio
+async def test_migration_removes_buckets_left_by_earlier_attempt(make_handler):
+    document_id = await make_embedded_room(make_handler, 3)
+    handler = make_handler(MONGO_CHAT_STORAGE="bucket", MONGO_CHAT_BUCKET_SIZE=2)
+    buckets = await handler.per_user_store("office", "user").buckets()
+    # 대화를 지우기 전에 실패한 이전 변환이 남긴 버킷
+    await buckets.insert_one({"id": document_id, "bucket": 2, "value": [{"index": 5, "input_data": "old"}]})
+    await make_handler(MONGO_CHAT_STORAGE="embedded").remove_log("user", document_id, 3, "office")
+
+    assert await handler.migrate_to_buckets("user", "office") == 1
+
+    assert sorted([bucket["bucket"] async for bucket in buckets.find({"id": document_id})]) == [0]
+    assert await handler._append_turns("office", "user", document_id, [turn(3), turn(4), turn(5)]) == (3, 3)
+    assert [item["index"] for item in await handler.get_offic_log("user", document_id, "office")] == [1, 2, 3, 4, 5]
@@ -0,0 +1,86 @@
+'''
+여러 대화방에 대화 턴을 한 번에 추가하는 add_logs_bulk 테스트입니다.
+'''
+import pytest
+
+def turns(*numbers: int) -> list:
+    return [{"input_data": f"q{number}", "output_data": f"a{number}"} for number in numbers]
+
+async def create_room(make_handler, storage: str) -> str:
+    return await make_handler(MONGO_CHAT_STORAGE=storage, MONGO_CHAT_BUCKET_SIZE=2).create_office_collection("user", "office")
+
+async def indexes(handler, document_id: str) -> list:
+    return [item["index"] for item in await handler.get_offic_log("user", document_id, "office")]
+
+@pytest.mark.asyncio
+async def test_mixed_embedded_and_bucket_batch(make_handler):
+    embedded_id = await create_room(make_handler, "embedded")
+    bucket_id = await create_room(make_handler, "bucket")
+    handler = make_handler(MONGO_CHAT_STORAGE="bucket", MONGO_CHAT_BUCKET_SIZE=2)
+    await handler.add_office_log("user", embedded_id, turns(1)[0])
+
+    results = await handler.add_logs_bulk("user", [
+        {"document_id": bucket_id, "turns": turns(1, 2)},
+        {"document_id": embedded_id, "turns": turns(2, 3)},
+    ], "office")
+
+    assert [(result["status"], result["first_index"], result["last_index"]) for result in results] == [
+        ("added", 1, 2), ("added", 2, 3)
+    ]
+    assert await indexes(handler, bucket_id) == [1, 2]
+    assert await indexes(handler, embedded_id) == [1, 2, 3]
+    assert await handler.get_log_version("user", bucket_id, "office") == 1
+    assert await handler.get_log_version("user", embedded_id, "office") == 2
+
+@pytest.mark.asyncio
+async def test_batch_spills_across_bucket_boundary(make_handler):
+    handler = make_handler(MONGO_CHAT_STORAGE="bucket", MONGO_CHAT_BUCKET_SIZE=2)
+    document_id = await handler.create_office_collection("user", "office")
+    await handler.add_office_log("user", document_id, turns(1)[0])
+
+    results = await handler.add_logs_bulk("user", [{"document_id": document_id, "turns": turns(2, 3, 4, 5)}], "office")
+
+    assert (results[0]["first_index"], results[0]["last_index"]) == (2, 5)
+    buckets = await handler.per_user_store("office", "user").buckets()
+    stored = [(bucket["bucket"], [item["index"] for item in bucket["value"]]) async for bucket in buckets.find({}).sort("bucket", 1)]
+    assert stored == [(0, [1, 2]), (1, [3, 4]), (2, [5])]
+    assert [item["input_data"] for item in await handler.get_offic_log("user", document_id, "office", last=2)] == ["q4", "q5"]
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("storage", ["embedded", "bucket"])
+async def test_missing_room_does_not_stop_batch(make_handler, storage):
+    handler = make_handler(MONGO_CHAT_STORAGE=storage, MONGO_CHAT_BUCKET_SIZE=2)
+    first_id = await handler.create_office_collection("user", "office")
+    second_id = await handler.create_office_collection("user", "office")
+
+    results = await handler.add_logs_bulk("user", [
+        {"document_id": first_id, "turns": turns(1)},
+        {"document_id": "missing", "turns": turns(1, 2)},
+        {"document_id": second_id, "turns": turns(1, 2, 3)},
+    ], "office")
+
+    assert [(result["document_id"], result["status"]) for result in results] == [
+        (first_id, "added"), ("missing", "not_found"), (second_id, "added")
+    ]
+    assert await indexes(handler, first_id) == [1]
+    assert await indexes(handler, second_id) == [1, 2, 3]
+    store = handler.per_user_store("office", "user")
+    assert await (await store.logs()).count_documents({"id": "missing"}) == 0
+
+@pytest.mark.asyncio
+async def test_embedded_room_changed_after_lookup_is_retried(make_handler, monkeypatch):
+    handler = make_handler(MONGO_CHAT_STORAGE="embedded")
+    document_id = await handler.create_office_collection("user", "office")
+    locate_rooms = handler._locate_rooms
+
+    async def locate_then_append(*args, **kwargs):
+        located = await locate_rooms(*args, **kwargs)
+        # 헤더를 읽은 뒤 다른 요청이 먼저 대화를 추가함
+        await handler.add_office_log("user", document_id, {"input_data": "other", "output_data": "other"})
+        return located
+
+    monkeypatch.setattr(handler, "_locate_rooms", locate_then_append)
+    results = await handler.add_logs_bulk("user", [{"document_id": document_id, "turns": turns(1, 2)}], "office")
+
+    assert (results[0]["status"], results[0]["first_index"], results[0]["last_index"]) == ("added", 2, 3)
+    assert [item["input_data"] for item in await handler.get_offic_log("user", document_id, "office")] == ["other", "q1", "q2"]
@@ -0,0 +1,184 @@
+'''
+cache_backends 모듈의 캐시 백엔드와 버전 스탬프 무효화 테스트입니다.
+
+redis 백엔드는 REDIS_URL 환경 변수가 설정된 경우에만 실행합니다.
+'''
+import os
+import uuid
+import asyncio
+
+import pytest
+import pytest_asyncio
+
+from services import cache_backends, chat_cache
+
+pytestmark = pytest.mark.asyncio
+
+BACKENDS = ["memory", "redis"]
+
+@pytest_asyncio.fixture(params=BACKENDS)
+async def backend(request):
+    if request.param == "memory":
+        yield cache_backends.MemoryCacheBackend(max_bytes=1024 * 1024)
+        return
+    url = os.getenv("REDIS_URL")
+    if not url:
+        pytest.skip("REDIS_URL이 설정되지 않아 redis 백엔드 테스트를 건너뜁니다.")
+    pytest.importorskip("redis")
+    redis_backend = cache_backends.RedisCacheBackend(url)
+    yield redis_backend
+    await redis_backend.close()
+
+@pytest.fixture
+def namespace() -> str:
+    # redis 백엔드를 공유해도 테스트끼리 키가 겹치지 않도록 함
+    return f"test-{uuid.uuid4().hex}"
+
+async def test_set_nx_and_delete(backend, namespace):
+    key = f"{namespace}:key"
+    assert await backend.set(key, b"first", 60)
+    assert not await backend.set(key, b"second", 60, nx=True)
+    assert await backend.mget([key, f"{namespace}:missing"]) == [b"first", None]
+
+    await backend.delete(key)
+    assert await backend.mget([key]) == [None]
+
+async def test_incr_starts_from_one(backend, namespace):
+    key = f"{namespace}:counter"
+    assert await backend.incr(key) == 1
+    assert await backend.incr(key) == 2
+    await backend.delete(key)
+
+async def test_memory_backend_expires_entries():
+    backend = cache_backends.MemoryCacheBackend(max_bytes=1024 * 1024)
+    await backend.set("key", b"value", 0.01)
+    await asyncio.sleep(0.02)
+    assert await backend.mget(["key"]) == [None]
+    assert (await backend.stats())["entries"] == 0
+
+async def test_memory_backend_evicts_least_recently_used():
+    entry = cache_backends.ENTRY_OVERHEAD + len("a") + 10
+    backend = cache_backends.MemoryCacheBackend(max_bytes=entry * 2)
+    await backend.set("a", b"x" * 10, 60)
+    await backend.set("b", b"x" * 10, 60)
+    # a를 읽어 최근 사용으로 만든 뒤 새 항목을 넣으면 b가 제거됨
+    await backend.mget(["a"])
+    await backend.set("c", b"x" * 10, 60)
+
+    assert await backend.mget(["a", "b", "c"]) == [b"x" * 10, None, b"x" * 10]
+    stats = await backend.stats()
+    assert stats["evictions"] == 1
+    assert stats["bytes"] <= stats["max_bytes"]
+
+async def test_get_or_load_reads_through_once(backend, namespace):
+    cache = cache_backends.VersionedCache(backend, namespace, ttl=60)
+    loads = []
+
+    async def loader():
+        loads.append(1)
+        return {"value": [1, 2]}
+
+    assert await cache.get_or_load("room", loader) == {"value": [1, 2]}
+    assert await cache.get_or_load("room", loader) == {"value": [1, 2]}
+    assert len(loads) == 1
+    assert cache.stats()["hits"] == 1 and cache.stats()["misses"] == 1
+
+async def test_update_patches_cached_value(backend, namespace):
+    cache = cache_backends.VersionedCache(backend, namespace, ttl=60)
+    await cache.get_or_load("room", _constant([1]))
+
+    await cache.update("room", lambda value: value + [2])
+
+    assert await cache.peek("room") == (True, [1, 2])
+    assert cache.patches == 1
+
+async def test_invalidate_from_another_worker(backend, namespace):
+    # 같은 백엔드를 공유하는 두 워커의 캐시
+    first = cache_backends.VersionedCache(backend, namespace, ttl=60)
+    second = cache_backends.VersionedCache(backend, namespace, ttl=60)
+    await first.get_or_load("room", _constant("old"))
+    assert await second.peek("room") == (True, "old")
+
+    await second.invalidate("room")
+
+    assert await first.peek("room") == (False, None)
+    assert await first.get_or_load("room", _constant("new")) == "new"
+
+async def test_value_loaded_during_write_is_not_served(backend, namespace):
+    cache = cache_backends.VersionedCache(backend, namespace, ttl=60)
+
+    async def racing_loader():
+        # 읽는 도중 다른 요청이 대화방을 수정한 경우
+        await cache.invalidate("room")
+        return "stale"
+
+    assert await cache.get_or_load("room", racing_loader) == "stale"
+    assert await cache.peek("room") == (False, None)
+
+async def test_expired_version_key_does_not_revive_old_entry():
+    backend = cache_backends.MemoryCacheBackend(max_bytes=1024 * 1024)
+    cache = cache_backends.VersionedCache(backend, "test", ttl=60)
+    await cache.get_or_load("room", _constant("old"))
+    version_key, _ = cache._keys("room")
+
+    # 버전 키만 만료되어도 새 스탬프는 이전 스탬프와 달라야 함
+    await backend.delete(version_key)
+
+    assert await cache.peek("room") == (False, None)
+
+async def test_disabled_cache_always_loads():
+    cache = cache_backends.VersionedCache(cache_backends.MemoryCacheBackend(1024 * 1024), "test", ttl=0)
+    loads = []
+
+    async def loader():
+        loads.append(1)
+        return "value"
+
+    await cache.get_or_load("room", loader)
+    await cache.get_or_load("room", loader)
+    assert len(loads) == 2
+
+async def test_backend_errors_fall_back_to_loader():
+    class BrokenBackend(cache_backends.CacheBackend):
+        async def mget(self, keys):
+            raise ConnectionError("cache down")
+
+    cache = cache_backends.VersionedCache(BrokenBackend(), "test", ttl=60)
+
+    assert await cache.get_or_load("room", _constant("value")) == "value"
+    assert cache.errors == 1
+
+async def test_chat_log_cache_drops_entry_on_index_gap(backend, namespace):
+    cache = chat_cache.ChatLogCache(backend, ttl=60)
+    key = ("office", namespace, "room")
+    await cache.read_through(key, _constant({"value": [{"index": 1}], "version": 1}))
+
+    await cache.append(key, {"index": 2}, version=2)
+    assert (await cache.get(key))["value"] == [{"index": 1}, {"index": 2}]
+
+    # 다른 워커가 추가한 3번을 모르는 상태에서 4번이 들어오면 항목을 버림
+    await cache.append(key, {"index": 4}, version=4)
+    assert await cache.get(key) is None
+
+def _constant(value):
+    async def loader():
+        return value
+    return loader
+
+async def test_shared_ttl_defaults_to_off_for_memory_backend(monkeypatch):
+    monkeypatch.delenv("TEST_CACHE_TTL", raising=False)
+    memory = cache_backends.MemoryCacheBackend(max_bytes=1024)
+    shared = cache_backends.MemoryCacheBackend(max_bytes=1024)
+    shared.shared = True
+
+    assert cache_backends.shared_ttl(memory, "TEST_CACHE_TTL", 300) == 0
+    assert cache_backends.shared_ttl(shared, "TEST_CACHE_TTL", 300) == 300
+
+async def test_shared_ttl_warns_when_memory_backend_is_enabled(monkeypatch, caplog):
+    monkeypatch.setenv("TEST_CACHE_TTL", "60")
+    memory = cache_backends.MemoryCacheBackend(max_bytes=1024)
+
+    with caplog.at_level("WARNING"):
+        assert cache_backends.shared_ttl(memory, "TEST_CACHE_TTL", 300) == 60
+
+    assert "TEST_CACHE_TTL=60" in caplog.text
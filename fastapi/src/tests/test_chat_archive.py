@@ -0,0 +1,125 @@
+'''
+오래된 대화방 보관(archive_inactive_rooms)과 보관된 대화방 복원의 저장 방식별(embedded, bucket) 동작 테스트입니다.
+'''
+import pytest
+
+STORAGE_MODES = ["embedded", "bucket"]
+FUTURE_CUTOFF = "9999-12-31 00:00:00"
+PAST_CUTOFF = "2000-01-01 00:00:00"
+
+def turn(number: int) -> dict:
+    return {"input_data": f"q{number}", "output_data": f"a{number}"}
+
+async def create_room(handler, count: int) -> str:
+    document_id = await handler.create_office_collection("user", "office")
+    for number in range(1, count + 1):
+        await handler.add_office_log("user", document_id, turn(number))
+    return document_id
+
+async def stored_room(handler, document_id: str):
+    '''
+    MongoDB에 저장된 대화방 헤더(_id 제외)와 버킷 (번호, 인덱스 목록)을 읽습니다.
+    '''
+    store = handler.per_user_store("office", "user")
+    header = await (await store.logs()).find_one(store.room(document_id), {"_id": 0})
+    buckets = await store.buckets()
+    layout = [(bucket["bucket"], [item["index"] for item in bucket["value"]]) async for bucket in buckets.find(store.room(document_id)).sort("bucket", 1)]
+    return header, layout
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("storage", STORAGE_MODES)
+async def test_archive_and_restore_round_trip(make_handler, storage):
+    handler = make_handler(MONGO_CHAT_STORAGE=storage, MONGO_CHAT_BUCKET_SIZE=2)
+    document_id = await create_room(handler, 5)
+    value, version = await handler.get_offic_log("user", document_id, "office", with_version=True)
+    header, layout = await stored_room(handler, document_id)
+
+    metrics = await handler.archive_inactive_rooms("user", "office", FUTURE_CUTOFF)
+
+    assert (metrics["scanned"], metrics["archived"], metrics["skipped"], metrics["turns"]) == (1, 1, 0, 5)
+    assert 0 < metrics["archived_bytes"] and 0 < metrics["raw_bytes"]
+    assert await stored_room(handler, document_id) == (None, [])
+    archived = await handler.archive.find("office", "user", document_id)
+    assert (archived["turns"], archived["updated_at"]) == (5, header["updated_at"])
+
+    assert await handler.get_offic_log("user", document_id, "office", with_version=True) == (value, version)
+    restored_header, restored_layout = await stored_room(handler, document_id)
+    assert {key: item for key, item in restored_header.items() if key != "restored_at"} == header
+    assert "restored_at" in restored_header
+    assert restored_layout == layout
+    assert await handler.archive.find("office", "user", document_id) is None
+    assert handler.archive.restores == 1
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("storage", STORAGE_MODES)
+async def test_append_to_archived_room_continues_indexes(make_handler, storage):
+    handler = make_handler(MONGO_CHAT_STORAGE=storage, MONGO_CHAT_BUCKET_SIZE=2)
+    document_id = await create_room(handler, 3)
+    await handler.archive_inactive_rooms("user", "office", FUTURE_CUTOFF)
+
+    await handler.add_office_log("user", document_id, turn(4))
+
+    value, version = await handler.get_offic_log("user", document_id, "office", with_version=True)
+    assert [item["index"] for item in value] == [1, 2, 3, 4]
+    assert version == 4
+
+@pytest.mark.asyncio
+async def test_dry_run_does_not_move_rooms(make_handler):
+    handler = make_handler()
+    document_id = await create_room(handler, 2)
+    before = await stored_room(handler, document_id)
+
+    metrics = await handler.archive_inactive_rooms("user", "office", FUTURE_CUTOFF, dry_run=True)
+
+    assert (metrics["archived"], metrics["turns"]) == (1, 2)
+    assert await stored_room(handler, document_id) == before
+    assert await handler.archive.find("office", "user", document_id) is None
+
+@pytest.mark.asyncio
+async def test_only_inactive_rooms_are_archived(make_handler):
+    handler = make_handler()
+    active_id = await create_room(handler, 1)
+    legacy_id = await create_room(handler, 1)
+    logs = await handler.per_user_store("office", "user").logs()
+    # updated_at이 없는 기존 대화방은 보관하지 않음
+    await logs.update_one({"id": legacy_id}, {"$unset": {"updated_at": ""}})
+
+    assert (await handler.archive_inactive_rooms("user", "office", PAST_CUTOFF))["archived"] == 0
+    assert (await handler.archive_inactive_rooms("user", "office", FUTURE_CUTOFF))["archived"] == 1
+    assert await handler.archive.find("office", "user", active_id) is not None
+    assert await handler.archive.find("office", "user", legacy_id) is None
+
+@pytest.mark.asyncio
+async def test_restored_room_is_not_archived_again_before_cutoff(make_handler):
+    handler = make_handler()
+    document_id = await create_room(handler, 1)
+    logs = await handler.per_user_store("office", "user").logs()
+    await logs.update_one({"id": document_id}, {"$set": {"updated_at": "2020-01-01 00:00:00"}})
+    await handler.archive_inactive_rooms("user", "office", "2021-01-01 00:00:00")
+    await handler.get_offic_log("user", document_id, "office")
+
+    metrics = await handler.archive_inactive_rooms("user", "office", "2021-01-01 00:00:00")
+
+    assert metrics["scanned"] == 0
+    assert await handler.archive.find("office", "user", document_id) is None
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("storage", STORAGE_MODES)
+async def test_room_changed_while_archiving_is_kept(make_handler, monkeypatch, storage):
+    handler = make_handler(MONGO_CHAT_STORAGE=storage, MONGO_CHAT_BUCKET_SIZE=2)
+    document_id = await create_room(handler, 2)
+    logs = await handler.per_user_store("office", "user").logs()
+    await logs.update_one({"id": document_id}, {"$set": {"updated_at": "2020-01-01 00:00:00"}})
+    save = handler.archive.save
+
+    async def save_then_append(*args, **kwargs):
+        await save(*args, **kwargs)
+        # 보관 문서를 저장한 뒤 원래 문서를 삭제하기 전에 새 대화가 추가됨
+        await handler.add_office_log("user", document_id, turn(3))
+
+    monkeypatch.setattr(handler.archive, "save", save_then_append)
+    metrics = await handler.archive_inactive_rooms("user", "office", "2021-01-01 00:00:00")
+
+    assert (metrics["archived"], metrics["skipped"]) == (0, 1)
+    assert await handler.archive.find("office", "user", document_id) is None
+    assert [item["index"] for item in await handler.get_offic_log("user", document_id, "office")] == [1, 2, 3]
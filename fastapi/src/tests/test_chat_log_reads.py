@@ -0,0 +1,41 @@
+'''
+대화 조회(get_offic_log, get_recent_context)의 응답 형식과 구간 조회 테스트입니다.
+'''
+import pytest
+
+from utils import text_metrics
+
+STORAGE_MODES = ["embedded", "bucket"]
+
+def turn(number: int) -> dict:
+    return {"input_data": f"q{number}", "output_data": f"a{number}"}
+
+async def make_room(handler, count: int) -> str:
+    document_id = await handler.create_office_collection("user", "office")
+    if count:
+        await handler._append_turns("office", "user", document_id, [handler._build_turn(turn(number)) for number in range(1, count + 1)])
+    return document_id
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("storage", STORAGE_MODES)
+@pytest.mark.parametrize("cache_ttl", [0, 60])
+async def test_stored_metrics_are_not_returned(make_handler, storage, cache_ttl):
+    handler = make_handler(MONGO_CHAT_STORAGE=storage, MONGO_CHAT_BUCKET_SIZE=2, MONGO_CHAT_CACHE_TTL=cache_ttl)
+    document_id = await make_room(handler, 3)
+
+    for window in [{}, {"last": 2}, {"after_index": 1}]:
+        value = await handler.get_offic_log("user", document_id, "office", **window)
+        assert value
+        assert all(field not in item for item in value for field in text_metrics.METRIC_FIELDS)
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("storage", STORAGE_MODES)
+async def test_recent_context_uses_stored_metrics_without_returning_them(make_handler, storage):
+    handler = make_handler(MONGO_CHAT_STORAGE=storage, MONGO_CHAT_BUCKET_SIZE=2)
+    document_id = await make_room(handler, 4)
+
+    context = await handler.get_recent_context("user", document_id, "office", budget=12, unit="chars")
+
+    assert [item["index"] for item in context["value"]] == [4, 3, 2]
+    assert (context["used"], context["truncated"]) == (12, True)
+    assert all(field not in item for item in context["value"] for field in text_metrics.METRIC_FIELDS)
@@ -0,0 +1,154 @@
+'''
+대화 턴 추가(_append_turns)와 최신 대화 수정(_update_latest_log)의 저장 방식별(embedded, bucket) 동작 테스트입니다.
+'''
+import asyncio
+
+import pytest
+
+from services import mongodb_client
+from utils import error_tools
+
+STORAGE_MODES = ["embedded", "bucket"]
+
+def turn(number: int) -> dict:
+    return {"input_data": f"q{number}", "output_data": f"a{number}"}
+
+async def stored_indexes(handler: mongodb_client.MongoDBHandler, document_id: str) -> list:
+    '''
+    저장 방식과 관계없이 MongoDB에 저장된 순서대로 대화 인덱스를 읽습니다.
+    '''
+    store = handler.per_user_store("office", "user")
+    header = await (await store.logs()).find_one({"id": document_id})
+    if header.get("storage") != "bucket":
+        return [item["index"] for item in header["value"]]
+    indexes = []
+    async for bucket in (await store.buckets()).find({"id": document_id}).sort("bucket", 1):
+        indexes.extend(item["index"] for item in bucket["value"])
+    return indexes
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("storage", STORAGE_MODES)
+async def test_append_assigns_consecutive_indexes(make_handler, storage):
+    handler = make_handler(MONGO_CHAT_STORAGE=storage, MONGO_CHAT_BUCKET_SIZE=2)
+    document_id = await handler.create_office_collection("user", "office")
+
+    assert await handler._append_turns("office", "user", document_id, [turn(1)]) == (1, 1)
+    assert await handler._append_turns("office", "user", document_id, [turn(2), turn(3), turn(4)]) == (2, 2)
+
+    assert await stored_indexes(handler, document_id) == [1, 2, 3, 4]
+    header = await (await handler.per_user_store("office", "user").logs()).find_one({"id": document_id})
+    assert (header["seq"], header["version"]) == (4, 2)
+    assert [item["input_data"] for item in await handler.get_offic_log("user", document_id, "office")] == ["q1", "q2", "q3", "q4"]
+
+@pytest.mark.asyncio
+async def test_bucket_append_splits_turns_by_bucket(make_handler):
+    handler = make_handler(MONGO_CHAT_STORAGE="bucket", MONGO_CHAT_BUCKET_SIZE=2)
+    document_id = await handler.create_office_collection("user", "office")
+
+    await handler._append_turns("office", "user", document_id, [turn(number) for number in range(1, 6)])
+
+    buckets = await handler.per_user_store("office", "user").buckets()
+    stored = [(bucket["bucket"], [item["index"] for item in bucket["value"]]) async for bucket in buckets.find({}).sort("bucket", 1)]
+    assert stored == [(0, [1, 2]), (1, [3, 4]), (2, [5])]
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("storage", STORAGE_MODES)
+async def test_concurrent_appends_do_not_share_indexes(make_handler, storage):
+    handler = make_handler(MONGO_CHAT_STORAGE=storage, MONGO_CHAT_BUCKET_SIZE=3)
+    document_id = await handler.create_office_collection("user", "office")
+
+    results = await asyncio.gather(*(
+        handler._append_turns("office", "user", document_id, [turn(number)]) for number in range(1, 11)
+    ))
+
+    assert sorted(index for index, _ in results) == list(range(1, 11))
+    assert sorted(version for _, version in results) == list(range(1, 11))
+    assert sorted(await stored_indexes(handler, document_id)) == list(range(1, 11))
+    assert await handler.get_log_version("user", document_id, "office") == 10
+
+@pytest.mark.asyncio
+async def test_interleaved_bucket_appends_keep_index_order(make_handler, monkeypatch):
+    handler = make_handler(MONGO_CHAT_STORAGE="bucket")
+    document_id = await handler.create_office_collection("user", "office")
+    buckets = await handler.per_user_store("office", "user").buckets()
+    update_one = type(buckets).update_one
+    second_written = asyncio.Event()
+    pushes = []
+
+    async def delayed_update_one(self, query, update, *args, **kwargs):
+        if "$push" not in update:
+            return await update_one(self, query, update, *args, **kwargs)
+        pushes.append(update)
+        if len(pushes) == 1:
+            # 먼저 인덱스를 예약한 요청의 버킷 쓰기를 다음 요청의 쓰기 뒤로 미룸
+            await second_written.wait()
+            return await update_one(self, query, update, *args, **kwargs)
+        result = await update_one(self, query, update, *args, **kwargs)
+        second_written.set()
+        return result
+
+    monkeypatch.setattr(type(buckets), "update_one", delayed_update_one)
+    results = await asyncio.gather(
+        handler._append_turns("office", "user", document_id, [turn(1)]),
+        handler._append_turns("office", "user", document_id, [turn(2)]),
+    )
+
+    assert [index for index, _ in results] == [1, 2]
+    assert await stored_indexes(handler, document_id) == [1, 2]
+    assert [item["index"] for item in await handler.get_offic_log("user", document_id, "office", last=1)] == [2]
+    assert [item["index"] for item in await handler.get_offic_log("user", document_id, "office")] == [1, 2]
+
+@pytest.mark.asyncio
+async def test_bucket_mode_appends_to_embedded_room(make_handler):
+    document_id = await make_handler(MONGO_CHAT_STORAGE="embedded").create_office_collection("user", "office")
+    handler = make_handler(MONGO_CHAT_STORAGE="bucket")
+
+    assert await handler._append_turns("office", "user", document_id, [turn(1), turn(2)]) == (1, 1)
+
+    header = await (await handler.per_user_store("office", "user").logs()).find_one({"id": document_id})
+    assert "storage" not in header
+    assert [item["index"] for item in header["value"]] == [1, 2]
+
+@pytest.mark.asyncio
+async def test_append_to_missing_room_raises_not_found(make_handler):
+    handler = make_handler()
+
+    with pytest.raises(mongodb_client.RoomNotFoundException):
+        await handler._append_turns("office", "user", "missing", [turn(1)])
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("storage", STORAGE_MODES)
+async def test_update_latest_replaces_only_latest_turn(make_handler, storage):
+    handler = make_handler(MONGO_CHAT_STORAGE=storage, MONGO_CHAT_BUCKET_SIZE=2)
+    document_id = await handler.create_office_collection("user", "office")
+    await handler._append_turns("office", "user", document_id, [turn(1), turn(2), turn(3)])
+
+    await handler._update_latest_log("office", "user", document_id, {"input_data": "q3", "output_data": "edited"})
+
+    value, version = await handler.get_offic_log("user", document_id, "office", with_version=True)
+    assert [item["output_data"] for item in value] == ["a1", "a2", "edited"]
+    assert [item["index"] for item in value] == [1, 2, 3]
+    assert version == 2
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("storage", STORAGE_MODES)
+async def test_update_latest_on_empty_room_raises_not_found(make_handler, storage):
+    handler = make_handler(MONGO_CHAT_STORAGE=storage)
+    document_id = await handler.create_office_collection("user", "office")
+
+    with pytest.raises(error_tools.NotFoundException) as raised:
+        await handler._update_latest_log("office", "user", document_id, turn(1))
+
+    assert not isinstance(raised.value, mongodb_client.RoomNotFoundException)
+    assert await handler.get_log_version("user", document_id, "office") == 0
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("storage", STORAGE_MODES)
+async def test_update_latest_after_removing_all_turns_raises_not_found(make_handler, storage):
+    handler = make_handler(MONGO_CHAT_STORAGE=storage)
+    document_id = await handler.create_office_collection("user", "office")
+    await handler._append_turns("office", "user", document_id, [turn(1)])
+    await handler.remove_log("user", document_id, 1, "office")
+
+    with pytest.raises(error_tools.NotFoundException):
+        await handler._update_latest_log("office", "user", document_id, turn(2))
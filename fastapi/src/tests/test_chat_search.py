@@ -0,0 +1,48 @@
+'''
+chat_search 모듈의 n-gram 생성과 페이지 커서 테스트입니다.
+'''
+import datetime
+
+import pytest
+from bson import ObjectId
+
+from services import chat_search
+
+ChatSearchIndex = chat_search.ChatSearchIndex
+
+@pytest.mark.parametrize("timestamp", [
+    datetime.datetime(2025, 1, 1, 9, 30, 15, 123000),
+    datetime.datetime(2025, 1, 1, 9, 30, tzinfo=datetime.timezone.utc),
+    None,
+])
+def test_cursor_round_trip(timestamp):
+    entry_id = ObjectId()
+
+    cursor = ChatSearchIndex.encode_cursor(timestamp, entry_id)
+
+    assert ChatSearchIndex.decode_cursor(cursor) == (timestamp, entry_id)
+
+def test_cursor_is_url_safe():
+    cursor = ChatSearchIndex.encode_cursor(datetime.datetime(2025, 1, 1), ObjectId())
+
+    assert all(char.isalnum() or char in "-_=" for char in cursor)
+
+@pytest.mark.parametrize("cursor", [
+    "not-a-cursor",
+    "",
+    ChatSearchIndex.encode_cursor(None, ObjectId())[:-4],
+    # _id가 올바르지 않은 커서
+    "WyIyMDI1LTAxLTAxVDAwOjAwOjAwIiwgIngiXQ==",
+])
+def test_invalid_cursor(cursor):
+    with pytest.raises(ValueError):
+        ChatSearchIndex.decode_cursor(cursor)
+
+def test_ngrams_keep_first_occurrence_order():
+    assert chat_search.ngrams("회의 회의록 A") == ["회의", "의록", "a"]
+
+def test_ngrams_limit():
+    assert chat_search.ngrams("abcdef", limit=3) == ["ab", "bc", "cd"]
+
+def test_normalize():
+    assert chat_search.normalize("  Hello\n  World ") == "hello world"
@@ -0,0 +1,149 @@
+'''
+CompressionMiddleware의 크기 기준, 스트리밍 압축, Vary 헤더 테스트입니다.
+'''
+import gzip
+import zlib
+from typing import Dict, List, Optional
+
+import pytest
+from starlette.datastructures import Headers
+
+from utils import compression
+
+BODY = b'{"value": "' + "대화 내용 ".encode("utf-8") * 400 + b'"}'
+
+def make_app(chunks: List[bytes], media_type: str = "application/json", status: int = 200, headers: Dict[str, str] = None):
+    '''
+    chunks를 본문으로 전송하는 ASGI 앱을 만듭니다. 조각이 하나이면 Content-Length를 붙입니다.
+    '''
+    raw_headers = [(b"content-type", media_type.encode("latin-1"))]
+    raw_headers += [(name.lower().encode("latin-1"), value.encode("latin-1")) for name, value in (headers or {}).items()]
+    if len(chunks) == 1:
+        raw_headers.append((b"content-length", str(len(chunks[0])).encode("latin-1")))
+
+    async def app(scope, receive, send):
+        await send({"type": "http.response.start", "status": status, "headers": list(raw_headers)})
+        for i, chunk in enumerate(chunks):
+            await send({"type": "http.response.body", "body": chunk, "more_body": i < len(chunks) - 1})
+
+    return app
+
+async def call(app, accept_encoding: Optional[str] = "gzip", **options):
+    '''
+    미들웨어를 거쳐 app을 호출하고 (응답 헤더, 본문 조각 목록)을 반환합니다.
+    '''
+    middleware = compression.CompressionMiddleware(app, **options)
+    scope = {"type": "http", "method": "GET", "path": "/", "headers": []}
+    if accept_encoding is not None:
+        scope["headers"] = [(b"accept-encoding", accept_encoding.encode("latin-1"))]
+    messages = []
+
+    async def receive():
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message):
+        messages.append(message)
+
+    await middleware(scope, receive, send)
+    headers = Headers(raw=messages[0]["headers"])
+    return headers, [message.get("body", b"") for message in messages[1:]]
+
+@pytest.mark.asyncio
+async def test_small_response_is_not_compressed():
+    headers, chunks = await call(make_app([b'{"ok": true}']))
+
+    assert "content-encoding" not in headers
+    assert b"".join(chunks) == b'{"ok": true}'
+    # 크기가 기준을 넘으면 압축되므로 캐시는 여전히 Accept-Encoding으로 구분해야 함
+    assert headers["vary"] == "Accept-Encoding"
+
+@pytest.mark.asyncio
+async def test_response_at_threshold_is_gzipped():
+    headers, chunks = await call(make_app([BODY]), minimum_size=len(BODY))
+
+    assert headers["content-encoding"] == "gzip"
+    assert int(headers["content-length"]) == len(b"".join(chunks))
+    assert gzip.decompress(b"".join(chunks)) == BODY
+
+@pytest.mark.asyncio
+async def test_response_below_threshold_is_sent_as_is():
+    headers, chunks = await call(make_app([BODY]), minimum_size=len(BODY) + 1)
+
+    assert "content-encoding" not in headers
+    assert b"".join(chunks) == BODY
+
+@pytest.mark.asyncio
+async def test_brotli_is_preferred_when_accepted():
+    brotli = pytest.importorskip("brotli")
+    headers, chunks = await call(make_app([BODY]), accept_encoding="gzip, br")
+
+    assert headers["content-encoding"] == "br"
+    assert brotli.decompress(b"".join(chunks)) == BODY
+
+@pytest.mark.asyncio
+async def test_client_without_accept_encoding_gets_identity():
+    headers, chunks = await call(make_app([BODY]), accept_encoding=None)
+
+    assert "content-encoding" not in headers
+    assert headers["vary"] == "Accept-Encoding"
+    assert b"".join(chunks) == BODY
+
+@pytest.mark.asyncio
+async def test_streaming_response_is_compressed_per_chunk():
+    lines = [b'{"index": %d, "output_data": "%s"}\n' % (i, b"x" * 600) for i in range(5)]
+    headers, chunks = await call(make_app(lines, "application/x-ndjson"), minimum_size=1024)
+
+    assert headers["content-encoding"] == "gzip"
+    assert "content-length" not in headers
+    # 조각마다 flush하므로 도착한 조각만으로 지금까지의 내용을 복원할 수 있음
+    decompressor = zlib.decompressobj(16 + zlib.MAX_WBITS)
+    assert decompressor.decompress(chunks[0]) == b"".join(lines[:2])
+    assert decompressor.decompress(b"".join(chunks[1:])) == b"".join(lines[2:])
+
+@pytest.mark.asyncio
+async def test_short_stream_is_sent_as_is():
+    headers, chunks = await call(make_app([b"a\n", b"b\n"], "application/x-ndjson"))
+
+    assert "content-encoding" not in headers
+    assert b"".join(chunks) == b"a\nb\n"
+
+@pytest.mark.asyncio
+async def test_binary_media_type_is_not_touched():
+    headers, chunks = await call(make_app([BODY], "image/png"))
+
+    assert "content-encoding" not in headers
+    assert "vary" not in headers
+    assert b"".join(chunks) == BODY
+
+@pytest.mark.asyncio
+async def test_not_modified_is_not_touched():
+    headers, _ = await call(make_app([b""], status=304, headers={"ETag": '"v-1"'}))
+
+    assert "content-encoding" not in headers
+    assert headers["etag"] == '"v-1"'
+
+@pytest.mark.asyncio
+async def test_existing_vary_is_extended_and_etag_weakened():
+    headers, _ = await call(make_app([BODY], headers={"Vary": "Accept", "ETag": '"v-1"'}))
+
+    assert headers["vary"] == "Accept, Accept-Encoding"
+    assert headers["etag"] == 'W/"v-1"'
+
+@pytest.mark.asyncio
+async def test_disabled_middleware_passes_through():
+    headers, chunks = await call(make_app([BODY]), enabled=False)
+
+    assert "content-encoding" not in headers
+    assert "vary" not in headers
+    assert b"".join(chunks) == BODY
+
+@pytest.mark.parametrize("accept_encoding, expected", [
+    ("gzip", "gzip"),
+    ("br;q=0.5, gzip", "gzip"),
+    ("gzip;q=0, *", "br"),
+    ("identity", None),
+    ("*;q=0", None),
+    ("", None),
+])
+def test_select_encoding(accept_encoding, expected):
+    assert compression.select_encoding(accept_encoding, ["br", "gzip"]) == expected
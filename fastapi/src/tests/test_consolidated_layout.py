@@ -0,0 +1,112 @@
+'''
+consolidated 레이아웃에서 대화방을 찾는 순서(단일 컬렉션 → 사용자별 컬렉션 → 보관된 대화방 복원) 테스트입니다.
+'''
+import pytest
+
+from services import mongodb_client
+from utils import error_tools
+
+STORAGE_MODES = ["embedded", "bucket"]
+FUTURE_CUTOFF = "9999-12-31 00:00:00"
+
+def turn(number: int) -> dict:
+    return {"input_data": f"q{number}", "output_data": f"a{number}"}
+
+def consolidated(make_handler, storage: str = "embedded") -> mongodb_client.MongoDBHandler:
+    return make_handler(MONGO_CHAT_STORAGE=storage, MONGO_CHAT_BUCKET_SIZE=2, MONGO_CHAT_LAYOUT="consolidated")
+
+async def legacy_room(make_handler, storage: str, count: int) -> str:
+    handler = make_handler(MONGO_CHAT_STORAGE=storage, MONGO_CHAT_BUCKET_SIZE=2)
+    document_id = await handler.create_office_collection("user", "office")
+    for number in range(1, count + 1):
+        await handler.add_office_log("user", document_id, turn(number))
+    return document_id
+
+async def inputs(handler, document_id: str, user_id: str = "user") -> list:
+    return [item["input_data"] for item in await handler.get_offic_log(user_id, document_id, "office")]
+
+async def count_rooms(store, document_id: str) -> int:
+    return await (await store.logs()).count_documents(store.room(document_id))
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("storage", STORAGE_MODES)
+async def test_new_room_is_created_in_consolidated_collection(make_handler, storage):
+    handler = consolidated(make_handler, storage)
+
+    document_id = await handler.create_office_collection("user", "office")
+    await handler.add_office_log("user", document_id, turn(1))
+
+    assert await count_rooms(handler.consolidated_store("office", "user"), document_id) == 1
+    assert "office_log_user" not in await handler.db.list_collection_names()
+    assert await inputs(handler, document_id) == ["q1"]
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("storage", STORAGE_MODES)
+async def test_per_user_room_is_used_in_place(make_handler, storage):
+    document_id = await legacy_room(make_handler, storage, 2)
+    handler = consolidated(make_handler, storage)
+
+    assert await inputs(handler, document_id) == ["q1", "q2"]
+    await handler.add_office_log("user", document_id, turn(3))
+    await handler.update_office_log("user", document_id, {"input_data": "q3", "output_data": "edited"})
+    await handler.remove_log("user", document_id, 3, "office")
+
+    assert await inputs(handler, document_id) == ["q1", "q2"]
+    assert await handler.get_log_version("user", document_id, "office") == 5
+    # 옮기지 않은 대화방은 사용자별 컬렉션에 그대로 남음
+    assert await count_rooms(handler.per_user_store("office", "user"), document_id) == 1
+    assert await count_rooms(handler.consolidated_store("office", "user"), document_id) == 0
+
+    await handler.remove_collection("user", document_id, "office")
+    assert await count_rooms(handler.per_user_store("office", "user"), document_id) == 0
+    assert await (await handler.per_user_store("office", "user").buckets()).count_documents({}) == 0
+
+@pytest.mark.asyncio
+async def test_consolidated_room_takes_priority_over_per_user_copy(make_handler):
+    document_id = await legacy_room(make_handler, "embedded", 1)
+    handler = consolidated(make_handler)
+    # 옮기는 도중이라 두 저장소에 모두 있는 대화방
+    legacy = await (await handler.per_user_store("office", "user").logs()).find_one({"id": document_id}, {"_id": 0})
+    await (await handler.consolidated_store("office", "user").logs()).insert_one({**legacy, "user_id": "user", "value": []})
+
+    assert await inputs(handler, document_id) == []
+
+@pytest.mark.asyncio
+async def test_rooms_of_other_users_are_not_visible(make_handler):
+    handler = consolidated(make_handler)
+    document_id = await handler.create_office_collection("user", "office")
+    await handler.add_office_log("user", document_id, turn(1))
+
+    with pytest.raises(error_tools.NotFoundException):
+        await handler.get_log_version("other", document_id, "office")
+    assert await handler.get_room_summaries("other", [document_id], "office") == []
+    assert await inputs(handler, document_id) == ["q1"]
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("storage", STORAGE_MODES)
+async def test_archived_per_user_room_is_restored_into_consolidated_collection(make_handler, storage):
+    document_id = await legacy_room(make_handler, storage, 3)
+    await make_handler(MONGO_CHAT_STORAGE=storage, MONGO_CHAT_BUCKET_SIZE=2).archive_inactive_rooms("user", "office", FUTURE_CUTOFF)
+    handler = consolidated(make_handler, storage)
+
+    assert await inputs(handler, document_id) == ["q1", "q2", "q3"]
+
+    store = handler.consolidated_store("office", "user")
+    restored = await (await store.logs()).find_one(store.room(document_id))
+    assert restored["user_id"] == "user"
+    assert await count_rooms(handler.per_user_store("office", "user"), document_id) == 0
+    assert await handler.archive.find("office", "user", document_id) is None
+    await handler.add_office_log("user", document_id, turn(4))
+    assert await inputs(handler, document_id) == ["q1", "q2", "q3", "q4"]
+
+@pytest.mark.asyncio
+async def test_removing_archived_room_does_not_restore_it(make_handler):
+    document_id = await legacy_room(make_handler, "embedded", 1)
+    handler = consolidated(make_handler)
+    await handler.archive_inactive_rooms("user", "office", FUTURE_CUTOFF)
+
+    await handler.remove_collection("user", document_id, "office")
+
+    assert handler.archive.restores == 0
+    assert await handler.archive.find("office", "user", document_id) is None
+    assert await count_rooms(handler.consolidated_store("office", "user"), document_id) == 0
@@ -0,0 +1,166 @@
+'''
+Idempotency-Key 처리(IdempotencyStore, IdempotentRoute)의 재사용 응답과 충돌 테스트입니다.
+'''
+import asyncio
+import types
+
+import httpx
+import pytest
+from fastapi import APIRouter, FastAPI
+from fastapi.testclient import TestClient
+
+from core import app_state, routing
+from services import cache_backends, idempotency
+from utils import error_tools
+
+def make_store(**kwargs) -> idempotency.IdempotencyStore:
+    return idempotency.IdempotencyStore(cache_backends.MemoryCacheBackend(1024 * 1024), **kwargs)
+
+@pytest.mark.asyncio
+async def test_completed_request_is_replayed():
+    store = make_store()
+    assert await store.begin("POST:/rooms:key", "hash") is None
+    await store.complete("POST:/rooms:key", "hash", 201, "application/json", b'{"id":"room"}', [("ETag", 'W/"v-1"')])
+
+    stored = await store.begin("POST:/rooms:key", "hash")
+
+    assert stored["status_code"] == 201
+    assert store.decode_body(stored) == b'{"id":"room"}'
+    assert stored["headers"] == [["ETag", 'W/"v-1"']]
+    assert store.replays == 1
+
+@pytest.mark.asyncio
+async def test_different_body_with_same_key_is_rejected():
+    store = make_store()
+    await store.begin("POST:/rooms:key", "hash")
+
+    with pytest.raises(error_tools.ValueErrorException):
+        await store.begin("POST:/rooms:key", "other-hash")
+
+@pytest.mark.asyncio
+async def test_pending_request_conflicts_after_wait_timeout():
+    store = make_store(wait_timeout=0.05, poll_interval=0.01)
+    await store.begin("POST:/rooms:key", "hash")
+
+    with pytest.raises(error_tools.ConflictException):
+        await store.begin("POST:/rooms:key", "hash")
+    assert store.conflicts == 1
+
+@pytest.mark.asyncio
+async def test_pending_request_waits_for_result():
+    store = make_store(wait_timeout=1, poll_interval=0.01)
+    await store.begin("POST:/rooms:key", "hash")
+
+    waiter = asyncio.create_task(store.begin("POST:/rooms:key", "hash"))
+    await asyncio.sleep(0.03)
+    await store.complete("POST:/rooms:key", "hash", 200, "application/json", b"{}")
+
+    assert (await waiter)["status_code"] == 200
+
+@pytest.mark.asyncio
+async def test_released_request_can_be_processed_again():
+    store = make_store()
+    await store.begin("POST:/rooms:key", "hash")
+    await store.release("POST:/rooms:key")
+
+    assert await store.begin("POST:/rooms:key", "hash") is None
+
+@pytest.fixture
+def client(monkeypatch):
+    '''
+    IdempotentRoute를 사용하는 앱의 클라이언트와 엔드포인트가 받은 요청 목록을 반환합니다.
+    '''
+    store = make_store(wait_timeout=0.05, poll_interval=0.01)
+    monkeypatch.setattr(app_state, "mongo_handler", types.SimpleNamespace(idempotency=store))
+
+    calls = []
+    router = APIRouter(route_class=routing.IdempotentRoute)
+
+    @router.post("/rooms", status_code=201)
+    async def create_room(body: dict):
+        calls.append(body)
+        return {"id": f"room-{len(calls)}"}
+
+    app = FastAPI()
+    app.include_router(router)
+    with TestClient(app) as test_client:
+        yield test_client, calls
+
+def test_route_replays_retried_request(client):
+    test_client, calls = client
+    headers = {"Idempotency-Key": "retry-1"}
+
+    first = test_client.post("/rooms", json={"name": "a"}, headers=headers)
+    second = test_client.post("/rooms", json={"name": "a"}, headers=headers)
+
+    assert first.status_code == second.status_code == 201
+    assert second.json() == first.json() == {"id": "room-1"}
+    assert second.headers["idempotency-replayed"] == "true"
+    assert "idempotency-replayed" not in first.headers
+    assert len(calls) == 1
+
+def test_route_rejects_reused_key_with_different_body(client):
+    test_client, calls = client
+    headers = {"Idempotency-Key": "retry-1"}
+
+    test_client.post("/rooms", json={"name": "a"}, headers=headers)
+    response = test_client.post("/rooms", json={"name": "b"}, headers=headers)
+
+    assert response.status_code == 422
+    assert len(calls) == 1
+
+def test_route_treats_other_representation_as_different_request(client):
+    test_client, _ = client
+    headers = {"Idempotency-Key": "retry-1"}
+
+    test_client.post("/rooms", json={"name": "a"}, headers=headers)
+    response = test_client.post("/rooms", json={"name": "a"}, headers={**headers, "Prefer": "return=minimal"})
+
+    assert response.status_code == 422
+
+@pytest.mark.asyncio
+async def test_route_conflicts_while_first_request_is_pending(monkeypatch):
+    store = make_store(wait_timeout=0.05, poll_interval=0.01)
+    monkeypatch.setattr(app_state, "mongo_handler", types.SimpleNamespace(idempotency=store))
+    started, release = asyncio.Event(), asyncio.Event()
+    router = APIRouter(route_class=routing.IdempotentRoute)
+
+    @router.post("/rooms")
+    async def create_room(body: dict):
+        started.set()
+        await release.wait()
+        return {"id": "room"}
+
+    app = FastAPI()
+    app.include_router(router)
+    headers = {"Idempotency-Key": "retry-1"}
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test") as http:
+        first = asyncio.create_task(http.post("/rooms", json={"name": "a"}, headers=headers))
+        await started.wait()
+
+        retried = await http.post("/rooms", json={"name": "a"}, headers=headers)
+        release.set()
+
+        assert retried.status_code == 409
+        assert (await first).status_code == 200
+        # 처리가 끝난 뒤의 재시도는 저장된 응답을 받음
+        replayed = await http.post("/rooms", json={"name": "a"}, headers=headers)
+        assert replayed.headers["idempotency-replayed"] == "true"
+
+def test_route_without_key_is_not_deduplicated(client):
+    test_client, calls = client
+
+    test_client.post("/rooms", json={"name": "a"})
+    test_client.post("/rooms", json={"name": "a"})
+
+    assert len(calls) == 2
+
+def test_memory_backend_is_single_worker_opt_in(make_handler, caplog):
+    handler = make_handler(CACHE_BACKEND="memory", IDEMPOTENCY_TTL="", MONGO_CHAT_CACHE_TTL="")
+    assert not handler.idempotency.enabled
+    assert handler.log_cache.ttl == 0
+
+    with caplog.at_level("WARNING"):
+        handler = make_handler(CACHE_BACKEND="memory", IDEMPOTENCY_TTL="600")
+    assert handler.idempotency.ttl == 600
+    assert "IDEMPOTENCY_TTL=600" in caplog.text
@@ -0,0 +1,85 @@
+'''
+사용자별 컬렉션의 대화방을 단일 컬렉션으로 옮기는 mongo_migrations.move_room의 동시 쓰기 처리 테스트입니다.
+'''
+import asyncio
+
+import pytest
+
+from services import mongo_migrations
+
+def turn(number: int, output: str = None) -> dict:
+    return {"input_data": f"q{number}", "output_data": output or f"a{number}"}
+
+async def make_legacy_room(make_handler, storage: str, count: int):
+    '''
+    사용자별 컬렉션에 대화방을 만들고 (consolidated 레이아웃 핸들러, 원본 저장소, 대상 저장소, 문서 ID)를 반환합니다.
+    '''
+    legacy_handler = make_handler(MONGO_CHAT_STORAGE=storage, MONGO_CHAT_BUCKET_SIZE=2)
+    document_id = await legacy_handler.create_office_collection("user", "office")
+    await legacy_handler._append_turns("office", "user", document_id, [turn(number) for number in range(1, count + 1)])
+    handler = make_handler(MONGO_CHAT_STORAGE=storage, MONGO_CHAT_BUCKET_SIZE=2, MONGO_CHAT_LAYOUT="consolidated")
+    return handler, handler.per_user_store("office", "user"), handler.consolidated_store("office", "user"), document_id
+
+async def legacy_id(store, document_id: str):
+    return (await (await store.logs()).find_one({"id": document_id}))["_id"]
+
+async def bucket_indexes(store, document_id: str) -> list:
+    buckets = await store.buckets()
+    return [turn["index"] async for bucket in buckets.find(store.room(document_id)).sort("bucket", 1) for turn in bucket["value"]]
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("storage", ["embedded", "bucket"])
+async def test_move_room_copies_room_and_removes_original(make_handler, storage):
+    handler, legacy, target, document_id = await make_legacy_room(make_handler, storage, 3)
+
+    assert await mongo_migrations.move_room(legacy, target, await legacy_id(legacy, document_id)) == "migrated"
+
+    assert await (await legacy.logs()).find_one({"id": document_id}) is None
+    assert await (await legacy.buckets()).count_documents({}) == 0
+    copied = await (await target.logs()).find_one(target.room(document_id))
+    assert copied["user_id"] == "user"
+    assert [item["index"] for item in await handler.get_offic_log("user", document_id, "office")] == [1, 2, 3]
+
+@pytest.mark.asyncio
+async def test_move_room_waits_for_reserved_bucket_write(make_handler):
+    handler, legacy, target, document_id = await make_legacy_room(make_handler, "bucket", 2)
+    original_id = await legacy_id(legacy, document_id)
+    # 다른 요청이 헤더에서 3번 인덱스를 예약하고 아직 버킷에 쓰지 않은 상태
+    await (await legacy.logs()).update_one({"_id": original_id}, {"$inc": {"seq": 1, "version": 1}})
+
+    async def finish_append():
+        await asyncio.sleep(0.03)
+        await (await legacy.buckets()).update_one(
+            legacy.bucket(document_id, 1), {"$push": {"value": {"index": 3, **turn(3)}}}, upsert=True
+        )
+
+    pending = asyncio.create_task(finish_append())
+    result = await mongo_migrations.move_room(legacy, target, original_id, max_attempts=10, retry_delay=0.01)
+    await pending
+
+    assert result == "migrated"
+    assert await bucket_indexes(target, document_id) == [1, 2, 3]
+    assert await (await legacy.buckets()).count_documents({}) == 0
+
+@pytest.mark.asyncio
+async def test_move_room_recopies_bucket_changed_after_copy(make_handler, monkeypatch):
+    handler, legacy, target, document_id = await make_legacy_room(make_handler, "bucket", 2)
+    target_logs = await target.logs()
+    replace_one = type(target_logs).replace_one
+    edited = []
+
+    async def replace_then_edit(self, *args, **kwargs):
+        result = await replace_one(self, *args, **kwargs)
+        if not edited:
+            # 복사한 직후 원본의 최신 대화가 수정됨 (헤더의 'version'은 아직 그대로)
+            edited.append(True)
+            await (await legacy.buckets()).update_one(
+                legacy.bucket(document_id, 0, **{"value.index": 2}), {"$set": {"value.$.output_data": "edited"}}
+            )
+        return result
+
+    monkeypatch.setattr(type(target_logs), "replace_one", replace_then_edit)
+    result = await mongo_migrations.move_room(legacy, target, await legacy_id(legacy, document_id), retry_delay=0)
+
+    assert result == "migrated"
+    assert [item["output_data"] for item in await handler.get_offic_log("user", document_id, "office")] == ["a1", "edited"]
@@ -0,0 +1,90 @@
+'''
+채팅 로그 조회의 조건부 요청(ETag, If-None-Match) 테스트입니다.
+'''
+import httpx
+import pytest
+from fastapi import FastAPI
+
+from api.mongo_controller import office_controller
+from core import app_state, responses
+from utils import error_tools
+
+@pytest.fixture
+def office(make_handler, monkeypatch):
+    '''
+    office 라우터 앱의 비동기 클라이언트를 만드는 함수와 MongoDBHandler를 반환합니다.
+    '''
+    handler = make_handler(MONGO_CHAT_STORAGE="bucket", MONGO_CHAT_BUCKET_SIZE=2)
+    monkeypatch.setattr(app_state, "mongo_handler", handler)
+    app = FastAPI()
+    app.include_router(office_controller.office_router)
+
+    def client() -> httpx.AsyncClient:
+        return httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test")
+
+    return client, handler
+
+async def make_room(handler, count: int) -> str:
+    document_id = await handler.create_office_collection("user", "office")
+    for number in range(1, count + 1):
+        await handler.add_office_log("user", document_id, {"input_data": f"q{number}", "output_data": f"a{number}"})
+    return document_id
+
+@pytest.mark.asyncio
+async def test_unchanged_room_returns_not_modified(office):
+    client, handler = office
+    document_id = await make_room(handler, 2)
+    url = f"/users/user/documents/{document_id}"
+
+    async with client() as http:
+        first = await http.get(url)
+        etag = first.headers["etag"]
+        revalidated = await http.get(url, headers={"If-None-Match": etag})
+
+        assert first.status_code == 200
+        assert revalidated.status_code == 304
+        assert revalidated.content == b""
+        assert revalidated.headers["etag"] == etag
+
+        await handler.add_office_log("user", document_id, {"input_data": "q3", "output_data": "a3"})
+        changed = await http.get(url, headers={"If-None-Match": etag})
+
+    assert changed.status_code == 200
+    assert changed.headers["etag"] != etag
+    assert [item["index"] for item in changed.json()["value"]] == [1, 2, 3]
+
+@pytest.mark.asyncio
+async def test_etag_varies_by_window_and_representation(office):
+    client, handler = office
+    document_id = await make_room(handler, 3)
+    url = f"/users/user/documents/{document_id}"
+
+    async with client() as http:
+        full = await http.get(url)
+        last = await http.get(url, params={"last": 1})
+        minimal = await http.get(url, headers={"Prefer": responses.MINIMAL_PREFERENCE})
+        msgpack = await http.get(url, headers={"Accept": responses.MSGPACK_MEDIA_TYPES[0]})
+        etags = [response.headers["etag"] for response in (full, last, minimal, msgpack)]
+        # 다른 구간이나 표현의 ETag로는 304를 받지 않음
+        other_window = await http.get(url, params={"last": 1}, headers={"If-None-Match": full.headers["etag"]})
+        other_representation = await http.get(
+            url, headers={"If-None-Match": full.headers["etag"], "Accept": responses.MSGPACK_MEDIA_TYPES[0]}
+        )
+        same_window = await http.get(url, params={"last": 1}, headers={"If-None-Match": last.headers["etag"]})
+
+    assert len(set(etags)) == 4
+    assert all(etag.startswith('W/"3-') for etag in etags)
+    assert other_window.status_code == 200
+    assert other_representation.status_code == 200
+    assert same_window.status_code == 304
+
+@pytest.mark.asyncio
+async def test_conditional_request_for_missing_room_returns_not_found(office):
+    client, handler = office
+
+    with pytest.raises(error_tools.NotFoundException):
+        await handler.get_log_version("user", "missing", "office")
+    async with client() as http:
+        response = await http.get("/users/user/documents/missing", headers={"If-None-Match": 'W/"1-abc"'})
+
+    assert response.status_code == 404
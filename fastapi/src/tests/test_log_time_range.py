@@ -0,0 +1,79 @@
+'''
+since/until 시간 범위 조회 테스트입니다.
+BSON datetime과 아직 변환하지 않은 기존 문자열 timestamp(MONGO_LEGACY_TIMEZONE 기준)가 섞인 대화방을 사용합니다.
+'''
+import datetime
+
+import pytest
+
+STORAGE_MODES = ["embedded", "bucket"]
+KST = datetime.timezone(datetime.timedelta(hours=9))
+
+def utc(hour: int, minute: int = 0) -> datetime.datetime:
+    return datetime.datetime(2024, 1, 1, hour, minute, tzinfo=datetime.timezone.utc)
+
+# (인덱스, 저장된 timestamp): 문자열은 +0900 기준이므로 1번은 00:00Z, 3번은 02:00Z
+TURNS = [
+    (1, "2024-01-01 09:00:00"),
+    (2, utc(1).replace(tzinfo=None)),
+    (3, "2024-01-01 11:00:00"),
+    (4, utc(3).replace(tzinfo=None)),
+    (5, "not a timestamp"),
+]
+
+RANGES = [
+    ({"since": utc(1), "until": utc(3)}, [2, 3]),
+    ({"since": utc(0, 30)}, [2, 3, 4]),
+    ({"until": utc(1)}, [1]),
+    ({"since": utc(0), "until": utc(0)}, []),
+    ({"since": datetime.datetime(2024, 1, 1, 11, 0, tzinfo=KST)}, [3, 4]),
+    ({"since": utc(0), "last": 1}, [4]),
+    ({"since": utc(0), "after_index": 1, "before_index": 4}, [2, 3]),
+]
+
+async def mixed_room(make_handler, storage: str, **env):
+    handler = make_handler(MONGO_CHAT_STORAGE=storage, MONGO_CHAT_BUCKET_SIZE=2, MONGO_LEGACY_TIMEZONE="+0900", **env)
+    document_id = await handler.create_office_collection("user", "office")
+    store = handler.per_user_store("office", "user")
+    turns = [{"index": index, "input_data": f"q{index}", "output_data": f"a{index}", "timestamp": timestamp} for index, timestamp in TURNS]
+    if storage == "bucket":
+        for bucket_no in range(3):
+            items = [item for item in turns if handler._bucket_no(item["index"]) == bucket_no]
+            await (await store.buckets()).insert_one(store.bucket(document_id, bucket_no, value=items))
+        await (await store.logs()).update_one(store.room(document_id), {"$set": {"seq": len(turns), "version": len(turns)}})
+    else:
+        await (await store.logs()).update_one(store.room(document_id), {"$set": {"value": turns, "version": len(turns)}})
+    return handler, document_id
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("storage", STORAGE_MODES)
+@pytest.mark.parametrize("window, expected", RANGES)
+async def test_time_range_over_mixed_timestamps(make_handler, storage, window, expected):
+    handler, document_id = await mixed_room(make_handler, storage)
+
+    value = await handler.get_offic_log("user", document_id, "office", **window)
+
+    assert [item["index"] for item in value] == expected
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("storage", STORAGE_MODES)
+@pytest.mark.parametrize("window, expected", RANGES)
+async def test_time_range_with_cached_log_matches_database(make_handler, storage, window, expected):
+    handler, document_id = await mixed_room(make_handler, storage, CACHE_BACKEND="memory", MONGO_CHAT_CACHE_TTL=60)
+    await handler.get_offic_log("user", document_id, "office")
+
+    value = await handler.get_offic_log("user", document_id, "office", **window)
+
+    assert [item["index"] for item in value] == expected
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("storage", STORAGE_MODES)
+async def test_legacy_timestamps_are_returned_unchanged(make_handler, storage):
+    handler, document_id = await mixed_room(make_handler, storage)
+
+    value = await handler.get_offic_log("user", document_id, "office")
+
+    assert [item["timestamp"] for item in value if item["index"] in (1, 3, 5)] == [
+        "2024-01-01 09:00:00", "2024-01-01 11:00:00", "not a timestamp"
+    ]
+    assert value[1]["timestamp"] == handler.render_timestamp(utc(1))
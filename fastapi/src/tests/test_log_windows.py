@@ -0,0 +1,68 @@
+'''
+대화 구간 조회(last, before_index, after_index)의 저장 방식별(embedded, bucket) 동작 테스트입니다.
+MongoDB 프로젝션으로 자른 결과와 캐시된 전체 대화를 메모리에서 자른 결과가 같은지도 확인합니다.
+'''
+import pytest
+
+STORAGE_MODES = ["embedded", "bucket"]
+
+WINDOWS = [
+    ({"last": 3}, [8, 9, 10]),
+    ({"last": 20}, list(range(1, 11))),
+    ({"before_index": 4}, [1, 2, 3]),
+    ({"after_index": 7}, [8, 9, 10]),
+    ({"after_index": 2, "before_index": 6}, [3, 4, 5]),
+    ({"last": 2, "before_index": 6}, [4, 5]),
+    ({"last": 2, "after_index": 2, "before_index": 9}, [7, 8]),
+    ({"before_index": 20}, list(range(1, 11))),
+    ({"after_index": 10}, []),
+    ({"after_index": 5, "before_index": 5}, []),
+]
+
+def turn(number: int) -> dict:
+    return {"input_data": f"q{number}", "output_data": f"a{number}"}
+
+async def create_room(handler) -> str:
+    document_id = await handler.create_office_collection("user", "office")
+    await handler._append_turns("office", "user", document_id, [turn(number) for number in range(1, 11)])
+    return document_id
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("storage", STORAGE_MODES)
+@pytest.mark.parametrize("window, expected", WINDOWS)
+async def test_window_reads_only_requested_turns(make_handler, storage, window, expected):
+    handler = make_handler(MONGO_CHAT_STORAGE=storage, MONGO_CHAT_BUCKET_SIZE=3)
+    document_id = await create_room(handler)
+
+    value = await handler.get_offic_log("user", document_id, "office", **window)
+
+    assert [item["index"] for item in value] == expected
+    assert [item["input_data"] for item in value] == [f"q{number}" for number in expected]
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("storage", STORAGE_MODES)
+@pytest.mark.parametrize("window, expected", WINDOWS)
+async def test_window_from_cached_log_matches_database(make_handler, storage, window, expected):
+    handler = make_handler(MONGO_CHAT_STORAGE=storage, MONGO_CHAT_BUCKET_SIZE=3, CACHE_BACKEND="memory", MONGO_CHAT_CACHE_TTL=60)
+    document_id = await create_room(handler)
+    await handler.get_offic_log("user", document_id, "office")
+    # 캐시된 대화를 사용하는지 확인하기 위해 MongoDB의 대화방을 지움
+    store = handler.per_user_store("office", "user")
+    await (await store.logs()).delete_many({})
+    await (await store.buckets()).delete_many({})
+
+    value = await handler.get_offic_log("user", document_id, "office", **window)
+
+    assert [item["index"] for item in value] == expected
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("storage", STORAGE_MODES)
+async def test_window_keeps_room_version(make_handler, storage):
+    handler = make_handler(MONGO_CHAT_STORAGE=storage, MONGO_CHAT_BUCKET_SIZE=3)
+    document_id = await create_room(handler)
+    await handler._append_turns("office", "user", document_id, [turn(11)])
+
+    value, version = await handler.get_offic_log("user", document_id, "office", last=2, with_version=True)
+
+    assert [item["index"] for item in value] == [10, 11]
+    assert version == 2
@@ -0,0 +1,59 @@
+'''
+mongo_export 모듈의 NDJSON 인코딩과 조각 단위 전송 테스트입니다.
+'''
+import json
+import datetime
+
+import pytest
+
+from services import mongo_export
+
+class FakeHandler:
+    '''
+    iter_user_log만 구현한 MongoDBHandler 대역입니다.
+    '''
+    def __init__(self, rows):
+        self.rows = rows
+        self.routers = None
+
+    async def iter_user_log(self, user_id, routers):
+        self.routers = routers
+        for row in self.rows:
+            yield row
+
+async def collect(handler, routers=mongo_export.ROUTERS):
+    return [chunk async for chunk in mongo_export.iter_ndjson(handler, "user", routers)]
+
+@pytest.mark.asyncio
+async def test_one_turn_per_line():
+    rows = [
+        {"router": "office", "document_id": "room", "index": 1, "input_data": "안녕", "timestamp": datetime.datetime(2025, 1, 1)},
+        {"router": "chatbot", "document_id": "room", "character_idx": 3, "index": 1, "input_data": "hi"},
+    ]
+
+    chunks = await collect(FakeHandler(rows))
+
+    lines = b"".join(chunks).decode("utf-8").splitlines()
+    assert [json.loads(line)["router"] for line in lines] == ["office", "chatbot"]
+    # 한글은 이스케이프하지 않고, datetime은 문자열로 기록
+    assert "안녕" in lines[0]
+    assert json.loads(lines[0])["timestamp"] == "2025-01-01 00:00:00"
+
+@pytest.mark.asyncio
+async def test_turns_are_sent_in_chunks():
+    rows = [{"index": i, "output_data": "x" * 1000} for i in range(200)]
+
+    chunks = await collect(FakeHandler(rows))
+
+    assert len(chunks) > 1
+    assert all(len(chunk) >= mongo_export.CHUNK_SIZE for chunk in chunks[:-1])
+    # 조각은 줄 단위로 끝나므로 조각마다 바로 해석할 수 있음
+    assert all(chunk.endswith(b"\n") for chunk in chunks)
+    assert sum(chunk.count(b"\n") for chunk in chunks) == len(rows)
+
+@pytest.mark.asyncio
+async def test_empty_history_sends_nothing():
+    handler = FakeHandler([])
+
+    assert await collect(handler, ("office",)) == []
+    assert handler.routers == ("office",)
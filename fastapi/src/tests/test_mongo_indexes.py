@@ -0,0 +1,53 @@
+'''
+IndexManager.ensure의 인덱스 생성 결과 캐시 테스트입니다.
+'''
+import pytest
+from pymongo.errors import AutoReconnect, OperationFailure
+
+from services import mongo_indexes
+
+class FakeCollection:
+    '''
+    create_indexes 호출 횟수를 세고, 지정한 오류를 차례로 발생시키는 컬렉션 대역입니다.
+    '''
+    def __init__(self, *errors):
+        self.name = "office_log_user"
+        self.errors = list(errors)
+        self.calls = 0
+
+    async def create_indexes(self, models):
+        self.calls += 1
+        if self.errors:
+            raise self.errors.pop(0)
+
+@pytest.mark.asyncio
+async def test_successful_creation_is_cached():
+    manager = mongo_indexes.IndexManager(db=None)
+    collection = FakeCollection()
+
+    await manager.ensure(collection)
+    await manager.ensure(collection)
+
+    assert collection.calls == 1
+
+@pytest.mark.asyncio
+async def test_transient_failure_is_retried():
+    manager = mongo_indexes.IndexManager(db=None)
+    collection = FakeCollection(AutoReconnect("connection reset"), OperationFailure("not primary", code=10107))
+
+    await manager.ensure(collection)
+    await manager.ensure(collection)
+    await manager.ensure(collection)
+    await manager.ensure(collection)
+
+    assert collection.calls == 3
+
+@pytest.mark.asyncio
+async def test_duplicate_key_failure_is_not_retried():
+    manager = mongo_indexes.IndexManager(db=None)
+    collection = FakeCollection(OperationFailure("E11000 duplicate key error", code=11000))
+
+    await manager.ensure(collection)
+    await manager.ensure(collection)
+
+    assert collection.calls == 1
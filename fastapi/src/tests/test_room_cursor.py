@@ -0,0 +1,44 @@
+'''
+대화방 목록 키셋 페이지네이션의 커서와 정렬 키 테스트입니다.
+'''
+import base64
+import json
+
+import pytest
+
+from services.mongodb_client import MongoDBHandler
+
+@pytest.mark.parametrize("updated_at, document_id", [
+    ("2025-01-01 09:00:00", "room-1"),
+    (None, "legacy-room"),
+])
+def test_room_cursor_round_trip(updated_at, document_id):
+    cursor = MongoDBHandler.encode_room_cursor(updated_at, document_id)
+
+    assert MongoDBHandler.decode_room_cursor(cursor) == (updated_at, document_id)
+
+def _raw_cursor(value) -> str:
+    return base64.urlsafe_b64encode(json.dumps(value).encode("utf-8")).decode("ascii")
+
+@pytest.mark.parametrize("cursor", [
+    "not-a-cursor",
+    _raw_cursor(["2025-01-01 09:00:00"]),
+    _raw_cursor(["2025-01-01 09:00:00", 1]),
+    _raw_cursor([123, "room"]),
+])
+def test_invalid_room_cursor(cursor):
+    with pytest.raises(ValueError):
+        MongoDBHandler.decode_room_cursor(cursor)
+
+def test_room_sort_key_matches_newest_first_order():
+    rooms = [
+        {"id": "a", "updated_at": "2025-01-01 09:00:00"},
+        {"id": "legacy"},
+        {"id": "c", "updated_at": "2025-01-02 09:00:00"},
+        {"id": "b", "updated_at": "2025-01-01 09:00:00"},
+    ]
+
+    ordered = sorted(rooms, key=MongoDBHandler._room_sort_key, reverse=True)
+
+    # updated_at 내림차순, 같으면 id 내림차순, updated_at이 없는 대화방은 마지막
+    assert [room["id"] for room in ordered] == ["c", "b", "a", "legacy"]
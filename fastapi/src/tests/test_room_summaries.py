@@ -0,0 +1,83 @@
+'''
+여러 대화방의 요약을 한 번에 계산하는 get_room_summaries의 저장 방식별, 레이아웃별 동작 테스트입니다.
+'''
+import pytest
+
+FUTURE_CUTOFF = "9999-12-31 00:00:00"
+
+def turn(number: int) -> dict:
+    return {"input_data": f"질문{number}", "output_data": f"a{number}"}
+
+async def create_room(handler, count: int) -> str:
+    document_id = await handler.create_office_collection("user", "office")
+    if count:
+        await handler._append_turns("office", "user", document_id, [handler._build_turn(turn(number)) for number in range(1, count + 1)])
+    return document_id
+
+async def expected_summary(handler, document_id: str) -> dict:
+    value = await handler.get_offic_log("user", document_id, "office")
+    return {
+        "id": document_id,
+        "title": value[0]["input_data"] if value else "",
+        "last_timestamp": value[-1]["timestamp"] if value else None,
+        "turn_count": len(value),
+    }
+
+def without_character(summaries: list) -> list:
+    return [{key: value for key, value in summary.items() if key != "character_idx"} for summary in summaries]
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("layout", ["per_user", "consolidated"])
+async def test_summaries_across_storage_modes(make_handler, layout):
+    embedded = make_handler(MONGO_CHAT_STORAGE="embedded", MONGO_CHAT_LAYOUT=layout)
+    bucket = make_handler(MONGO_CHAT_STORAGE="bucket", MONGO_CHAT_BUCKET_SIZE=2, MONGO_CHAT_LAYOUT=layout)
+    embedded_id = await create_room(embedded, 3)
+    bucket_id = await create_room(bucket, 5)
+    empty_id = await create_room(bucket, 0)
+    # 다른 사용자의 같은 문서 ID 버킷은 조인되지 않아야 함
+    other = bucket._stores("office", "other")[0]
+    await (await other.buckets()).insert_one(other.bucket(bucket_id, 0, value=[{"index": 1, "input_data": "other"}]))
+
+    summaries = await bucket.get_room_summaries("user", [bucket_id, "missing", empty_id, embedded_id], "office")
+
+    assert without_character(summaries) == [
+        await expected_summary(bucket, bucket_id),
+        await expected_summary(bucket, empty_id),
+        await expected_summary(bucket, embedded_id),
+    ]
+    assert [summary["turn_count"] for summary in summaries] == [5, 0, 3]
+    assert summaries[0]["title"] == "질문1"
+
+@pytest.mark.asyncio
+async def test_summary_title_is_cut_by_characters(make_handler):
+    handler = make_handler()
+    document_id = await handler.create_office_collection("user", "office")
+    await handler._append_turns("office", "user", document_id, [handler._build_turn({"input_data": "안녕하세요 반갑습니다", "output_data": "a"})])
+
+    summaries = await handler.get_room_summaries("user", [document_id], "office", preview_length=5)
+
+    assert summaries[0]["title"] == "안녕하세요"
+
+@pytest.mark.asyncio
+async def test_summaries_include_per_user_rooms_during_layout_migration(make_handler):
+    legacy_id = await create_room(make_handler(MONGO_CHAT_LAYOUT="per_user"), 2)
+    handler = make_handler(MONGO_CHAT_LAYOUT="consolidated")
+    new_id = await create_room(handler, 1)
+
+    summaries = await handler.get_room_summaries("user", [legacy_id, new_id], "office")
+
+    assert [(summary["id"], summary["turn_count"]) for summary in summaries] == [(legacy_id, 2), (new_id, 1)]
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("storage", ["embedded", "bucket"])
+async def test_summary_of_archived_room_does_not_restore_it(make_handler, storage):
+    handler = make_handler(MONGO_CHAT_STORAGE=storage, MONGO_CHAT_BUCKET_SIZE=2)
+    document_id = await create_room(handler, 3)
+    expected = await expected_summary(handler, document_id)
+    await handler.archive_inactive_rooms("user", "office", FUTURE_CUTOFF)
+
+    summaries = await handler.get_room_summaries("user", [document_id], "office")
+
+    assert without_character(summaries) == [expected]
+    assert handler.archive.restores == 0
+    assert await (await handler.per_user_store("office", "user").logs()).count_documents({"id": document_id}) == 0
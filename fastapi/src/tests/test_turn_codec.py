@@ -0,0 +1,62 @@
+'''
+turn_codec 모듈의 대화 본문 압축/복원 테스트입니다.
+'''
+import pytest
+from bson import Binary
+
+from services import turn_codec
+
+LONG_TEXT = "요청하신 내용을 바탕으로 초안을 작성해 보았습니다. " * 200
+
+def make_turn(output_data: str) -> dict:
+    return {"index": 1, "input_data": "질문", "output_data": output_data}
+
+@pytest.mark.parametrize("algorithm", ["zlib", "zstd"])
+def test_large_output_round_trips(algorithm):
+    if algorithm == "zstd":
+        pytest.importorskip("zstandard")
+    codec = turn_codec.TurnCodec(algorithm, min_bytes=1024)
+
+    encoded = codec.encode(make_turn(LONG_TEXT))
+
+    assert isinstance(encoded["output_data"], Binary)
+    assert len(encoded["output_data"]) < len(LONG_TEXT.encode("utf-8"))
+    assert encoded["compressed"] == {"output_data": algorithm}
+    assert encoded["input_data"] == "질문"
+    assert codec.decode(encoded) == make_turn(LONG_TEXT)
+
+def test_encode_does_not_modify_the_original_turn():
+    codec = turn_codec.TurnCodec("zlib", min_bytes=1024)
+    turn = make_turn(LONG_TEXT)
+
+    codec.encode(turn)
+
+    assert turn == make_turn(LONG_TEXT)
+
+def test_small_output_is_stored_as_text():
+    codec = turn_codec.TurnCodec("zlib", min_bytes=1024)
+    turn = make_turn("짧은 답변")
+
+    assert not codec.needs_compression(turn)
+    assert codec.encode(turn) is turn
+
+def test_output_that_does_not_shrink_is_stored_as_text():
+    # 짧은 본문은 압축 헤더 때문에 오히려 커짐
+    codec = turn_codec.TurnCodec("zlib", min_bytes=1)
+
+    encoded = codec.encode(make_turn("네"))
+
+    assert encoded["output_data"] == "네"
+    assert "compressed" not in encoded
+
+def test_disabled_codec_still_decodes_stored_turns():
+    stored = turn_codec.TurnCodec("zlib", min_bytes=1024).encode(make_turn(LONG_TEXT))
+    codec = turn_codec.TurnCodec("off")
+
+    assert not codec.enabled
+    assert codec.encode(make_turn(LONG_TEXT))["output_data"] == LONG_TEXT
+    assert codec.decode(stored)["output_data"] == LONG_TEXT
+
+def test_unknown_algorithm():
+    with pytest.raises(ValueError):
+        turn_codec.TurnCodec("lz4")
@@ -0,0 +1,121 @@
+'''
+write_buffer 모듈의 묶음 쓰기와 durability 설정 테스트입니다.
+'''
+import asyncio
+from typing import Dict, List
+
+import pytest
+
+from services import write_buffer
+
+ROOM = ("office", "user", "room")
+OTHER_ROOM = ("office", "user", "other")
+
+class FakeStore:
+    '''
+    대화방마다 쓴 대화 턴을 기록하고 이어지는 인덱스를 돌려주는 flush_fn입니다.
+    '''
+    def __init__(self, fail: bool = False) -> None:
+        self.fail = fail
+        self.writes: List[List[Dict]] = []
+        self.rooms: Dict[tuple, List[Dict]] = {}
+
+    async def flush(self, key, turns: List[Dict]) -> int:
+        await asyncio.sleep(0)
+        if self.fail:
+            raise RuntimeError("write failed")
+        self.writes.append(turns)
+        room = self.rooms.setdefault(key, [])
+        first_index = len(room) + 1
+        room.extend(turns)
+        return first_index
+
+@pytest.mark.asyncio
+async def test_flush_durability_waits_for_write():
+    store = FakeStore()
+    buffer = write_buffer.WriteBehindBuffer(store.flush, enabled=True, interval=60, max_turns=10)
+
+    futures = [buffer.add(ROOM, {"input_data": str(i)}) for i in range(3)]
+    assert not any(future.done() for future in futures)
+
+    await buffer.flush_all()
+
+    assert [await future for future in futures] == [1, 2, 3]
+    assert len(store.writes) == 1
+    assert buffer.stats()["writes_saved"] == 2
+
+@pytest.mark.asyncio
+async def test_rooms_are_written_separately():
+    store = FakeStore()
+    buffer = write_buffer.WriteBehindBuffer(store.flush, enabled=True, interval=60)
+
+    first = buffer.add(ROOM, {"input_data": "a"})
+    second = buffer.add(OTHER_ROOM, {"input_data": "b"})
+    await buffer.flush_all()
+
+    assert (await first, await second) == (1, 1)
+    assert buffer.stats()["pending_rooms"] == 0
+
+@pytest.mark.asyncio
+async def test_full_queue_flushes_without_waiting_for_interval():
+    store = FakeStore()
+    buffer = write_buffer.WriteBehindBuffer(store.flush, enabled=True, interval=60, max_turns=2)
+
+    buffer.add(ROOM, {"input_data": "a"})
+    future = buffer.add(ROOM, {"input_data": "b"})
+
+    assert await asyncio.wait_for(future, timeout=1) == 2
+
+@pytest.mark.asyncio
+async def test_periodic_flush():
+    store = FakeStore()
+    buffer = write_buffer.WriteBehindBuffer(store.flush, enabled=True, interval=0.01)
+    buffer.start()
+    try:
+        future = buffer.add(ROOM, {"input_data": "a"})
+        assert await asyncio.wait_for(future, timeout=1) == 1
+    finally:
+        await buffer.close()
+
+@pytest.mark.asyncio
+async def test_flush_failure_is_raised_to_every_waiter():
+    buffer = write_buffer.WriteBehindBuffer(FakeStore(fail=True).flush, enabled=True, interval=60)
+
+    futures = [buffer.add(ROOM, {"input_data": str(i)}) for i in range(2)]
+    await buffer.flush_all()
+
+    for future in futures:
+        with pytest.raises(RuntimeError):
+            await future
+    assert buffer.stats()["failed_turns"] == 2
+
+@pytest.mark.asyncio
+async def test_buffer_durability_answers_immediately_and_close_flushes():
+    store = FakeStore()
+    buffer = write_buffer.WriteBehindBuffer(store.flush, enabled=True, interval=60, durability="buffer")
+    buffer.start()
+
+    assert buffer.add(ROOM, {"input_data": "a"}) is None
+    assert store.writes == []
+
+    await buffer.close()
+
+    assert store.rooms[ROOM] == [{"input_data": "a"}]
+
+@pytest.mark.asyncio
+async def test_flush_matching_only_flushes_selected_rooms():
+    store = FakeStore()
+    buffer = write_buffer.WriteBehindBuffer(store.flush, enabled=True, interval=60)
+    buffer.add(ROOM, {"input_data": "a"})
+    other = buffer.add(OTHER_ROOM, {"input_data": "b"})
+
+    await buffer.flush_matching(lambda key: key == ROOM)
+
+    assert list(store.rooms) == [ROOM]
+    assert not other.done()
+    await buffer.close()
+
+@pytest.mark.asyncio
+async def test_invalid_durability():
+    with pytest.raises(ValueError):
+        write_buffer.WriteBehindBuffer(FakeStore().flush, durability="async")
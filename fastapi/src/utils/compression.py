@@ -0,0 +1,211 @@
+'''
+응답 본문을 gzip 또는 brotli로 압축하는 ASGI 미들웨어 모듈입니다.
+
+클라이언트의 Accept-Encoding에 따라 brotli(br)를 우선 사용하고, brotli 패키지가 설치되지 않은 환경에서는 gzip을 사용합니다.
+본문이 minimum_size보다 작으면 압축하지 않으며, StreamingResponse는 전체를 모으지 않고 받은 조각마다 압축하여 바로 전송합니다.
+
+압축 수준별 CPU 사용량과 크기 비교 (src 디렉토리에서 실행):
+    python -m benchmarks.compression
+'''
+import zlib
+from typing import Dict, List, Optional
+
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+ENCODINGS = ("br", "gzip")
+
+# 압축 효과가 있는 텍스트 계열 응답 형식
+COMPRESSIBLE_TYPES = (
+    "application/json",
+    "application/x-ndjson",
+    # MessagePack도 채팅 본문은 문자열 그대로 담기므로 JSON과 비슷하게 줄어듦
+    "application/msgpack",
+    "application/javascript",
+    "application/xml",
+)
+
+# 본문이 없거나 압축하면 안 되는 상태 코드
+NO_BODY_STATUS = (204, 304)
+
+def is_compressible(content_type: Optional[str]) -> bool:
+    """
+    압축 효과가 있는 응답 형식인지 확인합니다.
+    """
+    if not content_type:
+        return False
+    media_type = content_type.split(";", 1)[0].strip().lower()
+    return media_type.startswith("text/") or media_type.endswith("+json") or media_type in COMPRESSIBLE_TYPES
+
+def select_encoding(accept_encoding: Optional[str], available: List[str]) -> Optional[str]:
+    """
+    Accept-Encoding 헤더에서 q 값이 가장 높은 인코딩을 available 순서를 우선하여 선택합니다. 없으면 None입니다.
+    """
+    if not accept_encoding:
+        return None
+    qualities: Dict[str, float] = {}
+    for coding in accept_encoding.split(","):
+        name, *params = [part.strip() for part in coding.split(";")]
+        quality = 1.0
+        for param in params:
+            key, _, value = param.partition("=")
+            if key.strip().lower() == "q":
+                try:
+                    quality = float(value)
+                except ValueError:
+                    quality = 0.0
+        qualities[name.lower()] = quality
+    wildcard = qualities.get("*", 0.0)
+    best, best_quality = None, 0.0
+    for encoding in available:
+        quality = qualities.get(encoding, wildcard)
+        if quality > best_quality:
+            best, best_quality = encoding, quality
+    return best
+
+class Encoder:
+    '''
+    gzip 또는 brotli 압축 스트림입니다.
+    '''
+    def __init__(self, encoding: str, gzip_level: int = 1, brotli_quality: int = 1) -> None:
+        self.encoding = encoding
+        if encoding == "br":
+            self._compressor = brotli.Compressor(quality=brotli_quality)
+        else:
+            self._compressor = zlib.compressobj(gzip_level, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+
+    def compress(self, data: bytes, flush: bool = False) -> bytes:
+        """
+        data를 압축합니다. flush가 True이면 지금까지 받은 내용을 모두 내보내 클라이언트가 바로 복원할 수 있게 합니다.
+        """
+        if self.encoding == "br":
+            output = self._compressor.process(data)
+            return output + self._compressor.flush() if flush else output
+        output = self._compressor.compress(data)
+        return output + self._compressor.flush(zlib.Z_SYNC_FLUSH) if flush else output
+
+    def finish(self) -> bytes:
+        if self.encoding == "br":
+            return self._compressor.finish()
+        return self._compressor.flush(zlib.Z_FINISH)
+
+class CompressionMiddleware:
+    '''
+    minimum_size 이상인 텍스트 계열 응답을 Accept-Encoding에 따라 압축하는 ASGI 미들웨어입니다.
+    '''
+    def __init__(
+        self,
+        app: ASGIApp,
+        enabled: bool = True,
+        minimum_size: int = 1024,
+        gzip_level: int = 1,
+        brotli_quality: int = 1
+    ) -> None:
+        """
+        CompressionMiddleware 클래스 초기화.
+
+        :param enabled: False이면 압축하지 않음
+        :param minimum_size: 이 크기(byte) 이상인 응답만 압축
+        :param gzip_level: gzip 압축 수준 (1~9). 채팅 로그는 1에서 4배 이상 줄어들고 수준을 높여도 크기 차이에 비해 CPU 사용량이 크게 늘어남
+        :param brotli_quality: brotli 압축 수준 (0~11)
+        """
+        self.app = app
+        self.enabled = enabled
+        self.minimum_size = minimum_size
+        self.gzip_level = gzip_level
+        self.brotli_quality = brotli_quality
+        self.available = [encoding for encoding in ENCODINGS if encoding != "br" or brotli is not None]
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or not self.enabled:
+            await self.app(scope, receive, send)
+            return
+        encoding = select_encoding(Headers(scope=scope).get("accept-encoding"), self.available)
+        responder = _CompressionResponder(self, encoding, send)
+        await self.app(scope, receive, responder.send)
+
+class _CompressionResponder:
+    '''
+    요청 하나의 응답 메시지를 받아 압축 여부를 결정하고 전송합니다.
+    '''
+    def __init__(self, middleware: CompressionMiddleware, encoding: Optional[str], send: Send) -> None:
+        self.middleware = middleware
+        self.encoding = encoding
+        self._send = send
+        self.start_message: Optional[Message] = None
+        self.buffer = bytearray()
+        self.encoder: Optional[Encoder] = None
+        # 압축 여부를 결정하기 전(본문을 minimum_size까지 모으는 중)이면 True
+        self.pending = False
+
+    def _eligible(self, message: Message) -> bool:
+        headers = Headers(raw=message["headers"])
+        if message["status"] < 200 or message["status"] in NO_BODY_STATUS or "content-encoding" in headers:
+            return False
+        return is_compressible(headers.get("content-type"))
+
+    async def send(self, message: Message) -> None:
+        if message["type"] == "http.response.start":
+            if not self._eligible(message):
+                await self._send(message)
+                return
+            self.start_message = {**message, "headers": list(message.get("headers", []))}
+            # 압축 여부가 Accept-Encoding에 따라 달라지므로 공유 캐시가 구분하도록 함
+            MutableHeaders(raw=self.start_message["headers"]).add_vary_header("Accept-Encoding")
+            if self.encoding is None:
+                await self._send(self.start_message)
+                return
+            self.pending = True
+            return
+
+        if message["type"] != "http.response.body":
+            await self._send(message)
+            return
+
+        if self.encoder is not None:
+            body = message.get("body", b"")
+            more_body = message.get("more_body", False)
+            data = self.encoder.compress(body, flush=more_body) if body else b""
+            if not more_body:
+                data += self.encoder.finish()
+            if data or not more_body:
+                await self._send({"type": "http.response.body", "body": data, "more_body": more_body})
+            return
+
+        if not self.pending:
+            await self._send(message)
+            return
+
+        self.buffer += message.get("body", b"")
+        more_body = message.get("more_body", False)
+        if more_body and len(self.buffer) < self.middleware.minimum_size:
+            return
+
+        self.pending = False
+        body, self.buffer = bytes(self.buffer), bytearray()
+        if len(body) < self.middleware.minimum_size:
+            await self._send(self.start_message)
+            await self._send({"type": "http.response.body", "body": body, "more_body": more_body})
+            return
+
+        self.encoder = Encoder(self.encoding, self.middleware.gzip_level, self.middleware.brotli_quality)
+        headers = MutableHeaders(raw=self.start_message["headers"])
+        if more_body:
+            # 스트리밍 응답은 전체 크기를 알 수 없으므로 chunked 전송
+            del headers["content-length"]
+            data = self.encoder.compress(body, flush=True)
+        else:
+            data = self.encoder.compress(body) + self.encoder.finish()
+            headers["Content-Length"] = str(len(data))
+        headers["Content-Encoding"] = self.encoding
+        # 압축한 표현은 byte 단위로 다르므로 ETag를 약한 비교용으로 변경 (If-None-Match는 약한 비교 사용)
+        etag = headers.get("etag")
+        if etag is not None and not etag.startswith("W/"):
+            headers["ETag"] = f"W/{etag}"
+        await self._send(self.start_message)
+        await self._send({"type": "http.response.body", "body": data, "more_body": more_body})
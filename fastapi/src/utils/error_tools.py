@@ -14,7 +14,7 @@ from fastapi import FastAPI, Request, HTTPException
 from fastapi.responses import JSONResponse
 from fastapi.exceptions import RequestValidationError
 from sqlalchemy.exc import SQLAlchemyError
-from starlette.middleware.base import BaseHTTPMiddleware
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
 
 
 # ==========================
@@ -87,10 +87,18 @@ class ForbiddenException(BaseCustomException):
     def __init__(self, detail="Forbidden"):
         super().__init__(403, detail)
 
+class ConflictException(BaseCustomException):
+    def __init__(self, detail="Conflict"):
+        super().__init__(409, detail)
+
 class ValueErrorException(BaseCustomException):
     def __init__(self, detail="Invalid value"):
         super().__init__(422, detail)
 
+class UnsupportedMediaTypeException(BaseCustomException):
+    def __init__(self, detail="Unsupported media type"):
+        super().__init__(415, detail)
+
 class InternalServerErrorException(BaseCustomException):
     def __init__(self, detail="Internal Server Error"):
         trace_id = uuid.uuid4()
@@ -158,7 +166,9 @@ class ExceptionHandlerFactory:
         BadRequestException: lambda req, exc: JSONResponse(status_code=exc.status_code, content={"detail": "Bad request"}),
         UnauthorizedException: lambda req, exc: JSONResponse(status_code=exc.status_code, content={"detail": "Unauthorized"}),
         ForbiddenException: lambda req, exc: JSONResponse(status_code=exc.status_code, content={"detail": "Forbidden"}),
+        ConflictException: lambda req, exc: JSONResponse(status_code=exc.status_code, content={"detail": exc.detail}),
         ValueErrorException: lambda req, exc: JSONResponse(status_code=exc.status_code, content={"detail": "Invalid input"}),
+        UnsupportedMediaTypeException: lambda req, exc: JSONResponse(status_code=exc.status_code, content={"detail": "Unsupported media type"}),
         InternalServerErrorException: lambda req, exc: JSONResponse(status_code=exc.status_code, content={"detail": "Server error"}),
         DatabaseErrorException: lambda req, exc: JSONResponse(status_code=exc.status_code, content={"detail": "Database error"}),
         IPRestrictedException: lambda req, exc: JSONResponse(status_code=exc.status_code, content={"detail": exc.detail}),
@@ -208,21 +218,29 @@ class ExceptionHandlerFactory:
 # ==========================
 # 5. 미들웨어
 # ==========================
-class ErrorLoggingMiddleware(BaseHTTPMiddleware):
-    async def dispatch(self, request: Request, call_next: Callable) -> Any:
-        try:
-            return await call_next(request)
-        except Exception as exc:
-            raise exc
-
-class RouteLoggingMiddleware(BaseHTTPMiddleware):
-    async def dispatch(self, request: Request, call_next: Callable) -> Any:
-        response = await call_next(request)
-        if response.status_code == 404:
-            logger.warning(
-                f"Route Not Found: {request.url.path} | Method: {request.method} | IP: {request.client.host}"
-            )
-        return response
+class RouteLoggingMiddleware:
+    '''
+    응답 상태가 404인 요청(없는 경로)을 기록하는 ASGI 미들웨어입니다.
+    응답 메시지를 그대로 전달하므로 스트리밍 응답을 모으지 않으며, 처리 중 발생한 예외는 서버 오류 처리에 그대로 전달합니다.
+    '''
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        async def send_wrapper(message: Message) -> None:
+            if message["type"] == "http.response.start" and message["status"] == 404:
+                request = Request(scope)
+                client_ip = request.client.host if request.client else "Unknown"
+                logger.warning(
+                    f"Route Not Found: {request.url.path} | Method: {request.method} | IP: {client_ip}"
+                )
+            await send(message)
+
+        await self.app(scope, receive, send_wrapper)
 
 # ==========================
 # 6. 예외 핸들러 등록기
@@ -236,6 +254,4 @@ class ExceptionManager:
         app.add_exception_handler(RequestValidationError, ExceptionHandlerFactory.validation_handler)
         app.add_exception_handler(SQLAlchemyError, ExceptionHandlerFactory.database_handler)
         app.add_exception_handler(RouteNotFoundException, ExceptionHandlerFactory.generic_handler)
-        app.add_middleware(ErrorLoggingMiddleware)
-        app.add_middleware(RouteLoggingMiddleware)
         app.add_middleware(RouteLoggingMiddleware)
@@ -0,0 +1,67 @@
+'''
+채팅 로그 조회의 조건부 요청(ETag, If-None-Match)을 처리하는 모듈입니다.
+
+대화방의 'version'과 요청한 구간(쿼리 파라미터), 응답 표현(미디어 타입, 간결한 응답)으로 ETag를 만들고,
+클라이언트가 같은 값을 If-None-Match로 보내면 대화 내용을 읽지 않고 304 Not Modified로 응답합니다.
+압축 여부와 관계없이 같은 값을 쓰도록 ETag는 항상 약한 비교용(W/)으로 반환합니다.
+'''
+import hashlib
+from typing import Dict, Iterable, Optional, Tuple
+
+from starlette.responses import Response
+
+# 브라우저가 저장한 응답을 쓰기 전에 항상 서버에 다시 확인하도록 함
+CACHE_CONTROL = "private, no-cache"
+
+# 압축 미들웨어가 압축 대상 응답에 붙이는 Vary 값 (304 응답에도 같은 값을 붙임)
+ENCODING_VARY = "Accept-Encoding"
+
+def variant(query: Iterable[Tuple[str, str]], representation: str) -> str:
+    """
+    같은 version이라도 내용이 다른 응답을 구분하는 값을 생성합니다.
+
+    :param query: 요청의 쿼리 파라미터 (last, since 등 구간 조건, 순서는 무시)
+    :param representation: 응답 표현 (responses.representation)
+    """
+    source = "&".join(f"{key}={value}" for key, value in sorted(query)) + "\n" + representation
+    return hashlib.sha256(source.encode("utf-8")).hexdigest()[:16]
+
+def make_etag(version: int, variant: str = "") -> str:
+    """
+    대화방 version과 variant로 약한 비교용 ETag 값을 생성합니다.
+    """
+    return f'W/"{version}-{variant}"' if variant else f'W/"{version}"'
+
+def _opaque(tag: str) -> str:
+    tag = tag.strip()
+    return tag[2:] if tag.startswith("W/") else tag
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """
+    If-None-Match 헤더에 etag가 포함되어 있는지 확인합니다. 약한 비교(양쪽의 W/ 무시)를 사용하며 '*'는 항상 일치합니다.
+    """
+    if not if_none_match:
+        return False
+    opaque = _opaque(etag)
+    for candidate in if_none_match.split(","):
+        candidate = candidate.strip()
+        if candidate == "*" or _opaque(candidate) == opaque:
+            return True
+    return False
+
+def cache_headers(version: Optional[int], variant: str = "") -> Dict[str, str]:
+    """
+    조회 응답에 붙일 헤더를 반환합니다. version을 확정할 수 없으면 ETag를 붙이지 않습니다.
+    """
+    if version is None:
+        return {"Cache-Control": CACHE_CONTROL}
+    return {"ETag": make_etag(version, variant), "Cache-Control": CACHE_CONTROL}
+
+def not_modified(etag: str, vary: str) -> Response:
+    """
+    본문 없는 304 응답을 만듭니다. 200 응답과 같은 ETag와 Vary(압축 여부에 따른 Accept-Encoding 포함)를 붙입니다.
+    """
+    return Response(
+        status_code=304,
+        headers={"ETag": etag, "Cache-Control": CACHE_CONTROL, "Vary": f"{vary}, {ENCODING_VARY}"}
+    )
@@ -0,0 +1,37 @@
+'''
+대화 턴의 길이(글자 수, 토큰 수)를 계산하는 모듈입니다.
+
+토큰 수는 모델별 토크나이저 없이 계산하는 근사값입니다.
+한글/한자/가나는 글자 하나를 토큰 하나로, 그 밖의 문자는 4글자를 토큰 하나로 계산합니다.
+'''
+import re
+from typing import Dict
+
+# 대화 턴에서 길이를 계산하는 필드
+MEASURED_FIELDS = ("input_data", "output_data")
+
+# measure_turn이 계산하여 대화 턴과 함께 저장하는 필드 (응답에는 포함하지 않음)
+METRIC_FIELDS = ("chars", "tokens")
+
+_CJK_PATTERN = re.compile(r'[\u1100-\u11FF\u3040-\u30FF\u3130-\u318F\u3400-\u4DBF\u4E00-\u9FFF\uAC00-\uD7AF]')
+
+def estimate_tokens(text: str) -> int:
+    """
+    문자열의 토큰 수 근사값을 계산합니다.
+    """
+    if not text:
+        return 0
+    cjk = len(_CJK_PATTERN.findall(text))
+    return cjk + -(-(len(text) - cjk) // 4)
+
+def measure_turn(turn: Dict) -> Dict[str, int]:
+    """
+    대화 턴의 input_data, output_data 길이를 합산합니다.
+
+    :return: {'chars': 글자 수, 'tokens': 토큰 수 근사값}
+    """
+    texts = [str(turn.get(field) or "") for field in MEASURED_FIELDS]
+    return {
+        "chars": sum(len(text) for text in texts),
+        "tokens": sum(estimate_tokens(text) for text in texts),
+    }